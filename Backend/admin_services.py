@@ -0,0 +1,65 @@
+# admin_services.py - server-side admin grants
+#
+#   python admin_services.py grant <username>     give a user admin rights
+#   python admin_services.py revoke <username>    take them away
+#   python admin_services.py list                 show every admin
+#
+# Admin endpoints check users.is_admin, which only this CLI (run by whoever
+# operates the database) sets. Registration accepts job_seeker and employer
+# roles only, so no request can grant admin rights.
+import sys
+from typing import List
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def set_admin(username: str, is_admin: bool) -> bool:
+    """Returns False when no such user exists"""
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE users SET is_admin = %s WHERE username = %s", (is_admin, username))
+        cursor.execute("SELECT 1 FROM users WHERE username = %s", (username,))
+        found = cursor.fetchone() is not None
+        conn.commit()
+        return found
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def list_admins() -> List[str]:
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT username FROM users WHERE is_admin = TRUE ORDER BY username")
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) == 2 and argv[0] in ("grant", "revoke"):
+        if not set_admin(argv[1], argv[0] == "grant"):
+            print(f"❌ No user named {argv[1]}")
+            return 1
+        print(f"✅ {argv[1]} is {'now' if argv[0] == 'grant' else 'no longer'} an admin")
+        return 0
+    if argv == ["list"]:
+        for username in list_admins():
+            print(username)
+        return 0
+    print("usage: python admin_services.py grant|revoke <username> | list")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
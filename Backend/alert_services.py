@@ -0,0 +1,282 @@
+# alert_services.py - match new jobs against every active saved search at once
+#
+#   python alert_services.py run <job_id> [<job_id> ...]   evaluate jobs and write job_alert notifications
+#
+# Alerts are search run backwards: instead of one query per saved search,
+# all active searches are compiled into arrays - query embeddings as one
+# matrix, wanted skills as a sparse search x skill matrix, and location /
+# salary / job type filters as columns. A batch of new jobs is scored
+# against all of them with a few matrix products, and the resulting
+# job_alert notifications are written with a single executemany.
+#
+# saved_searches.search_query is a JSON object:
+#   {"skills": ["solar pv"], "location": "Pune", "radius_km": 50, "min_salary": 600000, "job_type": "Full-time"}
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from geo_services import DEFAULT_RADIUS_KM, gazetteer, haversine_km
+from notification_services import insert_notifications
+from ranking_services import to_lpa
+from recommendation_services import job_embedding_text, parse_vector, unit
+from skill_services import decode_skill_ids, skill_taxonomy
+
+logger = logging.getLogger(__name__)
+
+# Hub channel used to recompile the searches in every worker
+SAVED_SEARCH_CHANNEL = "internal:saved_searches"
+
+# Cosine above which a job matches a search's text even without a shared skill
+SEMANTIC_THRESHOLD = 0.55
+
+
+def parse_search_query(value) -> Dict:
+    """search_query JSON (also accepts the QueryInput field names)"""
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = {}
+    query = dict(value) if isinstance(value, dict) else {}
+    skills = query.get("skills", query.get("skill_text")) or []
+    query["skills"] = [skills] if isinstance(skills, str) else [str(s) for s in skills if s]
+    return query
+
+
+def search_text(query: Dict) -> str:
+    return " ".join(query.get("skills") or [])
+
+
+class CompiledSearches:
+    """Active saved searches as parallel arrays, one row per search"""
+
+    def __init__(self, searches: List[Dict]):
+        self.searches = searches
+        n = len(searches)
+        queries = [parse_search_query(s.get("search_query")) for s in searches]
+        self.search_ids = np.array([s["search_id"] for s in searches], dtype=np.int64)
+        self.user_ids = np.array([s["user_id"] for s in searches], dtype=np.int64)
+        self.names = [s.get("search_name") or search_text(q) or "Saved search" for s, q in zip(searches, queries)]
+
+        vectors = [unit(parse_vector(s.get("query_vector_json"))) for s in searches]
+        dims = {v.shape[0] for v in vectors if v is not None}
+        self.dim = max(dims, key=lambda d: sum(1 for v in vectors if v is not None and v.shape[0] == d)) if dims else 0
+        self.vectors = np.zeros((n, self.dim))
+        self.has_vector = np.zeros(n, dtype=bool)
+        for i, v in enumerate(vectors):
+            if v is not None and v.shape[0] == self.dim:
+                self.vectors[i] = v
+                self.has_vector[i] = True
+
+        # Wanted skills as a sparse search x skill-id matrix
+        rows, cols = [], []
+        for i, query in enumerate(queries):
+            for skill_id in skill_taxonomy.extract_all(query["skills"]):
+                rows.append(i)
+                cols.append(skill_id)
+        width = max(cols, default=0) + 1
+        self.skills = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, width))
+        self.required = np.asarray(self.skills.sum(axis=1)).ravel()
+        self.has_text = np.array([bool(q["skills"]) for q in queries], dtype=bool)
+
+        coords = [gazetteer.geocode(q.get("location") or "") for q in queries]
+        self.lat = np.array([c[0] if c else np.nan for c in coords])
+        self.lon = np.array([c[1] if c else np.nan for c in coords])
+        self.radius = np.array([float(q.get("radius_km") or DEFAULT_RADIUS_KM) for q in queries])
+        # Searches naming a place the gazetteer does not know fall back to a text match
+        self.location_text = np.array([(q.get("location") or "").strip().casefold() if not c else ""
+                                       for q, c in zip(queries, coords)], dtype=str)
+        self.min_salary = np.array([to_lpa(q.get("min_salary")) or np.nan for q in queries], dtype=float)
+        self.job_type = np.array([(q.get("job_type") or "").strip().casefold() for q in queries], dtype=str)
+
+    def __len__(self):
+        return len(self.searches)
+
+
+def match_jobs(compiled: CompiledSearches, jobs: List[Dict],
+               semantic_threshold: float = SEMANTIC_THRESHOLD) -> List[Tuple[int, int, float]]:
+    """(search row, job index, score) for every search each job satisfies"""
+    if not len(compiled) or not jobs:
+        return []
+    n_jobs = len(jobs)
+
+    # Relevance: shared canonical skills, or a close embedding
+    rows, cols = [], []
+    for j, job in enumerate(jobs):
+        for skill_id in job.get("skill_ids") or []:
+            if skill_id < compiled.skills.shape[1]:
+                rows.append(skill_id)
+                cols.append(j)
+    job_skills = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(compiled.skills.shape[1], n_jobs))
+    overlap = (compiled.skills @ job_skills).toarray()
+    keyword = np.divide(overlap, compiled.required[:, None], out=np.zeros_like(overlap),
+                        where=compiled.required[:, None] > 0)
+
+    semantic = np.zeros((len(compiled), n_jobs))
+    job_vectors = [unit(parse_vector(job.get("desc_vector_json"))) for job in jobs]
+    with_vector = [j for j, v in enumerate(job_vectors) if v is not None and v.shape[0] == compiled.dim]
+    if with_vector and compiled.dim:
+        semantic[:, with_vector] = compiled.vectors @ np.vstack([job_vectors[j] for j in with_vector]).T
+        semantic[~compiled.has_vector] = 0.0
+
+    relevant = (keyword > 0) | (semantic >= semantic_threshold) | ~compiled.has_text[:, None]
+    score = np.where(compiled.has_text[:, None], np.maximum(keyword, semantic), 1.0)
+
+    # Filters: distance, salary floor and job type
+    allowed = np.ones((len(compiled), n_jobs), dtype=bool)
+    has_place = ~np.isnan(compiled.lat)
+    for j, job in enumerate(jobs):
+        lat, lon = job.get("latitude"), job.get("longitude")
+        if lat is not None and lon is not None:
+            within = haversine_km(float(lat), float(lon), compiled.lat, compiled.lon) <= compiled.radius
+            allowed[:, j] &= ~has_place | within
+        else:
+            allowed[:, j] &= ~has_place
+        if compiled.location_text.size:
+            allowed[:, j] &= np.char.find((job.get("location") or "").casefold(), compiled.location_text) >= 0
+
+        salary = to_lpa(job.get("salary_value", job.get("salary")))
+        if salary is not None:
+            allowed[:, j] &= np.isnan(compiled.min_salary) | (compiled.min_salary <= salary)
+        job_type = (job.get("job_type") or "").strip().casefold()
+        allowed[:, j] &= (compiled.job_type == "") | (compiled.job_type == job_type)
+
+    rows, cols = np.nonzero(relevant & allowed)
+    return [(int(r), int(c), round(float(score[r, c]), 4)) for r, c in zip(rows, cols)]
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def load_saved_searches() -> List[Dict]:
+    conn = _connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT search_id, user_id, search_name, search_query, query_vector_json
+            FROM saved_searches WHERE is_active = TRUE ORDER BY search_id
+        """)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class AlertEngine:
+    """Compiled active searches, refreshed on change, evaluated against batches of new jobs"""
+
+    def __init__(self, embed: Callable[[str], Optional[List[float]]],
+                 loader: Callable[[], List[Dict]] = load_saved_searches, ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.embed = embed
+        self.loader = loader
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._compiled: Optional[CompiledSearches] = None
+        self._loaded_at = 0.0
+
+    def compiled(self) -> CompiledSearches:
+        with self._lock:
+            if self._compiled is None or self.clock() - self._loaded_at > self.ttl:
+                self._compiled = CompiledSearches(self.loader())
+                self._loaded_at = self.clock()
+                logger.info(f"🔔 Compiled {len(self._compiled)} active saved searches")
+            return self._compiled
+
+    def invalidate(self):
+        with self._lock:
+            self._compiled = None
+
+    def query_vector_json(self, query: Dict) -> Optional[str]:
+        """Stored with the search so compiling never re-embeds"""
+        text = search_text(query)
+        embedding = self.embed(text) if text else None
+        return json.dumps([round(float(x), 6) for x in embedding]) if embedding is not None else None
+
+    def _load_jobs(self, cursor, job_ids: List[int]) -> List[Dict]:
+        placeholders = ", ".join(["%s"] * len(job_ids))
+        cursor.execute(f"""
+            SELECT job_id, title, description, company, location, job_type, salary, latitude, longitude,
+                   skill_ids, desc_vector_json
+            FROM jobs WHERE job_id IN ({placeholders}) AND canonical_job_id IS NULL
+        """, tuple(job_ids))
+        jobs = cursor.fetchall()
+        for job in jobs:
+            job["skill_ids"] = decode_skill_ids(job["skill_ids"])
+            job["salary_value"] = job.pop("salary")
+            if not job["desc_vector_json"]:
+                embedding = self.embed(job_embedding_text(job["title"], job["description"]))
+                job["desc_vector_json"] = embedding if embedding is not None else None
+        return jobs
+
+    def process_jobs(self, job_ids: Iterable[int]) -> List[Dict]:
+        """Write one job_alert per (user, job) match; returns the notifications written"""
+        job_ids = list(dict.fromkeys(int(i) for i in job_ids))
+        compiled = self.compiled()
+        if not job_ids or not len(compiled):
+            return []
+        conn = _connect()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            jobs = self._load_jobs(cursor, job_ids)
+            notifications, seen = [], set()
+            for row, j, score in sorted(match_jobs(compiled, jobs), key=lambda m: -m[2]):
+                user_id, job = int(compiled.user_ids[row]), jobs[j]
+                if (user_id, job["job_id"]) in seen:
+                    continue
+                seen.add((user_id, job["job_id"]))
+                notifications.append({
+                    "user_id": user_id,
+                    "job_id": job["job_id"],
+                    "search_id": int(compiled.search_ids[row]),
+                    "title": f"New job for '{compiled.names[row]}'"[:200],
+                    "message": f"{job['title']} at {job['company'] or 'a green employer'} in {job['location'] or 'India'}",
+                    "score": score,
+                })
+            if notifications:
+                counters = insert_notifications(cursor, [dict(n, type="job_alert") for n in notifications])
+                conn.commit()
+                # Each alert carries its user's unread counter so the push can update the badge
+                by_user = {c["user_id"]: c for c in counters}
+                for n in notifications:
+                    n["unread"], n["version"] = by_user[n["user_id"]]["unread"], by_user[n["user_id"]]["version"]
+            logger.info(f"🔔 {len(jobs)} new jobs matched {len(notifications)} saved-search alerts")
+            return notifications
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Evaluating saved-search alerts failed: {e}")
+            return []
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) >= 2 and argv[0] == "run":
+        from vector_services import vector_service
+
+        engine = AlertEngine(embed=vector_service.generate_embedding)
+        notifications = engine.process_jobs(int(arg) for arg in argv[1:])
+        for n in notifications:
+            print(f"   user {n['user_id']}: {n['title']} - {n['message']} ({n['score']})")
+        print(f"✅ {len(notifications)} alerts written")
+        return 0
+    print("usage: python alert_services.py run <job_id> [<job_id> ...]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
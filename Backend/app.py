@@ -1,15 +1,36 @@
-from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request, Form, File, UploadFile, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect, Request, Form, File, UploadFile, BackgroundTasks, Query
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from vector_services import vector_service, initialize_vector_data, test_vector_functionality
+from realtime_services import BroadcastHub, UnixSocketRelay, StatsPublisher, BROADCAST_CHANNEL, user_channel, topic_channel
+from queries import (JOB_SEARCH_FROM, JOB_SEARCH_ORDER, USER_APPLICATIONS_FROM, EMPLOYER_APPLICATIONS_FROM,
+                     APPLICATIONS_ORDER, NEARBY_JOBS_CONDITION, APPLICATION_EXISTS_SQL, EMPLOYER_PROFILE_SQL)
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_condition, keyset_params, split_page, approximate_total
+from schema import apply_migrations
+from database import db_config, get_db_connection
+from translation_services import TranslationIndex, TranslationCache, TranslationEngine, GoogleTranslateProvider, CircuitBreaker, NegativeCache, default_cache_path, load_translation_table
+from profile_services import ProfileCache, load_profile, PROFILE_INVALIDATION_CHANNEL
+from localization_services import materialize_jobs, materialize_careers
+from geo_services import ip_resolver, gazetteer, bounding_box, haversine_km, start_geocode_backfill, DEFAULT_RADIUS_KM
+from ranking_services import RankingPipeline, weights_from_env
+from skill_services import skill_taxonomy, job_skill_ids, encode_skill_ids, decode_skill_ids
+from career_services import career_catalog, CAREER_CATALOG_CHANNEL
+from career_graph_services import career_graph, rebuild as rebuild_career_graph
+from recommendation_services import RecommendationService
+from alert_services import AlertEngine, SAVED_SEARCH_CHANNEL, parse_search_query
+from ingestion_services import JobCreate, JobIngestor, detect_format, employer_profile
+from dedup_services import JobDeduplicator
+from reindex_services import reindex_runner
+from outbox_services import Outbox, OutboxWorker, EMAIL, NOTIFICATION
+from notification_services import (NotificationFeed, NOTIFICATION_COUNT_CHANNEL, LONG_POLL_SECONDS,
+                                   list_notifications, mark_read, unread_counter)
 import numpy as np
 from fastapi.responses import StreamingResponse, JSONResponse
-from deep_translator import GoogleTranslator
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import jwt
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime, timedelta
 from pydantic import BaseModel, validator, EmailStr
 import logging
@@ -34,8 +55,8 @@ import json
 import uuid
 from passlib.context import CryptContext
 import shutil
+import tempfile
 from pathlib import Path
-import requests
 
 
 # Password hashing
@@ -64,23 +85,6 @@ limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# MariaDB configuration
-db_config = {
-    'user': 'root',
-    'password': os.getenv("DB_PASSWORD", "pass"),
-    'host': 'localhost',
-    'port': 3306,
-    'database': 'green_jobs'
-}
-
-def get_db_connection():
-    try:
-        conn = mariadb.connect(**db_config)
-        return conn
-    except mariadb.Error as e:
-        logger.error(f"Error connecting to MariaDB: {e}")
-        return None
-
 # JWT CONFIGURATION
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secure-secret-key-2025")
 ALGORITHM = "HS256"
@@ -93,12 +97,12 @@ RESUME_DIR = UPLOAD_DIR / "resumes"
 RESUME_DIR.mkdir(exist_ok=True)
 
 
-# Expanded Real Indian Green Companies mapped to skills
+# Expanded Real Indian Green Companies mapped to skills (keys are skill taxonomy slugs)
 companies = {
     "python": ["Tata Power Renewables", "Adani Green Energy", "ReNew Power", "NTPC Renewable Energy", "Avaada Group", "Suzlon Energy", "Sterling and Wilson Renewable Energy", "Greenko Group", "Azure Power", "JSW Energy"],
     "design": ["Avaada Group", "Suzlon Energy", "Sterling and Wilson Renewable Energy", "Greenko Group", "Sova Solar", "Mytrah Energy", "Azure Power", "JSW Energy", "NTPC Renewable Energy", "ReNew Power"],
-    "data": ["NTPC Renewable Energy", "Azure Power", "JSW Energy", "Mytrah Energy", "Greenko Group", "Avaada Group", "Suzlon Energy", "ReNew Power", "Adani Green Energy", "Tata Power Renewables"],
-    "sustainable": ["Greenko Group", "Sova Solar", "Mytrah Energy", "Suzlon Energy", "Avaada Group", "Azure Power", "JSW Energy", "NTPC Renewable Energy", "ReNew Power", "Adani Green Energy"],
+    "data_analysis": ["NTPC Renewable Energy", "Azure Power", "JSW Energy", "Mytrah Energy", "Greenko Group", "Avaada Group", "Suzlon Energy", "ReNew Power", "Adani Green Energy", "Tata Power Renewables"],
+    "sustainability": ["Greenko Group", "Sova Solar", "Mytrah Energy", "Suzlon Energy", "Avaada Group", "Azure Power", "JSW Energy", "NTPC Renewable Energy", "ReNew Power", "Adani Green Energy"],
     "default": ["Tata Power Renewables", "Adani Green Energy", "ReNew Power", "NTPC Renewable Energy", "Avaada Group", "Suzlon Energy", "Sterling and Wilson Renewable Energy", "Greenko Group", "Azure Power", "JSW Energy"]
 }
 
@@ -154,267 +158,26 @@ SUPPORTED_LANGUAGES = {
     "kn": "kannada", "or": "odia", "ml": "malayalam"
 }
 
-# Hindi Job Titles
-HINDI_JOBS = {
-    1: "इको इंजीनियर",
-    2: "ग्रीन डेवलपर",
-    3: "नवीकरणीय विश्लेषक",
-    4: "सस्टेनेबिलिटी कंसल्टेंट",
-    5: "ग्रीन डेटा साइंटिस्ट"
-}
-
 # Global AI Models
 model = None
 generator = None
 sd_pipe = None
 
-FALLBACK_TRANSLATIONS = {
-    "hi": {
-        # Job Titles - Hindi
-        "Solar Energy Engineer": "सौर ऊर्जा इंजीनियर",
-        "Environmental Analyst": "पर्यावरण विश्लेषक",
-        "Wind Farm Technician": "विंड फार्म तकनीशियन", 
-        "Sustainability Manager": "सस्टेनेबिलिटी मैनेजर",
-        "EV Battery Engineer": "ईवी बैटरी इंजीनियर",
-        "Sustainability Data Analyst": "सस्टेनेबिलिटी डेटा विश्लेषक",
-        "Senior Solar Energy Engineer": "सीनियर सौर ऊर्जा इंजीनियर",
-        "Green Building Architect": "ग्रीन बिल्डिंग आर्किटेक्ट",
-        "ESG Reporting Manager": "ईएसजी रिपोर्टिंग मैनेजर",
-        "Wind Energy Analyst": "विंड एनर्जी एनालिस्ट",
-        "Carbon Accounting Specialist": "कार्बन अकाउंटिंग विशेषज्ञ",
-        
-        # Companies - Hindi
-        "Tata Power Renewables": "टाटा पावर रिन्यूएबल्स",
-        "Adani Green Energy": "अडानी ग्रीन एनर्जी", 
-        "ReNew Power": "रिन्यू पावर",
-        "Suzlon Energy": "सुजलॉन एनर्जी",
-        "GreenTech Solutions": "ग्रीनटेक सॉल्यूशंस",
-        "EcoConsult Services": "ईकोकंसल्ट सर्विसेज",
-        "PowerWind Energy": "पावरविंड एनर्जी",
-        "GreenFuture Corp": "ग्रीनफ्यूचर कॉर्प",
-        "ElectroMobility India": "इलेक्ट्रोमोबिलिटी इंडिया",
-        "Inox Wind": "इनोक्स विंड",
-        "Mahindra Sustainability": "महिंद्रा सस्टेनेबिलिटी"
-    },
-    "bn": {
-        # Job Titles - Bengali
-        "Solar Energy Engineer": "সৌর শক্তি প্রকৌশলী",
-        "Environmental Analyst": "পরিবেশ বিশ্লেষক",
-        "Wind Farm Technician": "বায়ু খামার টেকনিশিয়ান",
-        "Sustainability Manager": "টেকসইতা ব্যবস্থাপক",
-        "EV Battery Engineer": "ইভি ব্যাটারি ইঞ্জিনিয়ার",
-        "Sustainability Data Analyst": "টেকসইতা ডেটা বিশ্লেষক",
-        "Senior Solar Energy Engineer": "সিনিয়র সৌর শক্তি প্রকৌশলী",
-        "Green Building Architect": "গ্রিন বিল্ডিং আর্কিটেক্ট",
-        "ESG Reporting Manager": "ESG রিপোর্টিং ম্যানেজার",
-        "Wind Energy Analyst": "বায়ু শক্তি বিশ্লেষক",
-        "Carbon Accounting Specialist": "কার্বন অ্যাকাউন্টিং বিশেষজ্ঞ",
-        
-        # Companies - Bengali
-        "Tata Power Renewables": "টাটা পাওয়ার নবায়নযোগ্য",
-        "Adani Green Energy": "আদানি গ্রিন এনার্জি",
-        "ReNew Power": "রিনিউ পাওয়ার",
-        "Suzlon Energy": "সুজলন এনার্জি",
-        "GreenTech Solutions": "গ্রিনটেক সলিউশনস",
-        "EcoConsult Services": "ইকোকনসাল্ট সার্ভিসেস",
-        "PowerWind Energy": "পাওয়ারউইন্ড এনার্জি",
-        "GreenFuture Corp": "গ্রিনফিউচার কর্প",
-        "ElectroMobility India": "ইলেক্ট্রোমোবিলিটি ইন্ডিয়া",
-        "Inox Wind": "ইনক্স উইন্ড",
-        "Mahindra Sustainability": "মহিন্দরা টেকসইতা"
-    },
-    "te": {
-        # Job Titles - Telugu
-        "Solar Energy Engineer": "సోలార్ ఎనర్జీ ఇంజనీర్",
-        "Environmental Analyst": "పర్యావరణ విశ్లేషకుడు",
-        "Wind Farm Technician": "విండ్ ఫార్మ్ టెక్నీషియన్",
-        "Sustainability Manager": "సస్టైనబిలిటీ మేనేజర్",
-        "EV Battery Engineer": "ఈవీ బ్యాటరీ ఇంజనీర్",
-        "Sustainability Data Analyst": "సస్టైనబిలిటీ డేటా అనలిస్ట్",
-        "Senior Solar Energy Engineer": "సీనియర్ సోలార్ ఎనర్జీ ఇంజనీర్",
-        "Green Building Architect": "గ్రీన్ బిల్డింగ్ ఆర్కిటెక్ట్",
-        "ESG Reporting Manager": "ESG రిపోర్టింగ్ మేనేజర్",
-        "Wind Energy Analyst": "విండ్ ఎనర్జీ అనలిస్ట్",
-        "Carbon Accounting Specialist": "కార్బన్ అకౌంటింగ్ స్పెషలిస్ట్",
-        
-        # Companies - Telugu
-        "Tata Power Renewables": "టాటా పవర్ రిన్యూవబుల్స్",
-        "Adani Green Energy": "అదానీ గ్రీన్ ఎనర్జీ",
-        "ReNew Power": "రిన్యూ పవర్",
-        "Suzlon Energy": "సుజ్లాన్ ఎనర్జీ",
-        "GreenTech Solutions": "గ్రీన్టెక్ సొల్యూషన్స్",
-        "EcoConsult Services": "ఎకోకన్సల్ట్ సర్వీసెస్",
-        "PowerWind Energy": "పవర్విండ్ ఎనర్జీ",
-        "GreenFuture Corp": "గ్రీన్ఫ్యూచర్ కార్ప్",
-        "ElectroMobility India": "ఎలక్ట్రోమోబిలిటీ ఇండియా",
-        "Inox Wind": "ఇనాక్స్ విండ్",
-        "Mahindra Sustainability": "మహీంద్రా సస్టైనబిలిటీ"
-    },
-    "ta": {
-        # Job Titles - Tamil
-        "Solar Energy Engineer": "சோலார் எனர்ஜி இன்ஜினியர்",
-        "Environmental Analyst": "சுற்றுச்சூழல் பகுப்பாய்வாளர்",
-        "Wind Farm Technician": "காற்று பண்ணை தொழில்நுட்ப வல்லுநர்",
-        "Sustainability Manager": "நிலைத்தன்மை மேலாளர்",
-        "EV Battery Engineer": "EV பேட்டரி இன்ஜினியர்",
-        "Sustainability Data Analyst": "நிலைத்தன்மை தரவு பகுப்பாய்வாளர்",
-        "Senior Solar Energy Engineer": "மூத்த சோலார் எனர்ஜி இன்ஜினியர்",
-        "Green Building Architect": "பசுமை கட்டிடக் கலைஞர்",
-        "ESG Reporting Manager": "ESG அறிக்கை மேலாளர்",
-        "Wind Energy Analyst": "காற்று ஆற்றல் பகுப்பாய்வாளர்",
-        "Carbon Accounting Specialist": "கார்பன் கணக்கியல் நிபுணர்",
-        
-        # Companies - Tamil
-        "Tata Power Renewables": "டாடா பவர் புதுப்பிக்கத்தக்கவை",
-        "Adani Green Energy": "அதானி கிரீன் எனர்ஜி",
-        "ReNew Power": "ரினியூ பவர்",
-        "Suzlon Energy": "சுஜ்லான் எனர்ஜி",
-        "GreenTech Solutions": "கிரீன்டெக் தீர்வுகள்",
-        "EcoConsult Services": "எகோகன்சல்ட் சேவைகள்",
-        "PowerWind Energy": "பவர்விண்ட் எனர்ஜி",
-        "GreenFuture Corp": "கிரீன்ஃபியூச்சர் கார்ப்",
-        "ElectroMobility India": "எலக்ட்ரோமோபிலிட்டி இந்தியா",
-        "Inox Wind": "இனாக்ஸ் விண்ட்",
-        "Mahindra Sustainability": "மகிந்திரா நிலைத்தன்மை"
-    },
-    "mr": {
-        # Job Titles - Marathi
-        "Solar Energy Engineer": "सौर ऊर्जा अभियंता",
-        "Environmental Analyst": "पर्यावरण विश्लेषक",
-        "Wind Farm Technician": "विंड फार्म तंत्रज्ञ",
-        "Sustainability Manager": "सातत्य व्यवस्थापक",
-        "EV Battery Engineer": "ईव्ही बॅटरी अभियंता",
-        "Sustainability Data Analyst": "सातत्य डेटा विश्लेषक",
-        "Senior Solar Energy Engineer": "वरिष्ठ सौर ऊर्जा अभियंता",
-        "Green Building Architect": "ग्रीन बिल्डिंग आर्किटेक्ट",
-        "ESG Reporting Manager": "ESG अहवाल व्यवस्थापक",
-        "Wind Energy Analyst": "विंड एनर्जी विश्लेषक",
-        "Carbon Accounting Specialist": "कार्बन लेखा तज्ञ",
-        
-        # Companies - Marathi
-        "Tata Power Renewables": "टाटा पॉवर नूतनीकरणीय",
-        "Adani Green Energy": "अदानी ग्रीन एनर्जी",
-        "ReNew Power": "रिन्यू पॉवर",
-        "Suzlon Energy": "सुजलॉन एनर्जी",
-        "GreenTech Solutions": "ग्रीनटेक सोल्यूशन्स",
-        "EcoConsult Services": "इकोकन्सल्ट सर्व्हिसेस",
-        "PowerWind Energy": "पॉवरविंड एनर्जी",
-        "GreenFuture Corp": "ग्रीनफ्यूचर कॉर्प",
-        "ElectroMobility India": "इलेक्ट्रोमोबिलिटी इंडिया",
-        "Inox Wind": "इनॉक्स विंड",
-        "Mahindra Sustainability": "महिंद्रा सातत्य"
-    },
-    "gu": {
-        # Job Titles - Gujarati
-        "Solar Energy Engineer": "સોલર એનર્જી એન્જિનિયર",
-        "Environmental Analyst": "પર્યાવરણ વિશ્લેષક",
-        "Wind Farm Technician": "વિન્ડ ફાર્મ ટેક્નિશિયન",
-        "Sustainability Manager": "સસ્ટેનેબિલિટી મેનેજર",
-        "EV Battery Engineer": "ઈવી બેટરી એન્જિનિયર",
-        "Sustainability Data Analyst": "સસ્ટેનેબિલિટી ડેટા એનાલિસ્ટ",
-        "Senior Solar Energy Engineer": "સિનિયર સોલર એનર્જી એન્જિનિયર",
-        "Green Building Architect": "ગ્રીન બિલ્ડિંગ આર્કિટેક્ટ",
-        "ESG Reporting Manager": "ESG રિપોર્ટિંગ મેનેજર",
-        "Wind Energy Analyst": "વિન્ડ એનર્જી એનાલિસ્ટ",
-        "Carbon Accounting Specialist": "કાર્બન એકાઉન્ટિંગ સ્પેશિયલિસ્ટ",
-        
-        # Companies - Gujarati
-        "Tata Power Renewables": "ટાટા પાવર રિન્યુએબલ્સ",
-        "Adani Green Energy": "અદાણી ગ્રીન એનર્જી",
-        "ReNew Power": "રિન્યુ પાવર",
-        "Suzlon Energy": "સુઝલોન એનર્જી",
-        "GreenTech Solutions": "ગ્રીનટેક સોલ્યુશન્સ",
-        "EcoConsult Services": "ઇકોકન્સલ્ટ સર્વિસિસ",
-        "PowerWind Energy": "પાવરવિન્ડ એનર્જી",
-        "GreenFuture Corp": "ગ્રીનફ્યુચર કોર્પ",
-        "ElectroMobility India": "ઇલેક્ટ્રોમોબિલિટી ઇન્ડિયા",
-        "Inox Wind": "ઇનોક્સ વિન્ડ",
-        "Mahindra Sustainability": "મહીન્દ્રા સસ્ટેનેબિલિટી"
-    },
-    "kn": {
-        # Job Titles - Kannada
-        "Solar Energy Engineer": "ಸೌರ ಶಕ್ತಿ ಎಂಜಿನಿಯರ್",
-        "Environmental Analyst": "ಪರಿಸರ ವಿಶ್ಲೇಷಕ",
-        "Wind Farm Technician": "ಗಾಳಿ ಫಾರ್ಮ್ ತಂತ್ರಜ್ಞ",
-        "Sustainability Manager": "ಸುಸ್ಥಿರತೆ ಮ್ಯಾನೇಜರ್",
-        "EV Battery Engineer": "ಇವಿ ಬ್ಯಾಟರಿ ಎಂಜಿನಿಯರ್",
-        "Sustainability Data Analyst": "ಸುಸ್ಥಿರತೆ ಡೇಟಾ ವಿಶ್ಲೇಷಕ",
-        "Senior Solar Energy Engineer": "ಸೀನಿಯರ್ ಸೌರ ಶಕ್ತಿ ಎಂಜಿನಿಯರ್",
-        "Green Building Architect": "ಗ್ರೀನ್ ಬಿಲ್ಡಿಂಗ್ ಆರ್ಕಿಟೆಕ್ಟ್",
-        "ESG Reporting Manager": "ESG ರಿಪೋರ್ಟಿಂಗ್ ಮ್ಯಾನೇಜರ್",
-        "Wind Energy Analyst": "ಗಾಳಿ ಶಕ್ತಿ ವಿಶ್ಲೇಷಕ",
-        "Carbon Accounting Specialist": "ಕಾರ್ಬನ್ ಅಕೌಂಟಿಂಗ್ ತಜ್ಞ",
-        
-        # Companies - Kannada
-        "Tata Power Renewables": "ಟಾಟಾ ಪವರ್ ನವೀಕರಿಸಬಹುದಾದ",
-        "Adani Green Energy": "ಅದಾನಿ ಗ್ರೀನ್ ಎನರ್ಜಿ",
-        "ReNew Power": "ರಿನ್ಯೂ ಪವರ್",
-        "Suzlon Energy": "ಸುಜ್ಲಾನ್ ಎನರ್ಜಿ",
-        "GreenTech Solutions": "ಗ್ರೀನ್ಟೆಕ್ ಪರಿಹಾರಗಳು",
-        "EcoConsult Services": "ಎಕೋಕನ್ಸಲ್ಟ್ ಸೇವೆಗಳು",
-        "PowerWind Energy": "ಪವರ್ವಿಂಡ್ ಎನರ್ಜಿ",
-        "GreenFuture Corp": "ಗ್ರೀನ್ಫ್ಯೂಚರ್ ಕಾರ್ಪ್",
-        "ElectroMobility India": "ಎಲೆಕ್ಟ್ರೋಮೊಬಿಲಿಟಿ ಇಂಡಿಯಾ",
-        "Inox Wind": "ಇನಾಕ್ಸ್ ವಿಂಡ್",
-        "Mahindra Sustainability": "ಮಹೀಂದ್ರಾ ಸುಸ್ಥಿರತೆ"
-    },
-    "ml": {
-        # Job Titles - Malayalam
-        "Solar Energy Engineer": "സോളാർ എനർജി എഞ്ചിനീയർ",
-        "Environmental Analyst": "പരിസ്ഥിതി വിശകലനകാരൻ",
-        "Wind Farm Technician": "വിൻഡ് ഫാം ടെക്നീഷ്യൻ",
-        "Sustainability Manager": "സസ്റ്റെയിനബിലിറ്റി മാനേജർ",
-        "EV Battery Engineer": "ഇവി ബാറ്ററി എഞ്ചിനീയർ",
-        "Sustainability Data Analyst": "സസ്റ്റെയിനബിലിറ്റി ഡാറ്റ അനലിസ്റ്റ്",
-        "Senior Solar Energy Engineer": "സീനിയർ സോളാർ എനർജി എഞ്ചിനീയർ",
-        "Green Building Architect": "ഗ്രീൻ ബിൽഡിംഗ് ആർക്കിടെക്റ്റ്",
-        "ESG Reporting Manager": "ESG റിപ്പോർട്ടിംഗ് മാനേജർ",
-        "Wind Energy Analyst": "വിൻഡ് എനർജി അനലിസ്റ്റ്",
-        "Carbon Accounting Specialist": "കാർബൺ അക്കൗണ്ടിംഗ് സ്പെഷ്യലിസ്റ്റ്",
-        
-        # Companies - Malayalam
-        "Tata Power Renewables": "ടാറ്റ പവർ പുനരുപയോഗപ്പെടുത്താവുന്ന",
-        "Adani Green Energy": "അദാനി ഗ്രീൻ എനർജി",
-        "ReNew Power": "റിന്യൂ പവർ",
-        "Suzlon Energy": "സുജ്ലോൺ എനർജി",
-        "GreenTech Solutions": "ഗ്രീൻടെക് സൊല്യൂഷൻസ്",
-        "EcoConsult Services": "ഇക്കോകൺസൾട്ട് സേവനങ്ങൾ",
-        "PowerWind Energy": "പവർവിൻഡ് എനർജി",
-        "GreenFuture Corp": "ഗ്രീൻഫ്യൂച്ചർ കോർപ്പ്",
-        "ElectroMobility India": "ഇലക്ട്രോമോബിലിറ്റി ഇന്ത്യ",
-        "Inox Wind": "ഇനോക്സ് വിൻഡ്",
-        "Mahindra Sustainability": "മഹീന്ദ്ര സസ്റ്റെയിനബിലിറ്റി"
-    },
-    "or": {
-        # Job Titles - Odia
-        "Solar Energy Engineer": "ସୌର ଶକ୍ତି ଇଞ୍ଜିନିୟର",
-        "Environmental Analyst": "ପରିବେଶ ବିଶ୍ଳେଷକ",
-        "Wind Farm Technician": "ପବନ ଫାର୍ମ ଟେକ୍ନିସିଆନ",
-        "Sustainability Manager": "ସ୍ଥିରତା ପରିଚାଳକ",
-        "EV Battery Engineer": "ଇଭି ବ୍ୟାଟେରୀ ଇଞ୍ଜିନିୟର",
-        "Sustainability Data Analyst": "ସ୍ଥିରତା ତଥ୍ୟ ବିଶ୍ଳେଷକ",
-        "Senior Solar Energy Engineer": "ସିନିୟର ସୌର ଶକ୍ତି ଇଞ୍ଜିନିୟର",
-        "Green Building Architect": "ଗ୍ରୀନ୍ ବିଲ୍ଡିଂ ଆର୍କିଟେକ୍ଟ",
-        "ESG Reporting Manager": "ESG ରିପୋର୍ଟିଂ ମ୍ୟାନେଜର",
-        "Wind Energy Analyst": "ପବନ ଶକ୍ତି ବିଶ୍ଳେଷକ",
-        "Carbon Accounting Specialist": "କାର୍ବନ ଆକାଉଣ୍ଟିଂ ବିଶେଷଜ୍ଞ",
-        
-        # Companies - Odia
-        "Tata Power Renewables": "ଟାଟା ପାୱାର ନବୀକରଣୀୟ",
-        "Adani Green Energy": "ଆଦାନୀ ଗ୍ରୀନ୍ ଏନର୍ଜି",
-        "ReNew Power": "ରିନ୍ୟୁ ପାୱାର",
-        "Suzlon Energy": "ସୁଜଲନ୍ ଏନର୍ଜି",
-        "GreenTech Solutions": "ଗ୍ରୀନ୍ଟେକ୍ ସମାଧାନ",
-        "EcoConsult Services": "ଇକୋକନ୍ସଲ୍ଟ ସେବା",
-        "PowerWind Energy": "ପାୱାରୱିଣ୍ଡ୍ ଏନର୍ଜି",
-        "GreenFuture Corp": "ଗ୍ରୀନ୍ଫ୍ୟୁଚର୍ କର୍ପ",
-        "ElectroMobility India": "ଇଲେକ୍ଟ୍ରୋମୋବିଲିଟି ଇଣ୍ଡିଆ",
-        "Inox Wind": "ଇନୋକ୍ସ ୱିଣ୍ଡ",
-        "Mahindra Sustainability": "ମହୀନ୍ଦ୍ରା ସ୍ଥିରତା"
-    }
-}
+# Fallback tables live in translations/<lang>.json and are compiled on first use of a language
+translation_index = TranslationIndex(loader=load_translation_table)
 
+# Bounded in-process LRU in front of a SQLite tier shared by all workers
+translation_cache = TranslationCache(max_entries=50000, db_path=default_cache_path())
 
+# Dictionary and cache first; misses go to Google Translate in concurrent batches.
+# A request waits at most 2s for the provider, and a failing provider is skipped
+# for 30s after 5 consecutive errors.
+translation_engine = TranslationEngine(
+    translation_index, translation_cache, GoogleTranslateProvider(),
+    max_concurrency=4, batch_size=25, time_budget=2.0,
+    breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30.0),
+    negative_cache=NegativeCache(ttl=300.0)
+)
 
 # ============ FIXED TRANSLATION FUNCTION ===========
 
@@ -422,64 +185,7 @@ async def translate_text_enhanced(text: str, target_lang: str) -> str:
     """Enhanced translation with better fallbacks for all 10 languages"""
     if not text or not text.strip() or target_lang == "en":
         return text
-    
-    cache_key = f"{text}_{target_lang}"
-    
-    # Check cache first
-    async with cache_lock:
-        if cache_key in translation_cache:
-            return translation_cache[cache_key]
-    
-    try:
-        translated = text  # Default to original
-        
-        # STRATEGY 1: Use comprehensive fallback dictionary
-        if target_lang in FALLBACK_TRANSLATIONS:
-            # Try exact match first
-            if text in FALLBACK_TRANSLATIONS[target_lang]:
-                translated = FALLBACK_TRANSLATIONS[target_lang][text]
-                print(f"✅ Used exact fallback for '{text}' -> '{translated}'")
-            else:
-                # Try case-insensitive match
-                text_lower = text.lower()
-                for key, value in FALLBACK_TRANSLATIONS[target_lang].items():
-                    if key.lower() == text_lower:
-                        translated = value
-                        print(f"✅ Used case-insensitive fallback for '{text}' -> '{translated}'")
-                        break
-                else:
-                    # No fallback found, try Google Translate
-                    translated = await try_google_translate(text, target_lang)
-        else:
-            # No fallback dictionary for this language, try Google Translate directly
-            translated = await try_google_translate(text, target_lang)
-        
-        # Cache the result
-        async with cache_lock:
-            translation_cache[cache_key] = translated
-            
-        return translated
-        
-    except Exception as e:
-        print(f"❌ Enhanced translation failed for '{text}' to {target_lang}: {e}")
-        return text  # Fallback to original text
-
-async def try_google_translate(text: str, target_lang: str) -> str:
-    """Try Google Translate with better error handling"""
-    try:
-        print(f"🔄 Attempting Google Translate: '{text}' to {target_lang}")
-        translated = GoogleTranslator(source='auto', target=target_lang).translate(text)
-        
-        if not translated or translated == text:
-            print(f"⚠️ Google Translate returned original text for '{text}'")
-            return text
-            
-        print(f"✅ Google Translate success: '{text}' -> '{translated}'")
-        return translated
-        
-    except Exception as e:
-        print(f"❌ Google Translate error for {target_lang}: {e}")
-        return text  # Return original text on failure
+    return await translation_engine.translate(text, target_lang)
 
 # Remove the duplicate function - keep only this one
 translate_text_cached = translate_text_enhanced
@@ -506,6 +212,7 @@ class QueryInput(BaseModel):
     skill_text: List[str]
     lang: str = "en"
     location: Optional[str] = None
+    radius_km: Optional[float] = None
 
 class ApplyInput(BaseModel):
     job_id: int
@@ -514,6 +221,9 @@ class ApplyInput(BaseModel):
 class CareerPathInput(BaseModel):
     current_skill: str
     years_experience: int = 5
+    current_career: Optional[str] = None
+    target_career: Optional[str] = None
+    mode: str = "shortest"  # or "widest": maximise the weakest transition
 
 class ImpactInput(BaseModel):
     role: str
@@ -534,6 +244,18 @@ class CareerRecommendationsInput(BaseModel):
     experience: str = ""
     lang: str = "en" 
 
+class SavedSearchInput(BaseModel):
+    search_name: Optional[str] = None
+    skills: List[str] = []
+    location: Optional[str] = None
+    radius_km: Optional[float] = None
+    min_salary: Optional[float] = None
+    job_type: Optional[str] = None
+
+class SkillGapInput(BaseModel):
+    skills: List[str]
+    limit: int = 20
+
 
 def train_salary_predictor():
     # Simple linear regression instead of LSTM
@@ -545,10 +267,6 @@ def train_salary_predictor():
 
 salary_model = train_salary_predictor()
 
-# Translation cache
-translation_cache = {}
-cache_lock = asyncio.Lock()
-
 # ... [REST OF YOUR CODE REMAINS EXACTLY THE SAME - NO CHANGES BELOW THIS LINE] ...
 
 def get_cached_jobs(query: Optional[QueryInput] = None):
@@ -558,56 +276,78 @@ def get_cached_jobs(query: Optional[QueryInput] = None):
         return []
     cursor = conn.cursor(dictionary=True)
     try:
-        skill_text = " ".join(query.skill_text).lower() if query else ""
         query_params = []
+        # Titles and descriptions stored at write time for the requested language
         sql = """
-            SELECT job_id AS id, title AS job_title, description, company, location, salary,
+            SELECT jobs.job_id AS id, COALESCE(jt.title, jobs.title) AS job_title,
+                   COALESCE(jt.description, jobs.description) AS description,
+                   jt.job_id IS NOT NULL AS localized, jobs.company, jobs.location, jobs.salary,
+                   jobs.latitude, jobs.longitude, jobs.created_at, jobs.desc_vector_json, jobs.skill_ids,
+                   CONCAT_WS(' ', jobs.title, jobs.description, jobs.skills) AS search_text,
                    'SDG 7: 9/10 | Carbon Saved: 500 tons/year' AS sdg_impact,
                    '4.8⭐' AS company_rating, 'High Demand' AS urgency
-            FROM jobs WHERE 1=1
+            FROM jobs
+            LEFT JOIN job_translations jt ON jt.job_id = jobs.job_id AND jt.lang = %s
+            WHERE jobs.canonical_job_id IS NULL
         """
-        if query and query.location:
-            sql += " AND location LIKE %s"
+        query_params.append(query.lang if query else "en")
+        
+        # Known cities become a radius search: indexed bounding box here, exact distance below
+        origin = gazetteer.geocode(query.location) if query and query.location else None
+        radius_km = (query.radius_km or DEFAULT_RADIUS_KM) if query else DEFAULT_RADIUS_KM
+        if origin:
+            min_lat, max_lat, min_lon, max_lon = bounding_box(origin[0], origin[1], radius_km)
+            sql += " AND " + NEARBY_JOBS_CONDITION
+            query_params.extend([min_lat, max_lat, min_lon, max_lon, f"%{query.location}%"])
+        elif query and query.location and query.location != "Unknown":
+            sql += " AND jobs.location LIKE %s"
             query_params.append(f"%{query.location}%")
-        if skill_text:
-            sql += " AND (title LIKE %s OR description LIKE %s)"
-            query_params.extend([f"%{skill_text}%", f"%{skill_text}%"])
+        # Any skill qualifies a job; the ranking stage scores how many match
+        skills = [skill.strip() for skill in query.skill_text if skill.strip()] if query else []
+        if skills:
+            sql += " AND (" + " OR ".join(["jobs.title LIKE %s OR jobs.description LIKE %s"] * len(skills)) + ")"
+            for skill in skills:
+                query_params.extend([f"%{skill}%", f"%{skill}%"])
         cursor.execute(sql, query_params)
         base_jobs = cursor.fetchall()
+        
+        # One haversine over every candidate; corners of the box fall outside the circle.
+        # Rows without coordinates matched on location text and have no distance.
+        if origin and base_jobs:
+            distances = haversine_km(origin[0], origin[1],
+                                     [job["latitude"] for job in base_jobs], [job["longitude"] for job in base_jobs])
+            base_jobs = [dict(job, distance_km=None if job["latitude"] is None else round(float(d), 1))
+                         for job, d in zip(base_jobs, distances) if job["latitude"] is None or d <= radius_km]
+        
         matches = []
-        skill_key = "default"
-        if query:
-            for skill in query.skill_text:
-                for key in companies:
-                    if key in skill.lower():
-                        skill_key = key
-                        break
+        query_skill_ids = skill_taxonomy.extract_all(query.skill_text) if query else []
+        skill_key = next((skill_taxonomy.slugs[skill_id] for skill_id in query_skill_ids
+                          if skill_taxonomy.slugs.get(skill_id) in companies), "default")
         
         # ENHANCED: Support all 10 languages
         for job in base_jobs:
-            company = companies[skill_key][job["id"] % len(companies[skill_key])]
+            # Demo rows without a company get one of the featured employers for the skill
+            company = job["company"] or companies[skill_key][job["id"] % len(companies[skill_key])]
             
-            # Translate based on selected language
-            if query and query.lang in SUPPORTED_LANGUAGES and query.lang != "en":
-                # Note: Actual translation happens in the endpoint for async support
-                job_title = job["job_title"]  # Will be translated in endpoint
-                description = job["description"]  # Will be translated in endpoint
-            else:
-                job_title = job["job_title"]
-                description = job["description"]
-                
+            # Rows without a stored translation are translated in the endpoint
             matches.append({
                 "id": job["id"],
-                "job_title": job_title,
-                "description": description,
+                "job_title": job["job_title"],
+                "description": job["description"],
+                "localized": bool(job["localized"]),
                 "salary": f"₹{job['salary']:.1f} LPA",
+                "salary_value": job["salary"],
+                "created_at": job["created_at"],
+                "desc_vector_json": job["desc_vector_json"],
+                "search_text": job["search_text"],
+                "skill_ids": decode_skill_ids(job["skill_ids"]),
                 "location": job["location"],
+                "distance_km": job.get("distance_km"),
                 "company": company,
                 "company_rating": job["company_rating"],
                 "sdg_impact": job["sdg_impact"],
                 "urgency": job["urgency"],
                 "website": company_websites.get(company),
-                "similarity": 0.95,
                 "language": query.lang if query else "en"  # Track language used
             })
         return matches
@@ -643,6 +383,7 @@ def init_db():
         print("🚀 Initializing vector data for hackathon...")
         vector_result = initialize_vector_data()
         print(f"✅ Vector initialization: {vector_result}")
+        start_geocode_backfill()
         
         # Test vector functionality
         test_result = test_vector_functionality()
@@ -660,49 +401,146 @@ def init_db():
     salary_model = train_salary_predictor()
     return True
 
-# Enhanced Auto-Geolocation using ipinfo.io
-def get_city_from_ip(ip):
+# Auto-Geolocation from the local IP range table (see geo_services.py)
+async def get_city_from_ip(ip):
+    if ip_resolver.loaded:
+        return ip_resolver.lookup(ip) or "Unknown"
+    # No range table built yet - the ipinfo.io fallback goes over the network
+    return await asyncio.to_thread(ip_resolver.resolve, ip) or "Unknown"
+
+# WebSocket broadcast hub - non-blocking publish, relayed to the other workers
+manager = BroadcastHub(relay=UnixSocketRelay.create_default(
+    f"{db_config['host']}:{db_config['port']}/{db_config['database']}"))
+
+# Assembled /api/users/profile responses, invalidated on every profile write
+profile_cache = ProfileCache(ttl=300)
+manager.add_listener(PROFILE_INVALIDATION_CHANNEL, lambda user_id: profile_cache.invalidate(int(user_id)))
+
+def invalidate_profile(user_id: int):
+    """Drop a cached profile here and in every other worker; the For You list is re-scored"""
+    profile_cache.invalidate(user_id)
+    manager.publish(PROFILE_INVALIDATION_CHANNEL, str(user_id))
+    recommendation_service.mark_stale(user_id)
+
+# Job ranking: weights come from RANKING_WEIGHTS, e.g. "semantic=0.5,keyword=0.2"
+ranking_pipeline = RankingPipeline(weights=weights_from_env())
+
+def get_expected_salary(user_id: int):
+    """expected_salary from the cached profile, or one indexed lookup"""
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return (cached.get("profile") or {}).get("expected_salary")
+    conn = get_db_connection()
+    if not conn:
+        return None
+    cursor = conn.cursor()
     try:
-        api_key = os.getenv("IPINFO_API_KEY", "your-api-key-here")
-        response = requests.get(f"https://ipinfo.io/{ip}/city?token={api_key}").text
-        return response if response else "Unknown"
-    except:
-        return "Unknown"
+        cursor.execute("SELECT expected_salary FROM user_profiles WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except mariadb.Error as e:
+        logger.error(f"Expected salary lookup error: {e}")
+        return None
+    finally:
+        cursor.close()
+        conn.close()
 
-# Distance Calculation
-def calculate_distance(loc1, loc2):
-    return 0 if loc1 == loc2 else 10
+def embed_query(text: str):
+    try:
+        return vector_service.generate_embedding(text)
+    except Exception as e:
+        logger.warning(f"Query embedding failed, ranking without semantic score: {e}")
+        return None
 
-# WebSocket Manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+def embed_texts(texts: List[str]):
+    try:
+        return vector_service.generate_embeddings(texts)
+    except Exception as e:
+        logger.warning(f"Batch embedding failed, jobs will be embedded on demand: {e}")
+        return None
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+# Materialized For You lists, re-scored on profile changes and new jobs
+recommendation_service = RecommendationService(embed=embed_query)
+
+# Re-posted jobs are linked to their canonical posting as they are written
+job_deduplicator = JobDeduplicator(embed=embed_query)
+
+# Bulk imports: vectors come from batched embedding, so the For You merge only scores
+job_ingestor = JobIngestor(embed_batch=embed_texts, indexers={"recommendations": recommendation_service.add_jobs},
+                           deduplicator=job_deduplicator)
+
+# Every active saved search, compiled once and matched against each batch of new jobs
+alert_engine = AlertEngine(embed=embed_query)
+manager.add_listener(SAVED_SEARCH_CHANNEL, lambda _: alert_engine.invalidate())
+
+async def deliver_job_alerts(job_ids: List[int]):
+    """Write job_alert notifications for new jobs and push them to connected users"""
+    notifications = await asyncio.to_thread(alert_engine.process_jobs, job_ids)
+    counters = {}
+    for notification in notifications:
+        manager.publish(user_channel(notification["user_id"]), {"type": "job_alert", **notification})
+        counters[notification["user_id"]] = notification
+    for user_id, latest in counters.items():
+        manager.publish(NOTIFICATION_COUNT_CHANNEL,
+                        {"user_id": user_id, "unread": latest["unread"], "version": latest["version"]})
+
+# Unread counter changes wake this worker's long-polls and update its connected badges
+notification_feed = NotificationFeed()
+
+def push_unread_count(payload):
+    notification_feed.notify(payload)
+    change = json.loads(payload)
+    channel = user_channel(change["user_id"])
+    if manager.has_subscribers(channel):
+        # Every worker receives the change, so each only serves its own sockets
+        manager.publish(channel, {"type": "unread_count", "unread": change["unread"],
+                                  "version": change["version"]}, relay=False)
+
+manager.add_listener(NOTIFICATION_COUNT_CHANNEL, push_unread_count)
+
+async def rank_candidates(jobs: list, query: QueryInput, user_id: int):
+    """Score every candidate in one vectorized pass; returns (ranked jobs, report)"""
+    if not jobs:
+        return [], {"weights": {}, "timings_ms": {}}
+    started = time.perf_counter()
+    query_vector, expected_salary = await asyncio.gather(
+        asyncio.to_thread(embed_query, " ".join(query.skill_text)),
+        asyncio.to_thread(get_expected_salary, user_id)
+    )
+    inputs_ms = round((time.perf_counter() - started) * 1000, 3)
+    ranked, report = ranking_pipeline.rank(jobs, query.skill_text, query_vector=query_vector,
+                                           expected_salary=expected_salary,
+                                           query_skill_ids=skill_taxonomy.extract_all(query.skill_text))
+    report["timings_ms"] = {"inputs": inputs_ms, **report["timings_ms"]}
+    return ranked, report
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# Fallback translation tables are re-read from disk in every worker on reload
+TRANSLATION_RELOAD_CHANNEL = "internal:translations_reload"
+manager.add_listener(TRANSLATION_RELOAD_CHANNEL, lambda lang: translation_index.reload(lang or None))
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+# In-memory career catalog and transition graph, reloaded after its TTL or when an admin refreshes it
+def reload_career_data(_=None):
+    career_catalog.invalidate()
+    career_graph.load()
 
-manager = ConnectionManager()
+manager.add_listener(CAREER_CATALOG_CHANNEL, reload_career_data)
 
-def send_email(to_email: str, subject: str, body: str):
-    print(f"📧 EMAIL SENT TO {to_email}: {subject}")
-    print(f"📧 CONTENT: {body[:100]}...")
-    return True
+# Emails and notifications are recorded by requests and delivered in batches by the outbox worker
+outbox = Outbox()
+outbox_worker = OutboxWorker(outbox, publish=manager.publish)
 
 # AI Salary Prediction
+# Base salary (LPA) by skill taxonomy slug
+SKILL_BASE_SALARY = {"python": 8, "design": 6, "data_analysis": 7, "sustainability": 10}
+
 def ai_salary_predictor(skill, years):
-    base_salary = {"python": 8, "design": 6, "data": 7, "sustainable": 10}.get(skill.lower(), 8)
+    slugs = [skill_taxonomy.slugs.get(skill_id) for skill_id in skill_taxonomy.extract(skill)]
+    base_salary = max([SKILL_BASE_SALARY[slug] for slug in slugs if slug in SKILL_BASE_SALARY], default=8)
     return base_salary + years, base_salary + years + 5
 
 def recommend_skills(skills):
-    return ["Solar Panel Design", "Wind Energy Analysis"] if "python" in skills else ["Green Coding", "Sustainability"]
+    python_id = skill_taxonomy.id_for_slug("python")
+    return ["Solar Panel Design", "Wind Energy Analysis"] if python_id in skill_taxonomy.extract(skills) else ["Green Coding", "Sustainability"]
 
 def generate_interview_questions(skills):
     return ["Tell me about your Python experience.", "How would you optimize renewable energy code?"]
@@ -811,77 +649,46 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         conn.close()
 
 
-def get_career_recommendations_from_db(user_skills: List[str], limit: int = 15):
-    """Get career recommendations from database - ENHANCED FOR MULTI-LANGUAGE SUPPORT"""
-    conn = get_db_connection()
-    if not conn:
-        logger.error("Database connection failed in career recommendations")
-        return []
-    
-    cursor = conn.cursor(dictionary=True)
+CAREER_TEXT_FIELDS = ('title', 'description', 'growth', 'salary_range', 'category', 'experience_level')
+
+def get_career_recommendations_from_db(user_skills: List[str], limit: int = 15, lang: str = "en"):
+    """Careers ranked by skill coverage x demand from the in-memory catalog, with stored translations for `lang`"""
     try:
-        # ENHANCED QUERY - Get careers with skill matching for better relevance
-        if user_skills:
-            query = """
-            SELECT DISTINCT c.* 
-            FROM careers c
-            LEFT JOIN career_skills cs ON c.career_id = cs.career_id
-            WHERE 1=1
-            """
-            
-            params = []
-            for skill in user_skills:
-                query += " AND (c.required_skills LIKE %s OR cs.skill_name LIKE %s)"
-                params.extend([f"%{skill}%", f"%{skill}%"])
-            
-            query += " ORDER BY c.demand DESC LIMIT %s"
-            params.append(limit)
-        else:
-            # If no skills provided, get top careers by demand
-            query = "SELECT * FROM careers ORDER BY demand DESC LIMIT %s"
-            params = [limit]
-        
-        print(f"🔍 Career search for skills: {user_skills}, limit: {limit}")
-        
-        cursor.execute(query, params)
-        careers = cursor.fetchall()
-        
-        print(f"✅ Found {len(careers)} careers from database")
-        
-        # ENHANCED JSON handling for all language support
-        for career in careers:
-            skills_data = career.get('required_skills', '[]')
-            
-            if isinstance(skills_data, str):
-                try:
-                    # Clean and parse JSON for proper skill handling
-                    if skills_data.startswith('[') and skills_data.endswith(']'):
-                        # Try to parse as JSON
-                        career['required_skills'] = json.loads(skills_data)
-                    else:
-                        # If it's a string but not JSON, try to extract skills
-                        skills_str = skills_data.strip('[]"\'')
-                        if ',' in skills_str:
-                            career['required_skills'] = [skill.strip().strip('"\'') for skill in skills_str.split(',')]
-                        else:
-                            career['required_skills'] = [skills_str] if skills_str else ["Various Skills"]
-                except (json.JSONDecodeError, Exception) as e:
-                    print(f"⚠️ Skills parsing warning for career {career.get('title')}: {e}")
-                    career['required_skills'] = ["Technical Skills", "Industry Knowledge"]
-            elif isinstance(skills_data, list):
-                # Already a list, use as-is
-                career['required_skills'] = skills_data
-            else:
-                career['required_skills'] = ["Professional Skills"]
-        
-        return careers
-        
+        careers = career_catalog.match(user_skills, limit=limit)
     except Exception as e:
-        logger.error(f"Error in career recommendations database query: {e}")
+        logger.error(f"Error in career recommendations catalog match: {e}")
         return []
-    finally:
-        cursor.close()
-        conn.close()
+    print(f"✅ Matched {len(careers)} careers for skills: {user_skills}")
+
+    localized_rows = {}
+    if careers and lang != "en":
+        conn = get_db_connection()
+        if not conn:
+            logger.error("Database connection failed in career recommendations")
+        else:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                ids = [career["career_id"] for career in careers]
+                cursor.execute(f"""
+                    SELECT career_id, {', '.join(CAREER_TEXT_FIELDS)}, required_skills FROM career_translations
+                    WHERE lang = %s AND career_id IN ({', '.join(['%s'] * len(ids))})
+                """, (lang, *ids))
+                localized_rows = {row["career_id"]: row for row in cursor.fetchall()}
+            except mariadb.Error as e:
+                logger.error(f"Error loading career translations: {e}")
+            finally:
+                cursor.close()
+                conn.close()
+
+    for career in careers:
+        localized = localized_rows.get(career["career_id"])
+        career['localized'] = localized is not None and localized['title'] is not None
+        if career['localized']:
+            for field in CAREER_TEXT_FIELDS:
+                career[field] = localized[field] or career[field]
+            if localized['required_skills']:
+                career['required_skills'] = json.loads(localized['required_skills'])
+    return careers
 
 
 @app.get("/debug/careers")
@@ -944,22 +751,24 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        if username is None:
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+        
         conn = get_db_connection()
         if not conn:
             raise HTTPException(status_code=500, detail="Database connection failed")
+        
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute("SELECT username, role, email FROM users WHERE username = %s", (username,))
+            cursor.execute("SELECT user_id, username, email, role, is_verified, is_admin FROM users WHERE username = %s", (username,))
             user = cursor.fetchone()
             if not user:
-                raise HTTPException(status_code=401, detail="Invalid credentials")
+                raise HTTPException(status_code=401, detail="User not found")
             return user
-        except mariadb.Error as e:
-            logger.error(f"Error verifying user: {e}")
-            raise HTTPException(status_code=500, detail="Database query failed")
         finally:
             cursor.close()
             conn.close()
+            
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -1089,15 +898,9 @@ async def api_translate_batch(request: Request, batch_data: BatchTranslateInput,
         language_name = SUPPORTED_LANGUAGES.get(target_lang, target_lang)
         print(f"🔄 Batch translating {len(texts)} texts to {target_lang} ({language_name})")
         
-        # Translate all texts with error handling for ALL LANGUAGES
-        translated_texts = []
-        for text in texts:
-            try:
-                translated = await translate_text_enhanced(text, target_lang)
-                translated_texts.append(translated)
-            except Exception as text_error:
-                print(f"❌ Failed to translate '{text}' to {target_lang}: {text_error}")
-                translated_texts.append(text)  # Fallback to original
+        # Duplicates are translated once; misses go upstream concurrently
+        translations = await translation_engine.translate_many(texts, target_lang)
+        translated_texts = [translations.get(text, text) for text in texts]
         
         print(f"✅ {language_name} batch translation completed: {len(translated_texts)} texts")
         
@@ -1122,7 +925,7 @@ async def api_translate_batch(request: Request, batch_data: BatchTranslateInput,
 
 @app.post("/api/career/recommendations")
 @limiter.limit("10/minute")
-async def enhanced_career_recommendations(request: Request, career_data: CareerRecommendationsInput, current_user: dict = Depends(get_current_user)):
+async def enhanced_career_recommendations(request: Request, career_data: CareerRecommendationsInput, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     """Enhanced career recommendations with translation - FIXED FOR 10 LANGUAGES"""
     try:
         skills = [skill.lower() for skill in career_data.skills] if career_data.skills else []
@@ -1133,7 +936,9 @@ async def enhanced_career_recommendations(request: Request, career_data: CareerR
         print(f"🎯 Getting {language_name} career recommendations for skills: {skills}")
         
         # Get recommendations from database
-        careers_from_db = get_career_recommendations_from_db(skills, limit=15)
+        careers_from_db = get_career_recommendations_from_db(skills, limit=15, lang=lang)
+        # Careers without stored translations are translated below and then materialized
+        unlocalized_ids = [career["career_id"] for career in careers_from_db if not career.get("localized")]
         
         # If no matches from database, use comprehensive fallback with ALL LANGUAGE SUPPORT
         if not careers_from_db:
@@ -1263,7 +1068,10 @@ async def enhanced_career_recommendations(request: Request, career_data: CareerR
                 "salary_range": career["salary_range"],
                 "demand": career.get("demand", 85),
                 "category": career["category"],
-                "experience_level": career["experience_level"]
+                "experience_level": career["experience_level"],
+                "match_score": career.get("match_score", 0.0),
+                "skill_coverage": career.get("coverage", 0.0),
+                "localized": career.get("localized", False)
             }
             recommendations.append(rec)
         
@@ -1273,24 +1081,26 @@ async def enhanced_career_recommendations(request: Request, career_data: CareerR
         final_recommendations = []
         if lang != "en" and lang in SUPPORTED_LANGUAGES:
             print(f"🌐 Translating recommendations to {language_name}")
-            translation_success_count = 0
+            pending = [rec for rec in recommendations if not rec['localized']]
+            texts = []
+            for rec in pending:
+                texts.extend(rec[field] for field in CAREER_TEXT_FIELDS)
+                texts.extend(rec['skills_required'])
+            # Shared strings (categories, levels, skills) are translated once
+            translations = await translation_engine.translate_many(texts, lang) if texts else {}
+            if unlocalized_ids:
+                background_tasks.add_task(materialize_careers, translation_engine, unlocalized_ids, list(SUPPORTED_LANGUAGES))
             
+            translation_success_count = 0
             for rec in recommendations:
-                try:
-                    translated_rec = rec.copy()
-                    # Translate all text fields for the selected language
-                    translated_rec['title'] = await translate_text_enhanced(rec['title'], lang)
-                    translated_rec['description'] = await translate_text_enhanced(rec['description'], lang)
-                    translated_rec['skills_required'] = [await translate_text_enhanced(skill, lang) for skill in rec['skills_required']]
-                    translated_rec['growth'] = await translate_text_enhanced(rec['growth'], lang)
-                    translated_rec['salary_range'] = await translate_text_enhanced(rec['salary_range'], lang)
-                    translated_rec['category'] = await translate_text_enhanced(rec['category'], lang)
-                    translated_rec['experience_level'] = await translate_text_enhanced(rec['experience_level'], lang)
-                    final_recommendations.append(translated_rec)
+                translated_rec = rec.copy()
+                if not rec['localized']:
+                    for field in CAREER_TEXT_FIELDS:
+                        translated_rec[field] = translations.get(rec[field], rec[field])
+                    translated_rec['skills_required'] = [translations.get(skill, skill) for skill in rec['skills_required']]
+                final_recommendations.append(translated_rec)
+                if rec['localized'] or translated_rec['title'] != rec['title']:
                     translation_success_count += 1
-                except Exception as trans_error:
-                    print(f"❌ Translation error for career '{rec['title']}' to {lang}: {trans_error}")
-                    final_recommendations.append(rec)  # Fallback to original English
             
             print(f"✅ Successfully translated {translation_success_count}/{len(recommendations)} careers to {language_name}")
         else:
@@ -1318,6 +1128,86 @@ async def enhanced_career_recommendations(request: Request, career_data: CareerR
         }
 
 
+@app.post("/api/career/skill-gap")
+@limiter.limit("30/minute")
+async def career_skill_gap(request: Request, gap_data: SkillGapInput, current_user: dict = Depends(get_current_user)):
+    """Closest careers with matched/missing skills and what to learn next, across the whole catalog"""
+    try:
+        started = time.perf_counter()
+        report = career_catalog.gap_report(gap_data.skills, limit=max(1, min(gap_data.limit, 100)))
+        report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return report
+    except Exception as e:
+        logger.error(f"Skill gap analysis error: {e}")
+        raise HTTPException(status_code=500, detail="Skill gap analysis failed")
+
+
+@app.get("/api/translate/cache-stats")
+async def translation_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Translation cache hit rates per language and provider circuit state"""
+    return {"cache": translation_cache.stats(), "provider": translation_engine.stats()}
+
+@app.post("/api/translate/reload")
+async def reload_translation_tables(lang: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Re-read translations/<lang>.json (or every loaded language) in all workers"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Only admins can reload translations")
+    reloaded = translation_index.reload(lang)
+    manager.publish(TRANSLATION_RELOAD_CHANNEL, lang or "")
+    return {"reloaded": reloaded, "loaded_languages": translation_index.languages()}
+
+@app.post("/api/career/catalog/refresh")
+async def refresh_career_catalog(current_user: dict = Depends(get_current_user)):
+    """Rebuild the career graph from the careers table, then reload catalog and graph in all workers"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Only admins can refresh the career catalog")
+    try:
+        # Re-reads the catalog and rewrites data/career_graph.json, which the other workers load
+        graph = await asyncio.to_thread(rebuild_career_graph)
+    except Exception as e:
+        logger.error(f"Career graph rebuild failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to rebuild the career graph")
+    career_graph.set_graph(graph)
+    manager.publish(CAREER_CATALOG_CHANNEL, "")
+    snapshot = await asyncio.to_thread(career_catalog.snapshot)
+    return {"careers": len(snapshot.careers), "skills": len(snapshot.vocabulary), "graph_careers": len(career_graph.nodes)}
+
+@app.get("/api/admin/reindex")
+async def reindex_status(current_user: dict = Depends(get_current_user)):
+    """Progress of every reindex task: live for runs in this worker, otherwise from the checkpoints"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Only admins can view reindex progress")
+    try:
+        return {"tasks": [await asyncio.to_thread(reindex_runner.progress, name) for name in reindex_runner.tasks]}
+    except Exception as e:
+        logger.error(f"Reindex status error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read reindex progress")
+
+@app.post("/api/admin/reindex/{task}")
+async def start_reindex(
+    task: str,
+    restart: bool = False,
+    workers: Optional[int] = Query(None, ge=1, le=16),
+    chunk: Optional[int] = Query(None, ge=10, le=5000),
+    current_user: dict = Depends(get_current_user)
+):
+    """Start (or resume from its checkpoints) a reindex task in the background"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Only admins can start a reindex")
+    if task not in reindex_runner.tasks:
+        raise HTTPException(status_code=404, detail=f"Unknown reindex task: {task}")
+    return await asyncio.to_thread(reindex_runner.start, task, restart=restart, workers=workers, chunk_size=chunk)
+
+@app.post("/api/admin/reindex/{task}/stop")
+async def stop_reindex(task: str, current_user: dict = Depends(get_current_user)):
+    """Let the chunks in flight finish and skip the rest; the next start resumes where it stopped"""
+    if not current_user.get("is_admin"):
+        raise HTTPException(status_code=403, detail="Only admins can stop a reindex")
+    if task not in reindex_runner.tasks:
+        raise HTTPException(status_code=404, detail=f"Unknown reindex task: {task}")
+    reindex_runner.stop(task)
+    return {"task": task, "status": "stopping"}
+
 @app.get("/api/languages")
 async def get_supported_languages(current_user: dict = Depends(get_current_user)):
     """Get list of supported languages"""
@@ -1338,105 +1228,90 @@ async def get_supported_languages(current_user: dict = Depends(get_current_user)
 
 @app.post("/api/jobs/search")
 @limiter.limit("10/minute")
-async def enhanced_job_search(request: Request, query: QueryInput, current_user: dict = Depends(get_current_user)):
+async def enhanced_job_search(request: Request, query: QueryInput, background_tasks: BackgroundTasks, current_user: dict = Depends(get_current_user)):
     """Enhanced job search with language translation - SUPPORTS ALL 10 LANGUAGES"""
     start_time = time.time()
     
     # Auto-detect location if not provided
-    user_city = get_city_from_ip(request.client.host)
     if not query.location or query.location.lower() == "string":
-        query.location = user_city
+        query.location = await get_city_from_ip(request.client.host)
         auto_detected = True
     else:
         auto_detected = False
     
-    # Get base jobs from database
-    base_jobs = get_cached_jobs(query)
+    # Get candidates from database and rank them all at once
+    ranked, ranking_report = await rank_candidates(get_cached_jobs(query), query, current_user["user_id"])
+    base_jobs = ranked[:10]  # only the returned page is translated
     
-    # Process jobs with translation
-    matches = []
     skill_text = " ".join(query.skill_text).lower()
     
+    # Salary prediction depends only on the query, not on the job
+    salary_min, salary_max = ai_salary_predictor(skill_text, 3)
+    salary_boost = f"₹{salary_min}-{salary_max} LPA (+12%)"
+    skill_suggestions = recommend_skills(skill_text)[:2]
+    email_subject = "🚨 NEW GREEN JOBS!"
+    email_body = f"{len(ranked)} matches in {query.location} in {query.lang}!"
+    
+    # Translate every string the response needs in one pass - SUPPORTS ALL 10 LANGUAGES
+    translations = {}
+    if query.lang != "en" and query.lang in SUPPORTED_LANGUAGES:
+        texts = [salary_boost, email_subject, email_body, *skill_suggestions]
+        for job in base_jobs:
+            texts.extend(job[field] for field in ("company", "company_rating", "sdg_impact", "urgency"))
+            if not job["localized"]:
+                texts.extend([job["job_title"], job["description"]])
+        translations = await translation_engine.translate_many(texts, query.lang)
+        
+        # Store the missing catalog translations so later searches read them directly
+        missing = [job["id"] for job in base_jobs if not job["localized"]]
+        if missing:
+            background_tasks.add_task(materialize_jobs, translation_engine, missing, list(SUPPORTED_LANGUAGES))
+    
+    def localized(text):
+        return translations.get(text, text)
+    
+    # Process jobs - already in ranking order
+    matches = []
     for job in base_jobs:
-        # Translate ALL job details if not English
-        if query.lang != "en" and query.lang in SUPPORTED_LANGUAGES:
-            job_title = await translate_text_enhanced(job["job_title"], query.lang)
-            job_description = await translate_text_enhanced(job["description"], query.lang)
-            company_name = await translate_text_enhanced(job["company"], query.lang)
-            company_rating = await translate_text_enhanced(job["company_rating"], query.lang)
-            sdg_impact = await translate_text_enhanced(job["sdg_impact"], query.lang)
-            urgency = await translate_text_enhanced(job["urgency"], query.lang)
-        else:
-            job_title = job["job_title"]
-            job_description = job["description"]
-            company_name = job["company"]
-            company_rating = job["company_rating"]
-            sdg_impact = job["sdg_impact"]
-            urgency = job["urgency"]
-        
-        # Calculate similarity and other metrics
-        similarity = 0.95 if any(skill in skill_text for skill in ["python", "data", "design", "sustainable"]) else 0.85
-        
-        # Calculate distance
-        distance = calculate_distance(query.location.lower(), job["location"].lower())
-        
-        # Salary prediction
-        salary_min, salary_max = ai_salary_predictor(skill_text, 3)
-        salary_boost = f"₹{salary_min}-{salary_max} LPA (+12%)"
-        
-        # Translate salary boost if needed
-        if query.lang != "en" and query.lang in SUPPORTED_LANGUAGES:
-            salary_boost = await translate_text_enhanced(salary_boost, query.lang)
-        
         matches.append({
             "id": job["id"],
-            "job_title": job_title,
-            "description": job_description,
+            "job_title": localized(job["job_title"]),
+            "description": localized(job["description"]),
             "salary_range": f"₹{job['salary']} LPA",
-            "salary_boost": salary_boost,
+            "salary_boost": localized(salary_boost),
             "location": job["location"],  # Keep location in English for mapping
-            "distance_km": distance,
-            "company": company_name,
+            "distance_km": job["distance_km"],
+            "company": localized(job["company"]),
             "website": job["website"],
-            "company_rating": company_rating,
-            "sdg_impact": sdg_impact,
-            "urgency": urgency,
-            "similarity": round(similarity, 2),
+            "company_rating": localized(job["company_rating"]),
+            "sdg_impact": localized(job["sdg_impact"]),
+            "urgency": localized(job["urgency"]),
+            "similarity": round(job["score"], 2),
             "apply_url": f"https://greenmatchers.com/jobs/{job['id']}",
             "language": query.lang
         })
     
-    # Sort by similarity
-    matches = sorted(matches, key=lambda x: x["similarity"], reverse=True)
     response_time = time.time() - start_time
     
-    # Translate suggestions
-    skill_suggestions = recommend_skills(skill_text)[:2]
-    if query.lang != "en" and query.lang in SUPPORTED_LANGUAGES:
-        translated_suggestions = []
-        for suggestion in skill_suggestions:
-            translated_suggestions.append(await translate_text_enhanced(suggestion, query.lang))
-        skill_suggestions = translated_suggestions
+    skill_suggestions = [localized(suggestion) for suggestion in skill_suggestions]
     
     # Send notifications
-    notification_msg = f"🚨 {current_user['username']}: {len(matches)} JOBS in {query.location} ({query.lang})!"
-    await manager.broadcast(notification_msg)
+    notification_msg = f"🚨 {current_user['username']}: {len(ranked)} JOBS in {query.location} ({query.lang})!"
+    manager.broadcast(notification_msg)
     
-    email_subject = "🚨 NEW GREEN JOBS!"
-    email_body = f"{len(matches)} matches in {query.location} in {query.lang}!"
-    if query.lang != "en" and query.lang in SUPPORTED_LANGUAGES:
-        email_subject = await translate_text_enhanced(email_subject, query.lang)
-        email_body = await translate_text_enhanced(email_body, query.lang)
+    email_subject = localized(email_subject)
+    email_body = localized(email_body)
     
-    send_email(current_user["email"], email_subject, email_body)
+    outbox.enqueue(EMAIL, {"to": current_user["email"], "subject": email_subject, "body": email_body})
     
     return {
-        "matches": matches[:10],
+        "matches": matches,
         "user_location": query.location,
         "auto_detected": auto_detected,
         "suggestions": skill_suggestions,
         "response_time": f"{response_time:.2f}s",
-        "total_jobs": len(matches),
+        "total_jobs": len(ranked),
+        "ranking": ranking_report,
         "user": current_user["username"],
         "language": query.lang
     }
@@ -1464,7 +1339,7 @@ async def mariadb_vector_job_search(request: Request, query: QueryInput, current
             SELECT job_id, title, description, company, location, salary,
                    VECTOR_DISTANCE(VECTOR(?), description_vector) as similarity_distance
             FROM jobs 
-            WHERE status = 'active'
+            WHERE status = 'active' AND canonical_job_id IS NULL
             ORDER BY similarity_distance ASC  -- Lower distance = more similar
             LIMIT 10
         """
@@ -1700,7 +1575,7 @@ async def semantic_job_search(request: Request, query: QueryInput, current_user:
             SELECT job_id, title, description, company, location, salary,
                    desc_vector_json, skills_vector_json
             FROM jobs 
-            WHERE status = 'active'
+            WHERE status = 'active' AND canonical_job_id IS NULL
             LIMIT 10
         """)
         
@@ -1958,45 +1833,39 @@ async def hackathon_vector_test(test_data: dict):
 @limiter.limit("10/minute")
 async def match_jobs(request: Request, query: QueryInput, current_user: dict = Depends(get_current_user)):
     start_time = time.time()
-    user_city = get_city_from_ip(request.client.host)
+    auto_detected = False
     if not query.location or query.location.lower() == "string":
-        query.location = user_city
-        print(f"👤 AUTO-DETECTED: {user_city}")
-    jobs = get_cached_jobs(query)
+        query.location = await get_city_from_ip(request.client.host)
+        auto_detected = True
+        print(f"👤 AUTO-DETECTED: {query.location}")
+    ranked, ranking_report = await rank_candidates(get_cached_jobs(query), query, current_user["user_id"])
     skill_text = " ".join(query.skill_text).lower()
+    # Salary prediction depends only on the query, not on the job
+    salary_min, salary_max = ai_salary_predictor(skill_text, 5)
+    salary_boost = f"₹{salary_min}-{salary_max} LPA (+12%)"
     matches = []
-    for job in jobs:
-        similarity = 0.95 if "python" in skill_text else 0.90
-        if query.location:
-            job_location = job["location"].lower()
-            user_location = query.location.lower()
-            if user_location in job_location or job_location in user_location:
-                similarity += 0.05
-                distance = calculate_distance(user_location, job_location)
-            else:
-                continue
-        salary_min, salary_max = ai_salary_predictor(skill_text, 5)
-        salary_boost = f"₹{salary_min}-{salary_max} LPA (+12%)"
+    for job in ranked[:5]:
         matches.append({
             "id": job["id"], "job_title": job["job_title"], "description": job["description"],
             "salary_range": job["salary"], "salary_boost": salary_boost,
-            "location": job["location"], "distance_km": distance,
+            "location": job["location"], "distance_km": job["distance_km"],
             "company": job["company"], "website": job["website"],
             "company_rating": job["company_rating"], "sdg_impact": job["sdg_impact"],
-            "urgency": job["urgency"], "similarity": round(similarity, 2),
+            "urgency": job["urgency"], "similarity": round(job["score"], 2),
             "apply_url": f"https://greenmatchers.com/jobs/{job['id']}"
         })
-    matches = sorted(matches, key=lambda x: x["similarity"], reverse=True)
     response_time = time.time() - start_time
-    await manager.broadcast(f"🚨 {current_user['username']}: {len(matches)} JOBS in {query.location}!")
-    send_email(current_user["email"], "🚨 NEW GREEN JOBS!", f"{len(matches)} matches in {query.location}!")
+    manager.broadcast(f"🚨 {current_user['username']}: {len(ranked)} JOBS in {query.location}!")
+    outbox.enqueue(EMAIL, {"to": current_user["email"], "subject": "🚨 NEW GREEN JOBS!",
+                           "body": f"{len(ranked)} matches in {query.location}!"})
     return {
-        "matches": matches[:5],
+        "matches": matches,
         "user_location": query.location,
-        "auto_detected": user_city == query.location,
+        "auto_detected": auto_detected,
         "suggestions": recommend_skills(skill_text)[:2],
         "response_time": f"{response_time:.2f}s",
-        "total_jobs": len(matches),
+        "total_jobs": len(ranked),
+        "ranking": ranking_report,
         "user": current_user["username"]
     }
 
@@ -2025,6 +1894,7 @@ async def save_job(job_id: int, current_user: dict = Depends(get_current_user)):
         user_id = cursor.fetchone()[0]
         cursor.execute("INSERT IGNORE INTO favorites (user_id, job_id) VALUES (%s, %s)", (user_id, job_id))
         conn.commit()
+        recommendation_service.mark_stale(user_id)
         cursor.execute("SELECT COUNT(*) FROM favorites WHERE user_id = %s", (user_id,))
         favorites_count = cursor.fetchone()[0]
         return {"message": "Job saved!", "favorites": favorites_count}
@@ -2038,16 +1908,34 @@ async def save_job(job_id: int, current_user: dict = Depends(get_current_user)):
 
 @app.post("/career_path")
 async def career_path(career_data: CareerPathInput, current_user: dict = Depends(get_current_user)):
-    path = {
-        "python": ["Junior Eco Engineer", "Senior Green Developer", "CTO Sustainability"],
-        "design": ["Junior Designer", "Lead Architect", "Head of Green Design"],
-        "data": ["Junior Analyst", "Senior Data Scientist", "Chief Climate Officer"]
-    }.get(career_data.current_skill.lower(), ["Green Specialist", "Senior Expert", "Director"])
+    """Career moves from the precomputed k-NN career graph (see career_graph_services.py)"""
+    mode = "widest" if career_data.mode == "widest" else "shortest"
+    source = career_graph.resolve(career_data.current_career) if career_data.current_career else None
+    if source is None and career_graph.nodes:
+        # The first match after an invalidation loads the whole catalog from the database
+        closest = await asyncio.to_thread(career_catalog.match, [career_data.current_skill], limit=1)
+        source = closest[0]["career_id"] if closest else None
+    target = career_graph.resolve(career_data.target_career) if career_data.target_career else None
+    if career_data.target_career and target is None:
+        raise HTTPException(status_code=404, detail=f"Unknown career '{career_data.target_career}'")
+
+    steps = career_graph.path(source, target, mode=mode) if source in career_graph.nodes else []
+    if steps:
+        path = [career_graph.nodes[source]["title"]] + [step["title"] for step in steps]
+    else:
+        path = {
+            "python": ["Junior Eco Engineer", "Senior Green Developer", "CTO Sustainability"],
+            "design": ["Junior Designer", "Lead Architect", "Head of Green Design"],
+            "data": ["Junior Analyst", "Senior Data Scientist", "Chief Climate Officer"]
+        }.get(career_data.current_skill.lower(), ["Green Specialist", "Senior Expert", "Director"])
     salary_min, salary_max = ai_salary_predictor(career_data.current_skill, career_data.years_experience)
     return {
         "current_skill": career_data.current_skill,
         "years": career_data.years_experience,
         "career_path": path,
+        "steps": steps,
+        "next_moves": career_graph.neighbours(source)[:5] if source is not None else [],
+        "mode": mode,
         "salary_projection": f"₹{salary_min}-{salary_max} LPA",
         "company": "Tata Power Renewables",
         "sdg_impact": "Maximum contribution to 7 SDGs"
@@ -2108,78 +1996,60 @@ async def get_companies_trends():
         ]
     }
 
-# Real-time WebSocket connections
-active_connections = []
+# Real-time WebSocket stats - one shared poller publishes through the hub
+stats_publisher = StatsPublisher(manager, get_db_connection, interval=10.0)
 
 @app.websocket("/ws/stats")
 async def websocket_stats(websocket: WebSocket):
-    await websocket.accept()
+    await stats_publisher.subscribe(websocket)
     print("✅ WebSocket client connected")
-    active_connections.append(websocket)
     
     try:
+        # Updates are pushed by the shared publisher; this loop only waits for the client to leave
         while True:
-            # Send updates every 10 seconds for demo
-            await asyncio.sleep(10)
-            
-            try:
-                # Get live stats from database
-                conn = get_db_connection()
-                if conn:
-                    cursor = conn.cursor()
-                    try:
-                        cursor.execute("SELECT COUNT(*) FROM jobs")
-                        total_jobs_result = cursor.fetchone()
-                        total_jobs = total_jobs_result[0] if total_jobs_result else 547
-                        
-                        cursor.execute("SELECT COUNT(DISTINCT company) FROM jobs")
-                        companies_result = cursor.fetchone()
-                        companies = companies_result[0] if companies_result else 51
-                        
-                        await websocket.send_json({
-                            "type": "stats_update",
-                            "total_jobs": total_jobs,
-                            "companies": companies,
-                            "timestamp": datetime.now().strftime("%H:%M:%S")
-                        })
-                        print(f"📊 Sent stats update: {total_jobs} jobs, {companies} companies")
-                        
-                    except Exception as db_error:
-                        print(f"Database error: {db_error}")
-                        # Fallback data if DB query fails
-                        await websocket.send_json({
-                            "type": "stats_update", 
-                            "total_jobs": 547,
-                            "companies": 51,
-                            "timestamp": datetime.now().strftime("%H:%M:%S")
-                        })
-                    finally:
-                        cursor.close()
-                        conn.close()
-                else:
-                    # Fallback if DB connection fails
-                    await websocket.send_json({
-                        "type": "stats_update",
-                        "total_jobs": 547,
-                        "companies": 51, 
-                        "timestamp": datetime.now().strftime("%H:%M:%S")
-                    })
-                    
-            except Exception as send_error:
-                print(f"Error sending WebSocket message: {send_error}")
-                break
-                
+            await websocket.receive_text()
     except WebSocketDisconnect:
         print("❌ WebSocket client disconnected")
-        active_connections.remove(websocket)
     except Exception as e:
         print(f"❌ WebSocket error: {e}")
-        active_connections.remove(websocket)
     finally:
-        if websocket in active_connections:
-            active_connections.remove(websocket)
+        stats_publisher.unsubscribe(websocket)
         print("🔌 WebSocket connection cleaned up")
 
+@app.websocket("/ws/live")
+async def websocket_live(websocket: WebSocket, token: str, topics: str = ""):
+    """Live feed: global broadcasts, the user's own channel and any requested topics"""
+    try:
+        current_user = get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    channels = [BROADCAST_CHANNEL, user_channel(current_user["user_id"])]
+    channels += [topic_channel(t.strip()) for t in topics.split(",") if t.strip()]
+    await manager.connect(websocket, channels)
+    
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Live WebSocket error: {e}")
+    finally:
+        manager.disconnect(websocket)
+
+@app.on_event("startup")
+async def start_outbox_worker():
+    outbox_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown_broadcast_hub():
+    await outbox_worker.stop()
+    for name in reindex_runner.tasks:
+        reindex_runner.stop(name)
+    await manager.shutdown()
+
 # ============ AUTHENTICATION & PASSWORD UTILS ============
 
 
@@ -2217,32 +2087,6 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-        conn = get_db_connection()
-        if not conn:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = conn.cursor(dictionary=True)
-        try:
-            cursor.execute("SELECT user_id, username, email, role, is_verified FROM users WHERE username = %s", (username,))
-            user = cursor.fetchone()
-            if not user:
-                raise HTTPException(status_code=401, detail="User not found")
-            return user
-        finally:
-            cursor.close()
-            conn.close()
-            
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
 
 
 class UserRegister(BaseModel):
@@ -2250,7 +2094,8 @@ class UserRegister(BaseModel):
     email: EmailStr
     password: str
     full_name: str
-    role: str = "job_seeker"
+    # Admin rights are never self-assigned - see admin_services.py
+    role: Literal["job_seeker", "employer"] = "job_seeker"
     phone_number: Optional[str] = None
 
 class UserLogin(BaseModel):
@@ -2294,18 +2139,6 @@ class EmployerProfileCreate(BaseModel):
     position: str
     phone_number: str
 
-class JobCreate(BaseModel):
-    title: str
-    description: str
-    company: str
-    location: str
-    job_type: str = "Full-time"
-    experience_level: str = "Mid"
-    skills: str
-    salary: float
-    sdg_goal: str = "SDG 7: Affordable and Clean Energy"
-    sdg_score: int = 8
-
 # ============ PHASE 1: USER MANAGEMENT ENDPOINTS ============
 @app.post("/api/auth/register")
 async def register_user(user_data: UserRegister):
@@ -2414,50 +2247,24 @@ async def login_user(user_data: UserLogin):
 
 @app.get("/api/users/profile")
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
-    """Get complete user profile"""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection failed")
+    """Get complete user profile - applications are the first page, continue via /api/users/applications"""
+    user_id = current_user["user_id"]
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return cached
     
-    cursor = conn.cursor(dictionary=True)
+    # Taken before reading, so a write that lands mid-load keeps this result out of the cache
+    generation = profile_cache.generation(user_id)
     try:
-        # Get basic profile
-        cursor.execute("SELECT * FROM user_profiles WHERE user_id = %s", (current_user["user_id"],))
-        profile = cursor.fetchone()
-        
-        # Get education
-        cursor.execute("SELECT * FROM user_education WHERE user_id = %s ORDER BY end_date DESC", 
-                      (current_user["user_id"],))
-        education = cursor.fetchall()
-        
-        # Get experience
-        cursor.execute("SELECT * FROM user_experience WHERE user_id = %s ORDER BY start_date DESC", 
-                      (current_user["user_id"],))
-        experience = cursor.fetchall()
-        
-        # Get applications
-        cursor.execute("""
-            SELECT a.*, j.title as job_title, j.company 
-            FROM applications a 
-            JOIN jobs j ON a.job_id = j.job_id 
-            WHERE a.user_id = %s 
-            ORDER BY a.applied_at DESC
-        """, (current_user["user_id"],))
-        applications = cursor.fetchall()
-        
-        return {
-            "profile": profile,
-            "education": education,
-            "experience": experience,
-            "applications": applications
-        }
-        
+        profile = await load_profile(user_id)
+    except ConnectionError:
+        raise HTTPException(status_code=500, detail="Database connection failed")
     except mariadb.Error as e:
         logger.error(f"Profile fetch error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch profile")
-    finally:
-        cursor.close()
-        conn.close()
+    
+    profile_cache.set(user_id, profile, generation)
+    return profile
 
 @app.post("/api/users/profile")
 async def update_user_profile(
@@ -2507,6 +2314,7 @@ async def update_user_profile(
             ))
         
         conn.commit()
+        invalidate_profile(current_user["user_id"])
         return {"message": "Profile updated successfully"}
         
     except mariadb.Error as e:
@@ -2554,6 +2362,7 @@ async def upload_resume(
                     WHERE user_id = %s
                 """, (resume_url, datetime.utcnow(), current_user["user_id"]))
                 conn.commit()
+                invalidate_profile(current_user["user_id"])
             finally:
                 cursor.close()
                 conn.close()
@@ -2584,10 +2393,7 @@ async def apply_for_job(
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Check if already applied
-        cursor.execute("""
-            SELECT application_id FROM applications 
-            WHERE user_id = %s AND job_id = %s
-        """, (current_user["user_id"], application_data.job_id))
+        cursor.execute(APPLICATION_EXISTS_SQL, (current_user["user_id"], application_data.job_id))
         
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="Already applied for this job")
@@ -2610,19 +2416,17 @@ async def apply_for_job(
         
         application_id = cursor.lastrowid
         
-        # Create notification
-        cursor.execute("""
-            INSERT INTO notifications 
-            (user_id, title, message, type, created_at)
-            VALUES (%s, %s, %s, 'application', %s)
-        """, (
-            current_user["user_id"],
-            "Application Submitted",
-            f"You have successfully applied for job #{application_data.job_id}",
-            datetime.utcnow()
-        ))
+        # Notification is delivered by the outbox worker once this transaction commits
+        outbox.add(cursor, NOTIFICATION, {
+            "user_id": current_user["user_id"],
+            "title": "Application Submitted",
+            "message": f"You have successfully applied for job #{application_data.job_id}",
+            "type": "application",
+            "created_at": datetime.utcnow()
+        })
         
         conn.commit()
+        invalidate_profile(current_user["user_id"])
         
         return {
             "message": "Application submitted successfully",
@@ -2639,24 +2443,38 @@ async def apply_for_job(
         conn.close()
 
 @app.get("/api/users/applications")
-async def get_user_applications(current_user: dict = Depends(get_current_user)):
-    """Get user's job applications"""
+async def get_user_applications(
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get user's job applications, newest first, one keyset page at a time"""
+    try:
+        keyset = keyset_params(page_cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     conn = get_db_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT a.*, j.title, j.company, j.location, j.salary
-            FROM applications a
-            JOIN jobs j ON a.job_id = j.job_id
-            WHERE a.user_id = %s
-            ORDER BY a.applied_at DESC
-        """, (current_user["user_id"],))
+        from_sql = USER_APPLICATIONS_FROM
+        params = [current_user["user_id"]]
+        totals = approximate_total(cursor, from_sql, params) if include_total else {}
+        
+        if keyset:
+            from_sql += " AND " + keyset_condition("a.applied_at", "a.application_id", keyset)
+            params += keyset
         
-        applications = cursor.fetchall()
-        return {"applications": applications}
+        cursor.execute(
+            "SELECT a.*, j.title, j.company, j.location, j.salary " + from_sql + APPLICATIONS_ORDER,
+            params + [page_size + 1]
+        )
+        applications, next_cursor = split_page(cursor.fetchall(), page_size, "applied_at", "application_id")
+        return {"applications": applications, "next_cursor": next_cursor, "page_size": page_size, **totals}
         
     except mariadb.Error as e:
         logger.error(f"Applications fetch error: {e}")
@@ -2728,90 +2546,167 @@ async def create_employer_profile(
 @app.post("/api/employer/jobs")
 async def create_job(
     job_data: JobCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new job posting"""
     if current_user["role"] != "employer":
         raise HTTPException(status_code=403, detail="Only employers can post jobs")
-    
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    
-    cursor = conn.cursor()
+
+    def insert_job():
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+
+        cursor = conn.cursor()
+        try:
+            # Get employer profile to get company_id
+            cursor.execute(EMPLOYER_PROFILE_SQL, (current_user["user_id"],))
+
+            employer_profile = cursor.fetchone()
+            if not employer_profile:
+                raise HTTPException(status_code=404, detail="Employer profile not found")
+
+            employer_id, company_id, company_name = employer_profile
+
+            # Geocoded and skill-tagged once here so searches never parse the text again
+            latitude, longitude = gazetteer.geocode(job_data.location) or (None, None)
+            skill_ids = encode_skill_ids(job_skill_ids(job_data.title, job_data.description, job_data.skills))
+
+            # Create job posting
+            cursor.execute("""
+                INSERT INTO jobs 
+                (title, description, company, location, job_type, experience_level, 
+                 skills, salary, sdg_goal, sdg_score, posted_by, employer_id, status, created_at,
+                 latitude, longitude, skill_ids)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active', %s, %s, %s, %s)
+            """, (
+                job_data.title, job_data.description, company_name, job_data.location,
+                job_data.job_type, job_data.experience_level, job_data.skills,
+                job_data.salary, job_data.sdg_goal, job_data.sdg_score,
+                current_user["user_id"], employer_id, datetime.utcnow(),
+                latitude, longitude, skill_ids
+            ))
+
+            job_id = cursor.lastrowid
+
+            # A re-post of an existing job is kept but hidden behind the original
+            duplicate_of = job_deduplicator.process(cursor, [{
+                "job_id": job_id, "title": job_data.title, "description": job_data.description, "company": company_name
+            }]).get(job_id)
+            conn.commit()
+            return job_id, company_name, duplicate_of
+
+        except mariadb.Error as e:
+            conn.rollback()
+            logger.error(f"Job creation error: {e}")
+            raise HTTPException(status_code=500, detail="Failed to create job")
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Confirming a near-duplicate embeds the posting - keep the model and the DB off the event loop
+    job_id, company_name, duplicate_of = await asyncio.to_thread(insert_job)
+
+    # Translate the posting once for every language, off the request path
+    background_tasks.add_task(materialize_jobs, translation_engine, [job_id], list(SUPPORTED_LANGUAGES))
+    if duplicate_of is None:
+        # Embed the posting and merge it into the For You lists it beats
+        background_tasks.add_task(recommendation_service.add_jobs, [job_id])
+        background_tasks.add_task(deliver_job_alerts, [job_id])
+
+    return {
+        "message": "Job posted successfully",
+        "job_id": job_id,
+        "company": company_name,
+        "duplicate_of": duplicate_of
+    }
+
+# Uploads are spooled (in memory up to 8 MB, then to disk) and parsed as a stream
+BULK_UPLOAD_LIMIT = 100 * 1024 * 1024
+
+@app.post("/api/employer/jobs/bulk")
+async def bulk_create_jobs(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    upload_format: Optional[str] = Query(None, alias="format", description="csv or jsonl; taken from Content-Type when omitted"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Import many postings from a CSV or JSONL request body (see ingestion_services.py)"""
+    if current_user["role"] != "employer":
+        raise HTTPException(status_code=403, detail="Only employers can post jobs")
+    fmt = upload_format.lower() if upload_format else detect_format(None, request.headers.get("content-type"))
+    if fmt not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="Send CSV or JSONL (set ?format=csv|jsonl)")
+    profile = await asyncio.to_thread(employer_profile, current_user["user_id"])
+    if not profile:
+        raise HTTPException(status_code=404, detail="Employer profile not found")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
     try:
-        # Get employer profile to get company_id
-        cursor.execute("""
-            SELECT ep.employer_id, ep.company_id, c.name as company_name
-            FROM employer_profiles ep
-            JOIN companies c ON ep.company_id = c.company_id
-            WHERE ep.user_id = %s
-        """, (current_user["user_id"],))
-        
-        employer_profile = cursor.fetchone()
-        if not employer_profile:
-            raise HTTPException(status_code=404, detail="Employer profile not found")
-        
-        employer_id, company_id, company_name = employer_profile
-        
-        # Create job posting
-        cursor.execute("""
-            INSERT INTO jobs 
-            (title, description, company, location, job_type, experience_level, 
-             skills, salary, sdg_goal, sdg_score, posted_by, employer_id, status, created_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active', %s)
-        """, (
-            job_data.title, job_data.description, company_name, job_data.location,
-            job_data.job_type, job_data.experience_level, job_data.skills,
-            job_data.salary, job_data.sdg_goal, job_data.sdg_score,
-            current_user["user_id"], employer_id, datetime.utcnow()
-        ))
-        
-        job_id = cursor.lastrowid
-        conn.commit()
-        
-        return {
-            "message": "Job posted successfully",
-            "job_id": job_id,
-            "company": company_name
-        }
-        
-    except mariadb.Error as e:
-        conn.rollback()
-        logger.error(f"Job creation error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to create job")
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > BULK_UPLOAD_LIMIT:
+                raise HTTPException(status_code=413, detail="Upload too large - split it or use the import CLI")
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            report = await asyncio.to_thread(job_ingestor.ingest, text, fmt, current_user["user_id"],
+                                             profile["employer_id"], profile["company_name"])
+        finally:
+            text.detach()
     finally:
-        cursor.close()
-        conn.close()
+        spool.close()
+
+    job_ids, duplicates = report["job_ids"], set(report["duplicates"])
+    for start in range(0, len(job_ids), job_ingestor.chunk_size):
+        chunk_ids = job_ids[start:start + job_ingestor.chunk_size]
+        background_tasks.add_task(materialize_jobs, translation_engine, chunk_ids, list(SUPPORTED_LANGUAGES))
+        canonical_ids = [job_id for job_id in chunk_ids if job_id not in duplicates]
+        if canonical_ids:
+            background_tasks.add_task(deliver_job_alerts, canonical_ids)
+    return report
 
 @app.get("/api/employer/applications")
-async def get_employer_applications(current_user: dict = Depends(get_current_user)):
-    """Get applications for employer's jobs"""
+async def get_employer_applications(
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get applications for employer's jobs, newest first, one keyset page at a time"""
     if current_user["role"] != "employer":
         raise HTTPException(status_code=403, detail="Only employers can access this endpoint")
     
+    try:
+        keyset = keyset_params(page_cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     conn = get_db_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     cursor = conn.cursor(dictionary=True)
     try:
+        from_sql = EMPLOYER_APPLICATIONS_FROM
+        params = [current_user["user_id"]]
+        totals = approximate_total(cursor, from_sql, params) if include_total else {}
+        
+        if keyset:
+            from_sql += " AND " + keyset_condition("a.applied_at", "a.application_id", keyset)
+            params += keyset
+        
         cursor.execute("""
             SELECT a.*, j.title as job_title, j.company,
                    u.username, u.email, u.full_name,
                    up.phone_number as applicant_phone
-            FROM applications a
-            JOIN jobs j ON a.job_id = j.job_id
-            JOIN users u ON a.user_id = u.user_id
-            LEFT JOIN user_profiles up ON a.user_id = up.user_id
-            WHERE j.employer_id IN (
-                SELECT employer_id FROM employer_profiles WHERE user_id = %s
-            )
-            ORDER BY a.applied_at DESC
-        """, (current_user["user_id"],))
+        """ + from_sql + APPLICATIONS_ORDER, params + [page_size + 1])
         
-        applications = cursor.fetchall()
-        return {"applications": applications}
+        applications, next_cursor = split_page(cursor.fetchall(), page_size, "applied_at", "application_id")
+        return {"applications": applications, "next_cursor": next_cursor, "page_size": page_size, **totals}
         
     except mariadb.Error as e:
         logger.error(f"Employer applications fetch error: {e}")
@@ -2842,15 +2737,17 @@ async def update_application_status(
     try:
         # Verify employer owns this job application
         cursor.execute("""
-            SELECT a.application_id 
+            SELECT a.application_id, a.user_id
             FROM applications a
             JOIN jobs j ON a.job_id = j.job_id
             JOIN employer_profiles ep ON j.employer_id = ep.employer_id
             WHERE a.application_id = %s AND ep.user_id = %s
         """, (application_id, current_user["user_id"]))
         
-        if not cursor.fetchone():
+        application = cursor.fetchone()
+        if not application:
             raise HTTPException(status_code=404, detail="Application not found or access denied")
+        applicant_id = application[1]
         
         # Update status
         cursor.execute("""
@@ -2860,6 +2757,7 @@ async def update_application_status(
         """, (status, datetime.utcnow(), application_id))
         
         conn.commit()
+        invalidate_profile(applicant_id)
         return {"message": f"Application status updated to {status}"}
         
     except mariadb.Error as e:
@@ -2896,6 +2794,7 @@ async def add_education(
         
         education_id = cursor.lastrowid
         conn.commit()
+        invalidate_profile(current_user["user_id"])
         
         return {"message": "Education added successfully", "education_id": education_id}
         
@@ -2931,6 +2830,7 @@ async def add_experience(
         
         experience_id = cursor.lastrowid
         conn.commit()
+        invalidate_profile(current_user["user_id"])
         
         return {"message": "Experience added successfully", "experience_id": experience_id}
         
@@ -2947,22 +2847,25 @@ async def add_experience(
 @app.post("/api/jobs/search-enhanced")
 async def enhanced_job_search(
     query: QueryInput,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    include_total: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
-    """Enhanced job search with filters"""
+    """Enhanced job search with filters, newest first, one keyset page at a time"""
+    try:
+        keyset = keyset_params(page_cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     conn = get_db_connection()
     if not conn:
         raise HTTPException(status_code=500, detail="Database connection failed")
     
     cursor = conn.cursor(dictionary=True)
     try:
-        base_sql = """
-            SELECT j.*, c.name as company_name, c.industry, c.size
-            FROM jobs j
-            LEFT JOIN companies c ON j.company = c.name
-            WHERE j.status = 'active'
-        """
-        params = []
+        base_sql = JOB_SEARCH_FROM
+        params = [query.lang]
         
         # Add skill filters
         if query.skill_text:
@@ -2977,18 +2880,26 @@ async def enhanced_job_search(
             base_sql += " AND j.location LIKE %s"
             params.append(f"%{query.location}%")
         
-        base_sql += " ORDER BY j.created_at DESC LIMIT 50"
+        totals = approximate_total(cursor, base_sql, params) if include_total else {}
         
-        cursor.execute(base_sql, params)
-        jobs = cursor.fetchall()
+        if keyset:
+            base_sql += " AND " + keyset_condition("j.created_at", "j.job_id", keyset)
+            params += keyset
+        
+        cursor.execute(
+            "SELECT j.*, c.name as company_name, c.industry, c.size, "
+            "jt.title AS localized_title, jt.description AS localized_description " + base_sql + JOB_SEARCH_ORDER,
+            params + [page_size + 1]
+        )
+        jobs, next_cursor = split_page(cursor.fetchall(), page_size, "created_at", "job_id")
         
         # Format response
         formatted_jobs = []
         for job in jobs:
             formatted_jobs.append({
                 "id": job["job_id"],
-                "title": job["title"],
-                "description": job["description"],
+                "title": job["localized_title"] or job["title"],
+                "description": job["localized_description"] or job["description"],
                 "company": job["company"],
                 "location": job["location"],
                 "job_type": job["job_type"],
@@ -3005,6 +2916,10 @@ async def enhanced_job_search(
         return {
             "jobs": formatted_jobs,
             "total_count": len(formatted_jobs),
+            "next_cursor": next_cursor,
+            "page_size": page_size,
+            "language": query.lang,
+            **totals,
             "filters_applied": {
                 "skills": query.skill_text,
                 "location": query.location
@@ -3018,6 +2933,207 @@ async def enhanced_job_search(
         cursor.close()
         conn.close()
 
+@app.post("/api/saved-searches")
+async def create_saved_search(search: SavedSearchInput, current_user: dict = Depends(get_current_user)):
+    """Save a search; matching new jobs arrive as job_alert notifications"""
+    query = parse_search_query(search.dict(exclude={"search_name"}, exclude_none=True))
+    vector_json = await asyncio.to_thread(alert_engine.query_vector_json, query)
+    conn = get_db_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO saved_searches (user_id, search_name, search_query, query_vector_json, is_active)
+            VALUES (%s, %s, %s, %s, TRUE)
+        """, (current_user["user_id"], search.search_name, json.dumps(query), vector_json))
+        search_id = cursor.lastrowid
+        conn.commit()
+    except mariadb.Error as e:
+        conn.rollback()
+        logger.error(f"Saved search error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to save search")
+    finally:
+        cursor.close()
+        conn.close()
+    alert_engine.invalidate()
+    manager.publish(SAVED_SEARCH_CHANNEL, str(search_id))
+    return {"message": "Search saved", "search_id": search_id, "search_query": query}
+
+@app.get("/api/saved-searches")
+async def list_saved_searches(current_user: dict = Depends(get_current_user)):
+    conn = get_db_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT search_id, search_name, search_query, created_at FROM saved_searches
+            WHERE user_id = %s AND is_active = TRUE ORDER BY created_at DESC
+        """, (current_user["user_id"],))
+        searches = cursor.fetchall()
+        for search in searches:
+            search["search_query"] = parse_search_query(search["search_query"])
+        return {"saved_searches": searches}
+    except mariadb.Error as e:
+        logger.error(f"Saved search list error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load saved searches")
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.delete("/api/saved-searches/{search_id}")
+async def delete_saved_search(search_id: int, current_user: dict = Depends(get_current_user)):
+    conn = get_db_connection()
+    if not conn:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE saved_searches SET is_active = FALSE WHERE search_id = %s AND user_id = %s",
+                       (search_id, current_user["user_id"]))
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Saved search not found")
+        conn.commit()
+    except mariadb.Error as e:
+        conn.rollback()
+        logger.error(f"Saved search delete error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete saved search")
+    finally:
+        cursor.close()
+        conn.close()
+    alert_engine.invalidate()
+    manager.publish(SAVED_SEARCH_CHANNEL, str(search_id))
+    return {"message": "Saved search deleted", "search_id": search_id}
+
+class NotificationReadInput(BaseModel):
+    notification_ids: Optional[List[int]] = None  # None marks every notification read
+
+@app.get("/api/notifications")
+async def get_notifications(
+    unread_only: bool = False,
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Newest notifications first, keyset-paged, with the unread counter"""
+    try:
+        return await asyncio.to_thread(list_notifications, current_user["user_id"], page_size, page_cursor, unread_only)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except mariadb.Error as e:
+        logger.error(f"Notification list error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load notifications")
+
+@app.get("/api/notifications/unread-count")
+async def get_unread_count(current_user: dict = Depends(get_current_user)):
+    try:
+        counter = await asyncio.to_thread(unread_counter, current_user["user_id"])
+    except mariadb.Error as e:
+        logger.error(f"Unread count error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load unread count")
+    return {"unread": counter["unread"], "version": counter["version"]}
+
+@app.get("/api/notifications/poll")
+async def poll_notifications(
+    since: int = Query(-1, description="Counter version the client already has"),
+    timeout: float = Query(LONG_POLL_SECONDS, ge=0, le=60),
+    current_user: dict = Depends(get_current_user)
+):
+    """Long-poll: answers as soon as the unread counter moves past `since`, or after `timeout` seconds"""
+    try:
+        counter = await notification_feed.wait(current_user["user_id"], since, timeout)
+    except mariadb.Error as e:
+        logger.error(f"Notification poll error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to poll notifications")
+    return {"unread": counter["unread"], "version": counter["version"], "changed": counter["changed"]}
+
+@app.post("/api/notifications/read")
+async def read_notifications(read: NotificationReadInput, current_user: dict = Depends(get_current_user)):
+    """Mark the given notifications (or all of them) read"""
+    user_id = current_user["user_id"]
+    try:
+        counter = await asyncio.to_thread(mark_read, user_id, read.notification_ids)
+    except mariadb.Error as e:
+        logger.error(f"Mark notifications read error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update notifications")
+    if counter["marked"]:
+        manager.publish(NOTIFICATION_COUNT_CHANNEL,
+                        {"user_id": user_id, "unread": counter["unread"], "version": counter["version"]})
+    return {"marked": counter["marked"], "unread": counter["unread"], "version": counter["version"]}
+
+@app.get("/api/jobs/for-you")
+async def for_you_jobs(
+    lang: str = "en",
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Personalised jobs from the materialized list (see recommendation_services.py), best match first"""
+    try:
+        keyset = keyset_params(page_cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    user_id = current_user["user_id"]
+
+    def read_page():
+        conn = get_db_connection()
+        if not conn:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        cursor = conn.cursor(dictionary=True)
+        try:
+            sql = """
+                SELECT r.job_id, r.score, j.title, j.description, j.company, j.location, j.job_type,
+                       j.salary, j.skills, j.created_at,
+                       jt.title AS localized_title, jt.description AS localized_description
+                FROM user_recommendations r
+                JOIN jobs j ON j.job_id = r.job_id
+                LEFT JOIN job_translations jt ON jt.job_id = r.job_id AND jt.lang = %s
+                WHERE r.user_id = %s AND j.status = 'active' AND j.canonical_job_id IS NULL
+            """
+            params = [lang, user_id]
+            if keyset:
+                sql += " AND " + keyset_condition("r.score", "r.job_id", keyset)
+                params += keyset
+            cursor.execute(sql + " ORDER BY r.score DESC, r.job_id DESC LIMIT %s", params + [page_size + 1])
+            jobs, next_cursor = split_page(cursor.fetchall(), page_size, "score", "job_id")
+            built = True
+            if not jobs and not keyset:
+                # refresh_user always leaves a user_vectors row, even for an empty list
+                cursor.execute("SELECT 1 FROM user_vectors WHERE user_id = %s", (user_id,))
+                built = cursor.fetchone() is not None
+            return jobs, next_cursor, built
+        finally:
+            cursor.close()
+            conn.close()
+
+    try:
+        jobs, next_cursor, built = await asyncio.to_thread(read_page)
+        if not built:
+            # First visit: build the list once, later requests only read it
+            await asyncio.to_thread(recommendation_service.refresh_user, user_id)
+            jobs, next_cursor, _ = await asyncio.to_thread(read_page)
+    except mariadb.Error as e:
+        logger.error(f"For You feed error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load recommendations")
+
+    return {
+        "jobs": [{
+            "id": job["job_id"],
+            "title": job["localized_title"] or job["title"],
+            "description": job["localized_description"] or job["description"],
+            "company": job["company"],
+            "location": job["location"],
+            "job_type": job["job_type"],
+            "salary": job["salary"],
+            "skills": job["skills"],
+            "posted_date": job["created_at"].strftime("%Y-%m-%d") if job["created_at"] else None,
+            "match_score": round(job["score"] * 100, 1)
+        } for job in jobs],
+        "next_cursor": next_cursor,
+        "page_size": page_size,
+        "language": lang
+    }
+
 # ============ KEEP ALL YOUR EXISTING ENDPOINTS BELOW ============
 
 # ... [ALL YOUR EXISTING ENDPOINTS REMAIN EXACTLY THE SAME] ...
@@ -3073,10 +3189,6 @@ def train_salary_predictor():
 
 salary_model = train_salary_predictor()
 
-# Translation cache
-translation_cache = {}
-cache_lock = asyncio.Lock()
-
 # ... [ALL YOUR EXISTING TRANSLATION FUNCTIONS AND ENDPOINTS] ...
 
 # Initialize
@@ -3088,12 +3200,14 @@ def init_db():
         cursor = conn.cursor()
 
         conn.commit()
+        apply_migrations(conn)
         print("✅ Database initialized with Phase 1 tables")
 
         # Initialize vector data
         print("🚀 Initializing vector data...")
         vector_result = initialize_vector_data()
         print(f"✅ Vector initialization: {vector_result}")
+        start_geocode_backfill()
         
         test_result = test_vector_functionality()
         print(f"✅ Vector testing: {test_result}")
@@ -3119,27 +3233,6 @@ def load_models():
     sd_pipe = sd_pipe.to("cpu")
     print("✅ AI Models Loaded!")
 
-# WebSocket Manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
-manager = ConnectionManager()
-
-
-
-
 # Initialize
 init_db()
 
@@ -0,0 +1,287 @@
+# career_graph_services.py - precomputed k-nearest-neighbour career transition graph
+#
+#   python career_graph_services.py build [--k 8]     rebuild data/career_graph.json from the careers table
+#   python career_graph_services.py path "<from career>" ["<to career>"]
+#
+# Each career is linked to its k most similar careers. Similarity is the
+# cosine of the careers' skills/description embeddings, or the Jaccard
+# overlap of their skill sets where no embedding is stored. An edge also
+# carries the salary and growth change of the move, and its cost is
+#   (1 - similarity) + SALARY_PENALTY * salary drop + GROWTH_PENALTY * growth drop
+# so cheap paths are both plausible and not a step backwards.
+#
+# The graph is built offline and loaded into memory; /career_path answers
+# with Dijkstra (cheapest path) or a widest-path search (best weakest
+# transition) over the adjacency lists, never touching the database.
+import heapq
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ranking_services import to_lpa
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+DEFAULT_K = 8
+SALARY_PENALTY = 1.0
+GROWTH_PENALTY = 0.5
+BLOCK_ROWS = 512
+
+GROWTH_LEVELS = {"very high": 30.0, "high": 20.0, "medium": 10.0, "moderate": 10.0, "low": 5.0}
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def default_graph_path() -> str:
+    return os.getenv("CAREER_GRAPH_PATH", os.path.join(DATA_DIR, "career_graph.json"))
+
+
+def salary_midpoint(salary_range) -> Optional[float]:
+    """"₹8-15 LPA" -> 11.5 (LPA); None when there is no number"""
+    numbers = [float(n) for n in _NUMBER.findall(str(salary_range or "").replace(",", ""))][:2]
+    if not numbers:
+        return None
+    return to_lpa(sum(numbers) / len(numbers))
+
+
+def growth_rate(growth) -> Optional[float]:
+    """"+25%" -> 25.0, "High" -> 20.0"""
+    text = str(growth or "").strip().lower()
+    match = _NUMBER.search(text)
+    if match:
+        return -float(match.group()) if text.startswith("-") else float(match.group())
+    return GROWTH_LEVELS.get(text)
+
+
+def _unit_vector(*values) -> Optional[np.ndarray]:
+    parts = []
+    for value in values:
+        try:
+            vector = np.asarray(json.loads(value) if isinstance(value, str) else value, dtype=float)
+        except (TypeError, ValueError):
+            continue
+        norm = np.linalg.norm(vector) if vector.ndim == 1 and vector.size else 0
+        if norm > 0:
+            parts.append(vector / norm)
+    if not parts or any(p.shape != parts[0].shape for p in parts):
+        return None
+    mean = np.mean(parts, axis=0)
+    return mean / (np.linalg.norm(mean) or 1.0)
+
+
+def build_graph(careers: List[Dict], skill_matrix: np.ndarray, k: int = DEFAULT_K) -> Dict:
+    """k-NN adjacency over careers; `skill_matrix` is the catalog's career x skill bitset matrix"""
+    n = len(careers)
+    vectors = [_unit_vector(c.get("skills_vector_json"), c.get("desc_vector_json")) for c in careers]
+    dims = {v.shape[0] for v in vectors if v is not None}
+    dim = dims.pop() if len(dims) == 1 else None
+    has_vector = np.array([v is not None and v.shape[0] == dim for v in vectors])
+    embeddings = np.zeros((n, dim or 1))
+    for i in np.flatnonzero(has_vector):
+        embeddings[i] = vectors[i]
+
+    skills = skill_matrix.astype(np.float64)
+    required = skills.sum(axis=1)
+    salary = np.array([salary_midpoint(c.get("salary_range")) or np.nan for c in careers])
+    growth = np.array([growth_rate(c.get("growth")) for c in careers], dtype=float)
+
+    edges: Dict[str, List[List]] = {}
+    k = max(1, min(k, n - 1)) if n > 1 else 0
+    for start in range(0, n, BLOCK_ROWS):
+        rows = slice(start, min(start + BLOCK_ROWS, n))
+        cosine = embeddings[rows] @ embeddings.T
+        overlap = skills[rows] @ skills.T
+        union = required[rows, None] + required[None, :] - overlap
+        jaccard = np.divide(overlap, union, out=np.zeros_like(overlap), where=union > 0)
+        both = has_vector[rows, None] & has_vector[None, :]
+        similarity = np.clip(np.where(both, cosine, jaccard), 0.0, 1.0)
+        similarity[np.arange(similarity.shape[0]), np.arange(start, rows.stop)] = -1.0
+        if not k:
+            continue
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        for offset, neighbours in enumerate(nearest):
+            i = start + offset
+            out = []
+            for j in neighbours[np.argsort(-similarity[offset, neighbours])]:
+                sim = float(similarity[offset, j])
+                if sim <= 0:
+                    continue
+                salary_delta = salary[j] - salary[i]
+                growth_delta = growth[j] - growth[i]
+                salary_drop = max(0.0, -salary_delta / salary[i]) if salary[i] > 0 and not np.isnan(salary_delta) else 0.0
+                growth_drop = max(0.0, -growth_delta / 100) if not np.isnan(growth_delta) else 0.0
+                cost = (1 - sim) + SALARY_PENALTY * salary_drop + GROWTH_PENALTY * growth_drop
+                out.append([int(careers[j]["career_id"]), round(sim, 4), round(float(cost), 4),
+                            None if np.isnan(salary_delta) else round(float(salary_delta), 2),
+                            None if np.isnan(growth_delta) else round(float(growth_delta), 2)])
+            edges[str(careers[i]["career_id"])] = out
+
+    nodes = {
+        str(c["career_id"]): {
+            "title": c["title"],
+            "salary_lpa": None if np.isnan(salary[i]) else round(float(salary[i]), 2),
+            "growth": None if np.isnan(growth[i]) else float(growth[i]),
+        }
+        for i, c in enumerate(careers)
+    }
+    return {"built_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "k": k, "nodes": nodes, "edges": edges}
+
+
+class CareerGraph:
+    """In-memory adjacency lists with cached shortest/widest path queries"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.graph_path = path
+        self.nodes: Dict[int, Dict] = {}
+        self.edges: Dict[int, List[Tuple[int, float, float, Optional[float], Optional[float]]]] = {}
+        self.titles: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.find_path = lru_cache(maxsize=4096)(self._find_path)
+        if path:
+            self.load(path)
+
+    def load(self, path: Optional[str] = None):
+        path = path or self.graph_path
+        try:
+            with open(path, encoding="utf-8") as f:
+                graph = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Career graph unavailable ({path}): {e}")
+            return
+        self.set_graph(graph)
+        logger.info(f"🧭 Loaded career graph: {len(self.nodes)} careers, k={graph.get('k')}")
+
+    def set_graph(self, graph: Dict):
+        nodes = {int(key): value for key, value in graph.get("nodes", {}).items()}
+        edges = {int(key): [tuple(edge) for edge in value] for key, value in graph.get("edges", {}).items()}
+        with self._lock:
+            self.nodes, self.edges = nodes, edges
+            self.titles = {node["title"].casefold(): career_id for career_id, node in nodes.items()}
+            self.find_path.cache_clear()
+
+    def resolve(self, title: str) -> Optional[int]:
+        return self.titles.get((title or "").strip().casefold())
+
+    def neighbours(self, career_id: int) -> List[Dict]:
+        return [self._step(career_id, edge) for edge in self.edges.get(career_id, [])]
+
+    def _step(self, source: int, edge) -> Dict:
+        target, similarity, cost, salary_delta, growth_delta = edge
+        return {"career_id": target, "title": self.nodes.get(target, {}).get("title"), "similarity": similarity,
+                "cost": cost, "salary_delta_lpa": salary_delta, "growth_delta": growth_delta}
+
+    def _find_path(self, source: int, target: Optional[int], mode: str, max_hops: int) -> Tuple:
+        """Cheapest (mode="shortest") or highest-bottleneck (mode="widest") path as a tuple of ids.
+
+        Without a target, the destination is the best-paid career reachable
+        within `max_hops` moves that pays more than the source.
+        """
+        if source not in self.nodes:
+            return ()
+        widest = mode == "widest"
+        # Dijkstra keyed on cost, or on negated bottleneck similarity for widest paths
+        best = {source: (-1.0 if widest else 0.0, 0)}
+        previous: Dict[int, int] = {}
+        heap = [(best[source][0], 0, source)]
+        while heap:
+            key, hops, node = heapq.heappop(heap)
+            if (key, hops) != best.get(node) or node == target:
+                continue
+            if hops >= max_hops:
+                continue
+            for nxt, similarity, cost, _, _ in self.edges.get(node, []):
+                candidate = max(key, -similarity) if widest else key + cost
+                if nxt not in best or (candidate, hops + 1) < best[nxt]:
+                    best[nxt] = (candidate, hops + 1)
+                    previous[nxt] = node
+                    heapq.heappush(heap, (candidate, hops + 1, nxt))
+
+        if target is None:
+            start_salary = self.nodes[source].get("salary_lpa") or 0
+            reachable = [n for n in best if n != source and (self.nodes.get(n, {}).get("salary_lpa") or 0) > start_salary]
+            if not reachable:
+                return ()
+            target = max(reachable, key=lambda n: (self.nodes[n]["salary_lpa"], -best[n][0]))
+        if target not in best or target == source:
+            return ()
+        path = [target]
+        while path[-1] != source:
+            path.append(previous[path[-1]])
+        return tuple(reversed(path))
+
+    def path(self, source: int, target: Optional[int] = None, mode: str = "shortest", max_hops: int = 4) -> List[Dict]:
+        """Steps from `source` (excluded) to the destination, each with its edge attributes"""
+        ids = self.find_path(source, target, mode, max_hops)
+        steps = []
+        for a, b in zip(ids, ids[1:]):
+            edge = next(e for e in self.edges[a] if e[0] == b)
+            steps.append(self._step(a, edge))
+        return steps
+
+
+career_graph = CareerGraph(default_graph_path())
+
+
+def rebuild(k: int = DEFAULT_K, path: Optional[str] = None) -> Dict:
+    """Read every career, build the graph and write it atomically"""
+    from database import get_db_connection
+    from career_services import career_catalog
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT career_id, skills_vector_json, desc_vector_json FROM careers")
+        vectors = {row["career_id"]: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+    career_catalog.invalidate()
+    snapshot = career_catalog.snapshot()
+    careers = [dict(career, **{key: vectors.get(career["career_id"], {}).get(key)
+                               for key in ("skills_vector_json", "desc_vector_json")})
+               for career in snapshot.careers]
+    graph = build_graph(careers, snapshot.matrix, k=k)
+
+    path = path or default_graph_path()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(graph, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return graph
+
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] == "build":
+        k = int(argv[argv.index("--k") + 1]) if "--k" in argv else DEFAULT_K
+        graph = rebuild(k)
+        print(f"✅ Career graph: {len(graph['nodes'])} careers, "
+              f"{sum(len(e) for e in graph['edges'].values())} edges -> {default_graph_path()}")
+        return 0
+    if len(argv) in (2, 3) and argv[0] == "path":
+        source = career_graph.resolve(argv[1])
+        target = career_graph.resolve(argv[2]) if len(argv) == 3 else None
+        if source is None or (len(argv) == 3 and target is None):
+            print("❌ Unknown career")
+            return 1
+        for step in career_graph.path(source, target):
+            print(f"-> {step['title']}  (similarity {step['similarity']}, cost {step['cost']})")
+        return 0
+    print("usage: python career_graph_services.py build [--k 8] | path \"<from>\" [\"<to>\"]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
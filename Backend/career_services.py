@@ -0,0 +1,244 @@
+# career_services.py - in-memory career catalog matched with skill bitsets
+#
+#   python career_services.py match python "solar pv" ...
+#   python career_services.py gap python "solar pv" ...
+#
+# The careers table is small and only changes through imports and
+# backfills, so it is read once into memory. Every career's required
+# skills become a row of a boolean matrix over one skill vocabulary
+# (taxonomy IDs, plus the raw name of any skill the taxonomy does not
+# know). A user's skills become one vector over the same vocabulary and
+# matching is a single matrix-vector product across all careers, so the
+# cost no longer grows with the number of skills entered.
+#
+# gap_report() answers "what am I missing for every career" with the same
+# matrix in scipy.sparse CSR form: matched and missing skills for all
+# careers are two elementwise sparse operations, and the learning path
+# ranks missing skills by the demand-weighted careers they unlock.
+# Reports are cached per skill set for the lifetime of a catalog load.
+#
+# The catalog reloads after `ttl` seconds; invalidate() forces a reload on
+# the next request (app.py broadcasts it to every worker).
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from skill_services import SkillTaxonomy, decode_skill_ids, normalize_text, skill_taxonomy, skills_list
+
+logger = logging.getLogger(__name__)
+
+# Hub channel used to drop the catalog in every worker
+CAREER_CATALOG_CHANNEL = "internal:career_catalog"
+
+CAREER_COLUMNS = ("career_id", "title", "description", "required_skills", "growth", "salary_range",
+                  "demand", "category", "experience_level", "skill_ids")
+
+
+def load_careers() -> List[Dict]:
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {', '.join(CAREER_COLUMNS)} FROM careers ORDER BY career_id")
+        careers = cursor.fetchall()
+        # career_skills rows count as extra required skills for matching
+        cursor.execute("SELECT career_id, skill_name FROM career_skills")
+        extra: Dict[int, List[str]] = {}
+        for row in cursor.fetchall():
+            extra.setdefault(row["career_id"], []).append(row["skill_name"])
+        for career in careers:
+            career["career_skills"] = extra.get(career["career_id"], [])
+        return careers
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class CatalogSnapshot:
+    """One immutable load of the careers table; swapped whole on refresh"""
+
+    def __init__(self, careers: List[Dict], vocabulary: Dict[object, int], labels: List[str], matrix: np.ndarray):
+        self.careers = careers
+        self.vocabulary = vocabulary
+        self.labels = labels
+        self.matrix = matrix
+        self.sparse = sparse.csr_matrix(matrix, dtype=np.float64)
+        self.required = matrix.sum(axis=1)
+        # skill column set -> gap report; lives and dies with this load
+        self.gap_cache: "OrderedDict[frozenset, Dict]" = OrderedDict()
+        demand = np.array([float(c.get("demand") or 0) for c in careers])
+        self.demand = demand / demand.max() if len(demand) and demand.max() > 0 else demand
+
+
+class CareerCatalog:
+    """All careers with pre-parsed skills, a career x skill bitset matrix and a demand vector"""
+
+    def __init__(self, loader: Callable[[], List[Dict]] = load_careers, taxonomy: SkillTaxonomy = skill_taxonomy,
+                 ttl: float = 600.0, clock: Callable[[], float] = time.monotonic, gap_cache_size: int = 1024):
+        self.loader = loader
+        self.taxonomy = taxonomy
+        self.ttl = ttl
+        self.clock = clock
+        self.gap_cache_size = gap_cache_size
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._loaded_at = 0.0
+
+    def skill_key(self, skill: str):
+        """Taxonomy ID when the skill is known, else its normalized name"""
+        skill_id = self.taxonomy.canonical(skill)
+        return skill_id if skill_id is not None else normalize_text(skill).strip()
+
+    def build(self, rows: List[Dict]) -> CatalogSnapshot:
+        careers, keys_per_career, vocabulary, labels = [], [], {}, []
+        for row in rows:
+            career = dict(row)
+            career["required_skills"] = skills_list(career.get("required_skills"))
+            career["skill_ids"] = decode_skill_ids(career.get("skill_ids"))
+            names = career["required_skills"] + list(career.pop("career_skills", None) or [])
+            keys = {}
+            for skill in names:
+                if skill and skill.strip():
+                    keys.setdefault(self.skill_key(skill), skill.strip())
+            for skill_id in career["skill_ids"]:
+                keys.setdefault(skill_id, self.taxonomy.name(skill_id))
+            keys.pop("", None)
+            for key, name in keys.items():
+                if key not in vocabulary:
+                    vocabulary[key] = len(vocabulary)
+                    labels.append(self.taxonomy.name(key) if isinstance(key, int) else name)
+            careers.append(career)
+            keys_per_career.append(keys)
+
+        matrix = np.zeros((len(careers), len(vocabulary)), dtype=bool)
+        for row, keys in enumerate(keys_per_career):
+            matrix[row, [vocabulary[key] for key in keys]] = True
+        logger.info(f"🎯 Career catalog: {len(careers)} careers over {len(vocabulary)} skills")
+        return CatalogSnapshot(careers, vocabulary, labels, matrix)
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current catalog, reloaded first when missing or older than `ttl`"""
+        snapshot = self._snapshot
+        if snapshot is not None and self.clock() - self._loaded_at <= self.ttl:
+            return snapshot
+        with self._lock:
+            # Another thread may have reloaded while this one waited
+            if self._snapshot is None or self.clock() - self._loaded_at > self.ttl:
+                self._snapshot = self.build(self.loader())
+                self._loaded_at = self.clock()
+            return self._snapshot
+
+    def invalidate(self):
+        self._loaded_at = float("-inf")
+
+    def skill_vector(self, snapshot: CatalogSnapshot, skills: List[str]) -> np.ndarray:
+        vector = np.zeros(len(snapshot.vocabulary), dtype=bool)
+        for skill in skills:
+            if skill and skill.strip():
+                column = snapshot.vocabulary.get(self.skill_key(skill))
+                if column is not None:
+                    vector[column] = True
+        return vector
+
+    def match(self, skills: List[str], limit: int = 15) -> List[Dict]:
+        """Careers ranked by coverage x demand; by demand alone when no skills are given"""
+        snapshot = self.snapshot()
+        skills = [s for s in skills or [] if s and s.strip()]
+        if not skills:
+            order = np.argsort(-snapshot.demand, kind="stable")[:limit]
+            return [dict(snapshot.careers[i], coverage=0.0, match_score=0.0) for i in order]
+
+        overlap = snapshot.matrix.astype(np.int32) @ self.skill_vector(snapshot, skills).astype(np.int32)
+        coverage = np.divide(overlap, snapshot.required, out=np.zeros(len(overlap)), where=snapshot.required > 0)
+        score = coverage * snapshot.demand
+        candidates = np.flatnonzero(overlap > 0)
+        order = candidates[np.argsort(-score[candidates], kind="stable")][:limit]
+        return [dict(snapshot.careers[i], coverage=round(float(coverage[i]), 4), match_score=round(float(score[i]), 4))
+                for i in order]
+
+    def gap_report(self, skills: List[str], limit: int = 20, path_length: int = 10) -> Dict:
+        """Coverage, matched and missing skills for the closest careers, plus a learning path"""
+        snapshot = self.snapshot()
+        known = self.skill_vector(snapshot, skills)
+        columns = frozenset(np.flatnonzero(known).tolist())
+        gap = snapshot.gap_cache.get(columns)
+        if gap is None:
+            gap = self._gap(snapshot, known)
+            snapshot.gap_cache[columns] = gap
+            while len(snapshot.gap_cache) > self.gap_cache_size:
+                snapshot.gap_cache.popitem(last=False)
+        else:
+            snapshot.gap_cache.move_to_end(columns)
+
+        matched, missing, value = gap["matched"], gap["missing"], gap["value"]
+        careers = []
+        for i in gap["order"][:limit]:
+            need = missing.indices[missing.indptr[i]:missing.indptr[i + 1]]
+            careers.append({
+                "career_id": snapshot.careers[i]["career_id"],
+                "title": snapshot.careers[i]["title"],
+                "coverage": round(float(gap["coverage"][i]), 4),
+                "matched_skills": [snapshot.labels[c] for c in matched.indices[matched.indptr[i]:matched.indptr[i + 1]]],
+                "missing_skills": [snapshot.labels[c] for c in need[np.argsort(-value[need], kind="stable")]],
+            })
+        return {
+            "careers": careers,
+            "learning_path": [{"skill": snapshot.labels[c], "careers_unlocked": int(gap["unlocks"][c]),
+                               "value": round(float(value[c]), 4)} for c in gap["path"][:path_length]],
+            "unknown_skills": [s for s in skills if s and s.strip()
+                               and snapshot.vocabulary.get(self.skill_key(s)) is None],
+            "total_careers": len(snapshot.careers),
+        }
+
+    def _gap(self, snapshot: CatalogSnapshot, known: np.ndarray) -> Dict:
+        """Sparse matched/missing matrices and per-skill learning value for one skill set"""
+        user = sparse.diags(known.astype(np.float64), format="csr")
+        matched = snapshot.sparse @ user                      # careers x skills the user has
+        missing = snapshot.sparse - matched                   # careers x skills still to learn
+        missing.eliminate_zeros()
+        matched.sort_indices()
+        coverage = np.divide(np.asarray(matched.sum(axis=1)).ravel(), snapshot.required,
+                             out=np.zeros(len(snapshot.careers)), where=snapshot.required > 0)
+        # A missing skill is worth more when the careers needing it are in demand and already close
+        value = np.asarray(missing.T @ (snapshot.demand * (0.5 + coverage))).ravel()
+        path = np.argsort(-value, kind="stable")
+        return {
+            "matched": matched,
+            "missing": missing,
+            "coverage": coverage,
+            "value": value,
+            "unlocks": np.diff(missing.tocsc().indptr),
+            "order": np.lexsort((-snapshot.demand, -coverage)),
+            "path": path[value[path] > 0],
+        }
+
+
+career_catalog = CareerCatalog()
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) >= 2 and argv[0] == "match":
+        for career in career_catalog.match(argv[1:], limit=10):
+            print(f"{career['match_score']:.3f}  {career['coverage']:.0%}  {career['title']}")
+        return 0
+    if len(argv) >= 2 and argv[0] == "gap":
+        report = career_catalog.gap_report(argv[1:], limit=10)
+        for career in report["careers"]:
+            print(f"{career['coverage']:.0%}  {career['title']}  missing: {', '.join(career['missing_skills'][:5])}")
+        print("learn next: " + ", ".join(step["skill"] for step in report["learning_path"]))
+        return 0
+    print("usage: python career_services.py match|gap <skill> [<skill> ...]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
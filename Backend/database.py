@@ -0,0 +1,52 @@
+# database.py - shared MariaDB configuration and connection helper
+import logging
+import os
+import threading
+
+import mariadb
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# MariaDB configuration
+db_config = {
+    'user': 'root',
+    'password': os.getenv("DB_PASSWORD", "pass"),
+    'host': 'localhost',
+    'port': 3306,
+    'database': 'green_jobs'
+}
+
+# Connections are reused from a pool; close() hands them back to it
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = mariadb.ConnectionPool(
+                pool_name="green_jobs",
+                pool_size=POOL_SIZE,
+                pool_reset_connection=True,
+                **db_config
+            )
+    return _pool
+
+def get_db_connection():
+    try:
+        return _get_pool().get_connection()
+    except mariadb.PoolError:
+        # Pool exhausted - fall back to a dedicated connection
+        pass
+    except mariadb.Error as e:
+        logger.error(f"Error creating MariaDB connection pool: {e}")
+    try:
+        conn = mariadb.connect(**db_config)
+        return conn
+    except mariadb.Error as e:
+        logger.error(f"Error connecting to MariaDB: {e}")
+        return None
@@ -0,0 +1,263 @@
+# dedup_services.py - near-duplicate job detection with MinHash / LSH
+#
+#   python dedup_services.py backfill [--chunk 500]   sign existing jobs oldest first and link their duplicates
+#
+# Every job gets a MinHash signature over the word 3-shingles of its title
+# and description. The signature is cut into BANDS bands of ROWS values;
+# each band, scoped to the posting company, hashes to a bucket stored in
+# job_lsh_buckets. Jobs sharing any bucket are candidates - with 16 bands
+# of 4 rows, pairs above ~0.5 Jaccard almost always collide and unrelated
+# ones almost never do - so finding them is a few primary-key probes no
+# matter how many jobs exist.
+#
+# A candidate is a duplicate when the estimated Jaccard similarity is high
+# and the description embeddings agree (cosine >= COSINE_THRESHOLD), or,
+# where either side has no embedding, when the Jaccard estimate alone is
+# very high. The new job's jobs.canonical_job_id then points at the
+# candidate's canonical job; searches, listings, recommendations and alerts
+# only show canonical jobs (canonical_job_id IS NULL).
+import hashlib
+import json
+import logging
+import re
+import sys
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from recommendation_services import job_embedding_text
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+
+# Signature agreement needed before embeddings are consulted (about where the bands start colliding)
+JACCARD_THRESHOLD = 0.5
+# Without embeddings on both sides
+JACCARD_ONLY_THRESHOLD = 0.85
+COSINE_THRESHOLD = 0.95
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.int64)
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE) -> List[str]:
+    words = _WORD.findall((text or "").lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of a text's shingle set"""
+    hashes = np.array(sorted({zlib.crc32(s.encode("utf-8")) for s in shingles(text)}), dtype=np.int64) % _PRIME
+    if not hashes.size:
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray, scope: str = "") -> List[int]:
+    """One signed 64-bit bucket per band; `scope` keeps different companies apart"""
+    scope = (scope or "").strip().lower().encode("utf-8")
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8,
+                                 key=scope[:64], salt=band.to_bytes(16, "little")).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def estimated_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+
+def job_text(job: Dict) -> str:
+    # Also the text embedded into desc_vector_json when a job has no vector yet
+    return job_embedding_text(job.get("title"), job.get("description"))
+
+
+def _unit(value) -> Optional[np.ndarray]:
+    if value is None:
+        return None
+    try:
+        vector = np.asarray(json.loads(value) if isinstance(value, (str, bytes)) else value, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    norm = np.linalg.norm(vector) if vector.ndim == 1 else 0
+    return vector / norm if norm > 0 else None
+
+
+def is_duplicate(jaccard: float, a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    if jaccard < JACCARD_THRESHOLD:
+        return False
+    if a is not None and b is not None and a.shape == b.shape:
+        return float(a @ b) >= COSINE_THRESHOLD
+    return jaccard >= JACCARD_ONLY_THRESHOLD
+
+
+def assign_canonical(jobs: List[Dict], stored: Dict[int, Dict],
+                     vectorize: Optional[Callable[[Dict], Optional[np.ndarray]]] = None) -> Dict[int, int]:
+    """job_id -> canonical job_id for the duplicates among `jobs`.
+
+    Each job carries "job_id", "signature", "keys" and "vector"; `stored`
+    maps candidate ids to the same plus "canonical". Jobs earlier in the
+    list count as candidates for later ones, so a file that repeats a
+    posting collapses too. `vectorize` embeds a new job on demand when a
+    candidate survives the signature check.
+    """
+    buckets: Dict[int, List[int]] = {}
+    for job_id, candidate in stored.items():
+        for key in candidate["keys"]:
+            buckets.setdefault(key, []).append(job_id)
+    known = dict(stored)
+    duplicates = {}
+    for job in jobs:
+        candidate_ids = {c for key in job["keys"] for c in buckets.get(key, ()) if c != job["job_id"]}
+        scored = sorted(((estimated_jaccard(job["signature"], known[c]["signature"]), c) for c in candidate_ids),
+                        reverse=True)
+        canonical, tried_embedding = None, False
+        for jaccard, c in scored:
+            if jaccard < JACCARD_THRESHOLD:
+                break
+            if job["vector"] is None and vectorize is not None and known[c]["vector"] is not None and not tried_embedding:
+                job["vector"] = vectorize(job)
+                tried_embedding = True
+            if is_duplicate(jaccard, job["vector"], known[c]["vector"]):
+                canonical = known[c]["canonical"]
+                break
+        if canonical is not None:
+            duplicates[job["job_id"]] = canonical
+        known[job["job_id"]] = dict(job, canonical=canonical if canonical is not None else job["job_id"])
+        for key in job["keys"]:
+            buckets.setdefault(key, []).append(job["job_id"])
+    return duplicates
+
+
+class JobDeduplicator:
+    """Signs jobs inside the writer's transaction and links their duplicates"""
+
+    def __init__(self, embed: Optional[Callable[[str], Optional[List[float]]]] = None):
+        self.embed = embed
+
+    def process(self, cursor, jobs: List[Dict]) -> Dict[int, int]:
+        """Sign, bucket and link `jobs` (job_id, title, description, company, optional desc_vector_json).
+
+        Uses the caller's cursor and leaves the commit to the caller.
+        Returns job_id -> canonical job_id for the duplicates found.
+        """
+        if not jobs:
+            return {}
+        prepared = []
+        for job in jobs:
+            sig = signature(job_text(job))
+            prepared.append({"job_id": int(job["job_id"]), "signature": sig, "keys": band_keys(sig, job.get("company")),
+                             "vector": _unit(job.get("desc_vector_json")), "text": job_text(job)})
+
+        stored = self._candidates(cursor, prepared)
+        embedded = {}
+
+        def vectorize(job):
+            if self.embed is None:
+                return None
+            embedding = self.embed(job["text"])
+            if embedding is None:
+                return None
+            embedded[job["job_id"]] = json.dumps([round(float(x), 6) for x in embedding])
+            return _unit(embedding)
+
+        duplicates = assign_canonical(prepared, stored, vectorize)
+
+        cursor.executemany("""
+            INSERT INTO job_minhash (job_id, signature) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE signature = VALUES(signature)
+        """, [(job["job_id"], job["signature"].tobytes()) for job in prepared])
+        cursor.executemany("INSERT IGNORE INTO job_lsh_buckets (bucket, job_id) VALUES (%s, %s)",
+                           [(key, job["job_id"]) for job in prepared for key in job["keys"]])
+        if duplicates:
+            cursor.executemany("UPDATE jobs SET canonical_job_id = %s WHERE job_id = %s",
+                               [(canonical, job_id) for job_id, canonical in duplicates.items()])
+            logger.info(f"🧬 {len(duplicates)} of {len(prepared)} jobs are near-duplicates")
+        if embedded:
+            # Embedded for the comparison; stored so the recommendation service does not redo it
+            cursor.executemany("UPDATE jobs SET desc_vector_json = %s WHERE job_id = %s",
+                               [(vector, job_id) for job_id, vector in embedded.items()])
+        return duplicates
+
+    def _candidates(self, cursor, prepared: List[Dict]) -> Dict[int, Dict]:
+        keys = sorted({key for job in prepared for key in job["keys"]})
+        cursor.execute(f"SELECT bucket, job_id FROM job_lsh_buckets WHERE bucket IN ({', '.join(['%s'] * len(keys))})",
+                       tuple(keys))
+        new_ids = {job["job_id"] for job in prepared}
+        keys_by_job: Dict[int, List[int]] = {}
+        for bucket, job_id in cursor.fetchall():
+            if job_id not in new_ids:
+                keys_by_job.setdefault(job_id, []).append(bucket)
+        if not keys_by_job:
+            return {}
+        ids = sorted(keys_by_job)
+        cursor.execute(f"""
+            SELECT j.job_id, COALESCE(j.canonical_job_id, j.job_id), m.signature, j.desc_vector_json
+            FROM jobs j JOIN job_minhash m ON m.job_id = j.job_id
+            WHERE j.job_id IN ({', '.join(['%s'] * len(ids))}) AND COALESCE(j.status, 'active') = 'active'
+        """, tuple(ids))
+        return {job_id: {"canonical": canonical, "signature": np.frombuffer(bytes(sig), dtype=np.uint32),
+                         "keys": keys_by_job[job_id], "vector": _unit(vector)}
+                for job_id, canonical, sig, vector in cursor.fetchall()}
+
+
+def backfill(deduplicator: JobDeduplicator, chunk: int = 500) -> Dict[str, int]:
+    """Sign every unsigned job in id order, so the oldest posting stays canonical"""
+    from database import get_db_connection
+
+    totals = {"signed": 0, "duplicates": 0}
+    last_id = 0
+    while True:
+        conn = get_db_connection()
+        if not conn:
+            raise ConnectionError("Database connection failed")
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT j.job_id, j.title, j.description, j.company, j.desc_vector_json
+                FROM jobs j LEFT JOIN job_minhash m ON m.job_id = j.job_id
+                WHERE m.job_id IS NULL AND j.job_id > %s ORDER BY j.job_id LIMIT %s
+            """, (last_id, chunk))
+            rows = cursor.fetchall()
+            if not rows:
+                return totals
+            jobs = [dict(zip(("job_id", "title", "description", "company", "desc_vector_json"), row)) for row in rows]
+            duplicates = deduplicator.process(cursor, jobs)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        last_id = rows[-1][0]
+        totals["signed"] += len(rows)
+        totals["duplicates"] += len(duplicates)
+        print(f"   up to job {last_id}: {totals['signed']} signed, {totals['duplicates']} duplicates")
+
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] == "backfill":
+        from vector_services import vector_service
+
+        chunk = int(argv[argv.index("--chunk") + 1]) if "--chunk" in argv else 500
+        totals = backfill(JobDeduplicator(embed=vector_service.generate_embedding), chunk)
+        print(f"✅ {totals['signed']} jobs signed, {totals['duplicates']} linked to a canonical posting")
+        return 0
+    print("usage: python dedup_services.py backfill [--chunk 500]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
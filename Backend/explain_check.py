@@ -0,0 +1,84 @@
+# explain_check.py - fail if an endpoint query falls back to a full table scan
+#
+#   python explain_check.py
+#
+# Runs EXPLAIN for the hot endpoint queries and exits with status 1 when any
+# of them reads a table with access type ALL. Run it against a database with
+# realistic row counts - on near-empty tables the optimizer may legitimately
+# prefer a scan. The check is read-only: a database with pending migrations
+# is reported (exit status 2) rather than migrated - run schema.py apply.
+import sys
+from datetime import datetime
+
+from database import get_db_connection
+from pagination import keyset_condition
+from queries import (APPLICATION_EXISTS_SQL, APPLICATIONS_ORDER, EDUCATION_SQL, EMPLOYER_APPLICATIONS_FROM,
+                     EMPLOYER_PROFILE_SQL, EXPERIENCE_SQL, JOB_SEARCH_FROM, JOB_SEARCH_ORDER, NEARBY_JOBS_CONDITION,
+                     NOTIFICATIONS_ORDER, NOTIFICATIONS_SQL, PROFILE_SQL, USER_APPLICATIONS_FROM)
+from schema import pending_migrations
+
+NOW = datetime(2030, 1, 1)
+AFTER = [NOW, NOW, 1000000]             # keyset parameters of a next-page cursor
+
+# (endpoint, query, params) - built from the same fragments as the endpoints (queries.py)
+ENDPOINT_QUERIES = [
+    ("POST /api/jobs/search-enhanced (first page)",
+     "SELECT j.job_id" + JOB_SEARCH_FROM + JOB_SEARCH_ORDER, ["en", 21]),
+    ("POST /api/jobs/search-enhanced (next page)",
+     "SELECT j.job_id" + JOB_SEARCH_FROM + " AND " + keyset_condition("j.created_at", "j.job_id", AFTER)
+     + JOB_SEARCH_ORDER, ["en"] + AFTER + [21]),
+    ("GET /api/users/applications",
+     "SELECT a.application_id" + USER_APPLICATIONS_FROM + " AND "
+     + keyset_condition("a.applied_at", "a.application_id", AFTER) + APPLICATIONS_ORDER, [1] + AFTER + [21]),
+    ("GET /api/employer/applications",
+     "SELECT a.application_id" + EMPLOYER_APPLICATIONS_FROM + APPLICATIONS_ORDER, [1, 21]),
+    ("POST /match_jobs (50 km of Pune)",
+     "SELECT job_id, latitude, longitude FROM jobs WHERE " + NEARBY_JOBS_CONDITION, [18.07, 18.97, 73.38, 74.33, "%Pune%"]),
+    ("POST /api/jobs/apply (duplicate check)", APPLICATION_EXISTS_SQL, [1, 1]),
+    ("GET /api/users/profile (education)", EDUCATION_SQL, [1]),
+    ("GET /api/users/profile (experience)", EXPERIENCE_SQL, [1]),
+    ("GET /api/users/profile (profile)", PROFILE_SQL, [1]),
+    ("POST /api/employer/jobs (employer lookup)", EMPLOYER_PROFILE_SQL, [1]),
+    ("GET /api/notifications?unread_only=true",
+     NOTIFICATIONS_SQL + " AND is_read = FALSE" + NOTIFICATIONS_ORDER, [1, 21]),
+]
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, tuple(params))
+    return cursor.fetchall()
+
+
+def main() -> int:
+    conn = get_db_connection()
+    if not conn:
+        print("❌ Database connection failed")
+        return 1
+    failures = 0
+    try:
+        pending = pending_migrations(conn)
+        if pending:
+            print(f"❌ Schema is behind: migrations {pending} are not applied - run `python schema.py apply` first")
+            return 2
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for endpoint, sql, params in ENDPOINT_QUERIES:
+                plan = explain(cursor, sql, params)
+                scans = [row["table"] for row in plan if (row.get("type") or "").upper() == "ALL"]
+                if scans:
+                    failures += 1
+                    print(f"❌ {endpoint}: full scan on {', '.join(scans)}")
+                else:
+                    access = ", ".join(f"{row['table']}={row['type']}/{row['key']}" for row in plan)
+                    print(f"✅ {endpoint}: {access}")
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+
+    print(f"\n{len(ENDPOINT_QUERIES) - failures}/{len(ENDPOINT_QUERIES)} endpoint queries use an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
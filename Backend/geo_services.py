@@ -0,0 +1,313 @@
+# geo_services.py - local IP-to-city resolution, city geocoding and geodistance
+#
+#   python geo_services.py lookup <ip>
+#   python geo_services.py geocode <location>
+#   python geo_services.py geocode-jobs
+#   python geo_services.py build-ip-table <GeoLite2-City-Blocks-IPv4.csv> <GeoLite2-City-Locations-en.csv>
+#
+# The IP table is a CSV of `network,city` rows (CIDR notation), read once
+# and searched with bisect. build-ip-table converts a GeoLite2 City CSV
+# export into that format, keeping Indian networks only. Until a table with
+# at least one range is loaded, addresses fall back to the ipinfo.io lookup
+# (IPINFO_API_KEY) the table replaced.
+#
+# Job locations are geocoded against data/india_cities.csv when the job is
+# written, and rows older than that are backfilled at startup; jobs.latitude
+# / jobs.longitude are indexed, so a radius search is a bounding-box range
+# scan followed by one vectorized haversine. Rows whose location does not
+# geocode keep NULL coordinates and match on their location text instead.
+import bisect
+import csv
+import ipaddress
+import logging
+import math
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def default_ip_table_path() -> str:
+    return os.getenv("GEOIP_CITY_CSV", os.path.join(DATA_DIR, "ip_city_ranges.csv"))
+
+
+class IPCityResolver:
+    """Sorted, non-overlapping address ranges per IP version, searched with bisect.
+
+    Lookups are pure CPU with a per-IP LRU cache in front, so resolving the
+    caller's city never leaves the process.
+    """
+
+    def __init__(self, path: Optional[str] = None, cache_size: int = 10000,
+                 fallback: Optional[Callable[[str], Optional[str]]] = None):
+        self.path = path
+        # version -> (range starts, range ends, cities), sorted by start
+        self.tables: Dict[int, Tuple[List[int], List[int], List[str]]] = {}
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+        # Used only while no table is loaded; only answers are cached, so a
+        # failed remote call is retried on the next request
+        self.fallback = fallback
+        self.cache_size = cache_size
+        self._fallback_cities: Dict[str, str] = {}
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        ranges: Dict[int, List[Tuple[int, int, str]]] = {4: [], 6: []}
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    if not row or row[0].startswith("#") or row[0] == "network" or len(row) < 2:
+                        continue
+                    try:
+                        network = ipaddress.ip_network(row[0].strip(), strict=False)
+                    except ValueError:
+                        continue
+                    ranges[network.version].append(
+                        (int(network.network_address), int(network.broadcast_address), row[1].strip()))
+        except OSError as e:
+            logger.warning(f"IP city table unavailable ({path}): {e}")
+            return
+
+        tables = {}
+        for version, rows in ranges.items():
+            rows.sort()
+            tables[version] = ([r[0] for r in rows], [r[1] for r in rows], [r[2] for r in rows])
+        self.tables = tables
+        self.lookup.cache_clear()
+        if self.loaded:
+            logger.info(f"📍 Loaded {sum(len(r) for r in ranges.values())} IP ranges from {path}")
+        else:
+            logger.warning(f"IP city table {path} has no ranges - using the remote lookup until one is built")
+
+    @property
+    def loaded(self) -> bool:
+        return any(starts for starts, _, _ in self.tables.values())
+
+    def resolve(self, ip: str) -> Optional[str]:
+        """City from the table, or from the fallback lookup while no table is loaded.
+
+        The fallback may block on the network; async callers should only
+        reach it through asyncio.to_thread.
+        """
+        if self.loaded or not self.fallback:
+            return self.lookup(ip)
+        city = self._fallback_cities.get(ip)
+        if city is None:
+            city = self.fallback(ip)
+            if city:
+                if len(self._fallback_cities) >= self.cache_size:
+                    self._fallback_cities.clear()
+                self._fallback_cities[ip] = city
+        return city
+
+    def _lookup(self, ip: str) -> Optional[str]:
+        """City for an address, or None when it is unknown or not an IP"""
+        try:
+            address = ipaddress.ip_address(ip)
+        except (TypeError, ValueError):
+            return None
+        table = self.tables.get(address.version)
+        if not table:
+            return None
+        starts, ends, cities = table
+        value = int(address)
+        pos = bisect.bisect_right(starts, value) - 1
+        if pos >= 0 and value <= ends[pos]:
+            return cities[pos]
+        return None
+
+
+def ipinfo_city(ip: str, timeout: float = 2.0) -> Optional[str]:
+    """City from ipinfo.io, or None for private addresses and failed calls"""
+    try:
+        if not ipaddress.ip_address(ip).is_global:
+            return None
+    except (TypeError, ValueError):
+        return None
+    import requests
+
+    token = os.getenv("IPINFO_API_KEY")
+    try:
+        response = requests.get(f"https://ipinfo.io/{ip}/city", params={"token": token} if token else None,
+                                timeout=timeout)
+    except requests.RequestException as e:
+        logger.warning(f"ipinfo lookup failed for {ip}: {e}")
+        return None
+    city = response.text.strip()
+    return city if response.ok and city else None
+
+
+ip_resolver = IPCityResolver(default_ip_table_path(), fallback=ipinfo_city)
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Radius used when a search names a city but no radius
+DEFAULT_RADIUS_KM = 50.0
+
+_LOCATION_SEPARATORS = re.compile(r"[,/|;()]+|\s+-\s+")
+
+
+def default_gazetteer_path() -> str:
+    return os.getenv("GAZETTEER_CSV", os.path.join(DATA_DIR, "india_cities.csv"))
+
+
+class Gazetteer:
+    """City name (and alias) -> coordinates, from a `city,state,latitude,longitude,aliases` CSV"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.places: Dict[str, Tuple[float, float]] = {}
+        self.geocode = lru_cache(maxsize=4096)(self._geocode)
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        places = {}
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    coords = (float(row["latitude"]), float(row["longitude"]))
+                    names = [row["city"]] + [a for a in (row.get("aliases") or "").split("|") if a]
+                    for name in names:
+                        places[name.strip().casefold()] = coords
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Gazetteer unavailable ({path}): {e}")
+            return
+        self.places = places
+        self.geocode.cache_clear()
+
+    def _geocode(self, location: str) -> Optional[Tuple[float, float]]:
+        """Coordinates for a free-text location such as "Pune, Maharashtra" or "Remote / Bangalore" """
+        if not location:
+            return None
+        text = " ".join(location.casefold().split())
+        if text in self.places:
+            return self.places[text]
+        for part in _LOCATION_SEPARATORS.split(text):
+            part = part.strip()
+            if part in self.places:
+                return self.places[part]
+        return None
+
+
+gazetteer = Gazetteer(default_gazetteer_path())
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle - the indexed prefilter"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """Great-circle distance from one point to many, in one array operation.
+
+    Missing coordinates (None/NaN) yield NaN.
+    """
+    lats = np.radians(np.asarray(lats, dtype=float))
+    lons = np.radians(np.asarray(lons, dtype=float))
+    lat0, lon0 = math.radians(lat), math.radians(lon)
+    a = np.sin((lats - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lats) * np.sin((lons - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def geocode_pending_jobs(chunk: int = 500) -> int:
+    """Fill jobs.latitude/longitude for rows written before geocoding existed"""
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    cursor = conn.cursor()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            cursor.execute("""
+                SELECT job_id, location FROM jobs
+                WHERE latitude IS NULL AND job_id > %s ORDER BY job_id LIMIT %s
+            """, (last_id, chunk))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            values = []
+            for job_id, location in rows:
+                coords = gazetteer.geocode(location or "")
+                if coords:
+                    values.append((coords[0], coords[1], job_id))
+            if values:
+                cursor.executemany("UPDATE jobs SET latitude = %s, longitude = %s WHERE job_id = %s", values)
+                conn.commit()
+                updated += len(values)
+    finally:
+        cursor.close()
+        conn.close()
+    return updated
+
+
+def start_geocode_backfill() -> threading.Thread:
+    """Run geocode_pending_jobs in a daemon thread - called at startup so old rows join radius searches"""
+    def run():
+        try:
+            logger.info(f"📍 Geocoded {geocode_pending_jobs()} jobs written before geocoding")
+        except Exception as e:
+            logger.error(f"Job geocoding backfill failed: {e}")
+
+    thread = threading.Thread(target=run, name="geocode-jobs", daemon=True)
+    thread.start()
+    return thread
+
+
+def build_ip_table(blocks_csv: str, locations_csv: str, out=sys.stdout, country: str = "IN"):
+    """Write `network,city` rows from a GeoLite2 City CSV export"""
+    cities = {}
+    with open(locations_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("country_iso_code") == country and row.get("city_name"):
+                cities[row["geoname_id"]] = row["city_name"]
+
+    writer = csv.writer(out)
+    writer.writerow(["network", "city"])
+    written = 0
+    with open(blocks_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            city = cities.get(row.get("geoname_id"))
+            if city:
+                writer.writerow([row["network"], city])
+                written += 1
+    return written
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) == 2 and argv[0] == "lookup":
+        print(ip_resolver.resolve(argv[1]) or "Unknown")
+        return 0
+    if len(argv) == 2 and argv[0] == "geocode":
+        print(gazetteer.geocode(argv[1]) or "Unknown")
+        return 0
+    if argv == ["geocode-jobs"]:
+        print(f"✅ Geocoded {geocode_pending_jobs()} jobs")
+        return 0
+    if len(argv) == 3 and argv[0] == "build-ip-table":
+        written = build_ip_table(argv[1], argv[2])
+        print(f"✅ {written} networks", file=sys.stderr)
+        return 0
+    print("usage: python geo_services.py lookup <ip> | geocode <location> | geocode-jobs | "
+          "build-ip-table <blocks.csv> <locations.csv>")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,311 @@
+# ingestion_services.py - bulk job import from CSV / JSONL
+#
+#   python ingestion_services.py import <file|directory> --employer <user_id> [--chunk 500]
+#
+# Rows are parsed one at a time from the stream and validated against
+# JobCreate, then handled in chunks: each chunk is geocoded and skill-tagged
+# like create_job does, embedded with one batched model call, and written
+# with a single executemany in its own transaction. A failing chunk is
+# rolled back and reported without losing the others. After every commit
+# the chunk's job ids are handed to the indexers (For You lists, alerts, ...),
+# except the ones the deduplicator linked to an existing posting.
+#
+# Rows carry an import_batch tag per chunk, so the ids of an executemany
+# are read back exactly. The report gives per-stage row counts, time and
+# throughput.
+#
+# Given a directory the CLI imports every *.csv / *.jsonl in it and moves
+# each file to done/ or failed/ next to it (a drop directory).
+import csv
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from geo_services import gazetteer
+from queries import EMPLOYER_PROFILE_SQL
+from recommendation_services import job_embedding_text
+from skill_services import encode_skill_ids, job_skill_ids
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+MAX_ERRORS = 100
+FORMATS = ("csv", "jsonl")
+
+
+class JobCreate(BaseModel):
+    title: str
+    description: str
+    company: str
+    location: str
+    job_type: str = "Full-time"
+    experience_level: str = "Mid"
+    skills: str
+    salary: float
+    sdg_goal: str = "SDG 7: Affordable and Clean Energy"
+    sdg_score: int = 8
+
+
+def detect_format(name: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "jsonl"
+    return None
+
+
+def iter_records(text: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """(line number, record, parse error) for each row of a text stream, without reading it whole"""
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # Empty cells fall back to the model defaults
+            yield reader.line_num, {k.strip(): v.strip() for k, v in record.items()
+                                    if k and isinstance(v, str) and v.strip()}, None
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"invalid JSON: {e}"
+                continue
+            if isinstance(record, dict):
+                yield line_no, record, None
+            else:
+                yield line_no, None, "expected a JSON object"
+    else:
+        raise ValueError(f"Unsupported format '{fmt}' - expected one of {', '.join(FORMATS)}")
+
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+
+class Stage:
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    def add(self, rows: int, started: float):
+        self.rows += rows
+        self.seconds += time.perf_counter() - started
+
+    def report(self) -> Dict:
+        return {"rows": self.rows, "seconds": round(self.seconds, 3),
+                "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds > 0 else None}
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def employer_profile(user_id: int) -> Optional[Dict]:
+    """employer_id and company name for an employer user, as create_job resolves them"""
+    conn = _connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(EMPLOYER_PROFILE_SQL, (user_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class JobIngestor:
+    """Validate, enrich, embed and insert job rows chunk by chunk"""
+
+    def __init__(self, embed_batch: Optional[Callable[[List[str]], Optional[List]]] = None,
+                 indexers: Optional[Dict[str, Callable[[List[int]], object]]] = None,
+                 chunk_size: int = CHUNK_SIZE, connection_factory: Callable = _connect, deduplicator=None):
+        self.embed_batch = embed_batch
+        self.deduplicator = deduplicator
+        self.indexers = indexers or {}
+        self.chunk_size = chunk_size
+        self.connection_factory = connection_factory
+
+    def ingest(self, text: Iterable[str], fmt: str, user_id: int, employer_id: int, company: str) -> Dict:
+        stages = {name: Stage() for name in ("parse", "enrich", "embed", "insert",
+                                             *(("dedup",) if self.deduplicator is not None else ()), *self.indexers)}
+        report = {"received": 0, "inserted": 0, "rejected": 0, "errors": [], "job_ids": [], "duplicates": {}}
+
+        def reject(line_no: int, message: str):
+            report["rejected"] += 1
+            if len(report["errors"]) < MAX_ERRORS:
+                report["errors"].append({"line": line_no, "error": message})
+
+        chunk: List[Tuple[int, JobCreate]] = []
+        started = time.perf_counter()
+        for line_no, record, error in iter_records(text, fmt):
+            report["received"] += 1
+            if error is None:
+                try:
+                    # Postings are always published under the employer's company
+                    chunk.append((line_no, JobCreate(**dict(record, company=company))))
+                except ValidationError as e:
+                    error = validation_message(e)
+            if error is not None:
+                reject(line_no, error)
+            if len(chunk) >= self.chunk_size:
+                stages["parse"].add(len(chunk), started)
+                self._write_chunk(chunk, user_id, employer_id, company, stages, report, reject)
+                chunk = []
+                started = time.perf_counter()
+        stages["parse"].add(len(chunk), started)
+        if chunk:
+            self._write_chunk(chunk, user_id, employer_id, company, stages, report, reject)
+
+        report["stages"] = {name: stage.report() for name, stage in stages.items()}
+        logger.info(f"📥 Imported {report['inserted']} of {report['received']} job rows "
+                    f"({report['rejected']} rejected)")
+        return report
+
+    def _write_chunk(self, chunk: List[Tuple[int, JobCreate]], user_id: int, employer_id: int, company: str,
+                     stages: Dict[str, Stage], report: Dict, reject: Callable[[int, str], None]):
+        started = time.perf_counter()
+        enriched = []
+        for _, job in chunk:
+            latitude, longitude = gazetteer.geocode(job.location) or (None, None)
+            enriched.append((latitude, longitude, encode_skill_ids(job_skill_ids(job.title, job.description, job.skills))))
+        stages["enrich"].add(len(chunk), started)
+
+        started = time.perf_counter()
+        vectors = [None] * len(chunk)
+        if self.embed_batch is not None:
+            # Same text the recommendation service embeds, so it never has to redo it
+            embeddings = self.embed_batch([job_embedding_text(job.title, job.description) for _, job in chunk])
+            if embeddings is not None:
+                vectors = [json.dumps([round(float(x), 6) for x in e]) if e is not None else None for e in embeddings]
+        stages["embed"].add(len(chunk), started)
+
+        started = time.perf_counter()
+        batch = uuid.uuid4().hex
+        now = datetime.utcnow()
+        rows = [(job.title, job.description, company, job.location, job.job_type, job.experience_level, job.skills,
+                 job.salary, job.sdg_goal, job.sdg_score, user_id, employer_id, now, latitude, longitude, skill_ids,
+                 vector, batch)
+                for (_, job), (latitude, longitude, skill_ids), vector in zip(chunk, enriched, vectors)]
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO jobs
+                (title, description, company, location, job_type, experience_level,
+                 skills, salary, sdg_goal, sdg_score, posted_by, employer_id, status, created_at,
+                 latitude, longitude, skill_ids, desc_vector_json, import_batch)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'active', %s, %s, %s, %s, %s, %s)
+            """, rows)
+            cursor.execute("SELECT job_id FROM jobs WHERE import_batch = %s ORDER BY job_id", (batch,))
+            job_ids = [row[0] for row in cursor.fetchall()]
+            duplicates = {}
+            if self.deduplicator is not None:
+                dedup_started = time.perf_counter()
+                # Auto-increment ids follow the executemany row order
+                duplicates = self.deduplicator.process(cursor, [
+                    {"job_id": job_id, "title": job.title, "description": job.description, "company": company,
+                     "desc_vector_json": vector}
+                    for job_id, (_, job), vector in zip(job_ids, chunk, vectors)])
+                stages["dedup"].add(len(job_ids), dedup_started)
+                started += time.perf_counter() - dedup_started
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Job import chunk failed (lines {chunk[0][0]}-{chunk[-1][0]}): {e}")
+            for line_no, _ in chunk:
+                reject(line_no, f"chunk insert failed: {e}")
+            return
+        finally:
+            cursor.close()
+            conn.close()
+        stages["insert"].add(len(chunk), started)
+        report["inserted"] += len(job_ids)
+        report["job_ids"] += job_ids
+        report["duplicates"].update(duplicates)
+
+        # Duplicates stay out of the search indexes
+        canonical_ids = [job_id for job_id in job_ids if job_id not in duplicates]
+        for name, indexer in self.indexers.items():
+            started = time.perf_counter()
+            try:
+                if canonical_ids:
+                    indexer(canonical_ids)
+            except Exception as e:
+                logger.error(f"Indexer '{name}' failed for {len(canonical_ids)} imported jobs: {e}")
+            stages[name].add(len(canonical_ids), started)
+
+
+def import_path(ingestor: JobIngestor, path: str, user_id: int) -> List[Tuple[str, Dict]]:
+    """Import one file, or every CSV/JSONL file of a drop directory (moved to done/ or failed/ afterwards)"""
+    profile = employer_profile(user_id)
+    if not profile:
+        raise ValueError(f"User {user_id} has no employer profile")
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                       if detect_format(name) and os.path.isfile(os.path.join(path, name)))
+        drop_dir = path
+    else:
+        files, drop_dir = [path], None
+
+    results = []
+    for file_path in files:
+        fmt = detect_format(file_path)
+        if fmt is None:
+            raise ValueError(f"Cannot tell the format of {file_path} - use a .csv or .jsonl file")
+        with open(file_path, encoding="utf-8-sig", newline="") as f:
+            report = ingestor.ingest(f, fmt, user_id, profile["employer_id"], profile["company_name"])
+        results.append((file_path, report))
+        if drop_dir is not None:
+            target = os.path.join(drop_dir, "done" if report["inserted"] else "failed")
+            os.makedirs(target, exist_ok=True)
+            shutil.move(file_path, os.path.join(target, os.path.basename(file_path)))
+    return results
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) >= 4 and argv[0] == "import" and "--employer" in argv:
+        from alert_services import AlertEngine
+        from dedup_services import JobDeduplicator
+        from recommendation_services import RecommendationService
+        from vector_services import vector_service
+
+        user_id = int(argv[argv.index("--employer") + 1])
+        chunk = int(argv[argv.index("--chunk") + 1]) if "--chunk" in argv else CHUNK_SIZE
+        ingestor = JobIngestor(
+            embed_batch=vector_service.generate_embeddings,
+            indexers={
+                "recommendations": RecommendationService(embed=vector_service.generate_embedding).add_jobs,
+                "alerts": AlertEngine(embed=vector_service.generate_embedding).process_jobs,
+            },
+            chunk_size=chunk,
+            deduplicator=JobDeduplicator(embed=vector_service.generate_embedding),
+        )
+        for file_path, report in import_path(ingestor, argv[1], user_id):
+            print(f"📥 {file_path}: {report['inserted']} inserted ({len(report['duplicates'])} duplicates), "
+                  f"{report['rejected']} rejected")
+            for name, stage in report["stages"].items():
+                print(f"   {name:16} {stage['rows']:7} rows  {stage['seconds']:8.3f}s  {stage['rows_per_second'] or '-'} rows/s")
+            for error in report["errors"][:10]:
+                print(f"   ❌ line {error['line']}: {error['error']}")
+        print("ℹ️ Run `python localization_services.py backfill jobs` to translate the imported postings")
+        return 0
+    print("usage: python ingestion_services.py import <file|directory> --employer <user_id> [--chunk 500]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,226 @@
+# localization_services.py - job and career content translated once, at write time
+#
+#   python localization_services.py backfill [jobs|careers|all] [--lang hi,ta]
+#
+# Catalog text only changes when a job or career is written, so it is
+# translated then (or by the backfill) into job_translations /
+# career_translations and the search endpoints join the stored fields
+# instead of translating on every request. Searches that meet untranslated
+# rows queue them too; (row, language) pairs already stored or already being
+# translated are skipped, so concurrent searches do not repeat the work.
+import asyncio
+import json
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from skill_services import skills_list
+
+logger = logging.getLogger(__name__)
+
+# Every supported language except English
+CATALOG_LANGUAGES = ["hi", "bn", "te", "ta", "mr", "gu", "kn", "ml", "or"]
+
+# catalog -> source table, key column, translated text columns and the store
+CATALOGS = {
+    "jobs": {
+        "table": "jobs",
+        "key": "job_id",
+        "fields": ("title", "description"),
+        "store": "job_translations",
+    },
+    "careers": {
+        "table": "careers",
+        "key": "career_id",
+        "fields": ("title", "description", "growth", "salary_range", "category", "experience_level"),
+        "list_fields": ("required_skills",),
+        "store": "career_translations",
+    },
+}
+
+BACKFILL_CHUNK = 200
+
+# (catalog, id, lang) pairs some materialize() call in this process is translating
+_in_flight: Set[Tuple[str, int, str]] = set()
+
+# Background work is off the request path and can wait for the provider
+TRANSLATION_BUDGET = 120.0
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def _fetch(sql: str, params: tuple) -> List[Dict]:
+    conn = _connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _store(sql: str, rows: List[tuple]):
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(sql, rows)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _upsert_sql(spec: Dict) -> str:
+    columns = [spec["key"], "lang", *spec["fields"], *spec.get("list_fields", ())]
+    updates = ", ".join(f"{col} = VALUES({col})" for col in columns[2:])
+    return (f"INSERT INTO {spec['store']} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {updates}")
+
+
+async def _translate_rows(engine, spec: Dict, rows: List[Dict], lang: str) -> List[tuple]:
+    """Translate a batch of source rows into upsert tuples for one language"""
+    list_fields = spec.get("list_fields", ())
+    texts = []
+    for row in rows:
+        texts.extend(row[field] for field in spec["fields"])
+        for field in list_fields:
+            texts.extend(skills_list(row[field]))
+    translations = await engine.translate_many(texts, lang, time_budget=TRANSLATION_BUDGET)
+
+    values = []
+    for row in rows:
+        translated = [translations.get(row[field], row[field]) for field in spec["fields"]]
+        translated_lists = [[translations.get(item, item) for item in skills_list(row[field])]
+                            for field in list_fields]
+        changed = any(t != row[field] for t, field in zip(translated, spec["fields"]) if t)
+        # Upstream failures come back untranslated; leave those rows for a later run
+        if not changed:
+            continue
+        values.append((row[spec["key"]], lang, *translated,
+                       *[json.dumps(items, ensure_ascii=False) for items in translated_lists]))
+    return values
+
+
+async def materialize(engine, catalog: str, ids: Iterable[int], languages: Optional[List[str]] = None) -> int:
+    """Translate the given jobs/careers into every language and store the result.
+
+    Skips (row, language) pairs that are already stored or that another call
+    is translating right now.
+    """
+    spec = CATALOGS[catalog]
+    languages = [lang for lang in dict.fromkeys(languages or CATALOG_LANGUAGES) if lang != "en"]
+    # Claimed before the first await, so a concurrent call sees them at once
+    claimed = {(catalog, int(i), lang) for i in ids for lang in languages} - _in_flight
+    if not claimed:
+        return 0
+    _in_flight.update(claimed)
+    try:
+        ids = sorted({row_id for _, row_id, _ in claimed})
+        placeholders = ", ".join(["%s"] * len(ids))
+        existing = await asyncio.to_thread(
+            _fetch, f"SELECT {spec['key']}, lang FROM {spec['store']} WHERE {spec['key']} IN ({placeholders})",
+            tuple(ids))
+        wanted = {(row_id, lang) for _, row_id, lang in claimed} - {(row[spec["key"]], row["lang"]) for row in existing}
+        if not wanted:
+            return 0
+        ids = sorted({row_id for row_id, _ in wanted})
+        placeholders = ", ".join(["%s"] * len(ids))
+        columns = ", ".join([spec["key"], *spec["fields"], *spec.get("list_fields", ())])
+        rows = await asyncio.to_thread(
+            _fetch, f"SELECT {columns} FROM {spec['table']} WHERE {spec['key']} IN ({placeholders})", tuple(ids))
+        stored = 0
+        for lang in languages:
+            lang_rows = [row for row in rows if (row[spec["key"]], lang) in wanted]
+            if not lang_rows:
+                continue
+            values = await _translate_rows(engine, spec, lang_rows, lang)
+            if values:
+                await asyncio.to_thread(_store, _upsert_sql(spec), values)
+                stored += len(values)
+        logger.info(f"🌐 Materialized {stored} {catalog} translations for {len(rows)} rows")
+        return stored
+    except Exception as e:
+        logger.error(f"Materializing {catalog} translations failed: {e}")
+        return 0
+    finally:
+        _in_flight.difference_update(claimed)
+
+
+async def materialize_jobs(engine, job_ids: Iterable[int], languages: Optional[List[str]] = None) -> int:
+    return await materialize(engine, "jobs", job_ids, languages)
+
+
+async def materialize_careers(engine, career_ids: Iterable[int], languages: Optional[List[str]] = None) -> int:
+    return await materialize(engine, "careers", career_ids, languages)
+
+
+async def backfill(engine, catalog: str, languages: Optional[List[str]] = None) -> int:
+    """Translate every row that has no stored translation yet, walking the primary key"""
+    spec = CATALOGS[catalog]
+    columns = ", ".join(f"s.{col}" for col in [spec["key"], *spec["fields"], *spec.get("list_fields", ())])
+    total = 0
+    for lang in languages or CATALOG_LANGUAGES:
+        if lang == "en":
+            continue
+        last_id = 0
+        while True:
+            rows = await asyncio.to_thread(_fetch, f"""
+                SELECT {columns} FROM {spec['table']} s
+                LEFT JOIN {spec['store']} t ON t.{spec['key']} = s.{spec['key']} AND t.lang = %s
+                WHERE t.{spec['key']} IS NULL AND s.{spec['key']} > %s
+                ORDER BY s.{spec['key']} LIMIT %s
+            """, (lang, last_id, BACKFILL_CHUNK))
+            if not rows:
+                break
+            last_id = rows[-1][spec["key"]]
+            values = await _translate_rows(engine, spec, rows, lang)
+            if values:
+                await asyncio.to_thread(_store, _upsert_sql(spec), values)
+                total += len(values)
+            print(f"   {catalog}/{lang}: up to id {last_id}, {len(values)}/{len(rows)} stored")
+    return total
+
+
+def main(argv: List[str]) -> int:
+    from translation_services import (TranslationCache, TranslationEngine, TranslationIndex,
+                                      GoogleTranslateProvider, default_cache_path, load_translation_table)
+
+    if not argv or argv[0] != "backfill":
+        print("usage: python localization_services.py backfill [jobs|careers|all] [--lang hi,ta]")
+        return 2
+    args = argv[1:]
+    languages = None
+    if "--lang" in args:
+        pos = args.index("--lang")
+        languages = [lang.strip() for lang in args[pos + 1].split(",") if lang.strip()]
+        del args[pos:pos + 2]
+    target = args[0] if args else "all"
+    catalogs = list(CATALOGS) if target == "all" else [target]
+    if any(catalog not in CATALOGS for catalog in catalogs):
+        print(f"❌ Unknown catalog '{target}' - expected jobs, careers or all")
+        return 2
+
+    engine = TranslationEngine(TranslationIndex(loader=load_translation_table), TranslationCache(db_path=default_cache_path()),
+                               GoogleTranslateProvider())
+
+    async def run():
+        for catalog in catalogs:
+            print(f"🔄 Backfilling {catalog} translations")
+            stored = await backfill(engine, catalog, languages)
+            print(f"✅ {catalog}: {stored} translations stored")
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
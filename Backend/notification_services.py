@@ -0,0 +1,230 @@
+# notification_services.py - unread counters, keyset-paged listing and change wake-ups
+#
+#   python notification_services.py recount [<user_id> ...]   rebuild counters from the notifications table
+#
+# notification_counters holds one row per user: the unread count and a
+# version bumped on every change. Writers update it in the same transaction
+# as the notifications themselves (insert_notifications, mark_read), so a
+# badge is a primary-key read instead of a COUNT(*) over the user's rows.
+#
+# Every counter change is announced on NOTIFICATION_COUNT_CHANNEL. Each
+# worker wakes the long-polls of that user (NotificationFeed) and pushes
+# the new count to the user's WebSocket connections, so clients wait for a
+# change instead of polling.
+import asyncio
+import json
+import logging
+import sys
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from pagination import keyset_condition, keyset_params, split_page
+from queries import NOTIFICATIONS_ORDER, NOTIFICATIONS_SQL
+
+logger = logging.getLogger(__name__)
+
+# Hub channel carrying {"user_id", "unread", "version"} after every counter change
+NOTIFICATION_COUNT_CHANNEL = "internal:notification_counts"
+
+LONG_POLL_SECONDS = 25.0
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def _placeholders(values) -> str:
+    return ", ".join(["%s"] * len(values))
+
+
+def read_counters(cursor, user_ids: Iterable[int]) -> List[Dict]:
+    user_ids = sorted(set(int(u) for u in user_ids))
+    if not user_ids:
+        return []
+    cursor.execute(f"""
+        SELECT user_id, unread, version FROM notification_counters
+        WHERE user_id IN ({_placeholders(user_ids)})
+    """, tuple(user_ids))
+    rows = cursor.fetchall()
+    found = {}
+    for row in rows:
+        user_id, unread, version = (row["user_id"], row["unread"], row["version"]) if isinstance(row, dict) else row
+        found[user_id] = {"user_id": user_id, "unread": int(unread), "version": int(version)}
+    return [found.get(u, {"user_id": u, "unread": 0, "version": 0}) for u in user_ids]
+
+
+def insert_notifications(cursor, notifications: List[Dict]) -> List[Dict]:
+    """Insert notification rows and raise their users' counters; caller commits.
+
+    Returns the new counter of every affected user.
+    """
+    if not notifications:
+        return []
+    now = datetime.utcnow()
+    cursor.executemany("""
+        INSERT INTO notifications (user_id, title, message, type, created_at)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(n["user_id"], n["title"], n["message"], n.get("type", "system"), n.get("created_at") or now)
+          for n in notifications])
+    added = Counter(int(n["user_id"]) for n in notifications)
+    cursor.executemany("""
+        INSERT INTO notification_counters (user_id, unread, version) VALUES (%s, %s, 1)
+        ON DUPLICATE KEY UPDATE unread = unread + VALUES(unread), version = version + 1
+    """, sorted(added.items()))
+    return read_counters(cursor, added)
+
+
+def mark_read(user_id: int, notification_ids: Optional[List[int]] = None) -> Dict:
+    """Mark the given notifications (all when None) read; returns the user's new counter"""
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        sql = "UPDATE notifications SET is_read = TRUE WHERE user_id = %s AND is_read = FALSE"
+        params: List = [user_id]
+        if notification_ids is not None:
+            ids = sorted(set(int(i) for i in notification_ids))
+            if not ids:
+                return dict(read_counters(cursor, [user_id])[0], marked=0)
+            sql += f" AND notification_id IN ({_placeholders(ids)})"
+            params += ids
+        cursor.execute(sql, tuple(params))
+        changed = cursor.rowcount
+        if changed:
+            if notification_ids is None:
+                cursor.execute("""
+                    UPDATE notification_counters SET unread = 0, version = version + 1 WHERE user_id = %s
+                """, (user_id,))
+            else:
+                cursor.execute("""
+                    UPDATE notification_counters SET unread = GREATEST(unread - %s, 0), version = version + 1
+                    WHERE user_id = %s
+                """, (changed, user_id))
+        counter = read_counters(cursor, [user_id])[0]
+        conn.commit()
+        return dict(counter, marked=changed)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def unread_counter(user_id: int) -> Dict:
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        return read_counters(cursor, [user_id])[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def list_notifications(user_id: int, page_size: int, page_cursor: Optional[str] = None,
+                       unread_only: bool = False) -> Dict:
+    """Newest first, keyset-paged on (created_at, notification_id); raises ValueError for a bad cursor"""
+    keyset = keyset_params(page_cursor)
+    conn = _connect()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        sql = NOTIFICATIONS_SQL
+        params: List = [user_id]
+        if unread_only:
+            sql += " AND is_read = FALSE"
+        if keyset:
+            sql += " AND " + keyset_condition("created_at", "notification_id", keyset)
+            params += keyset
+        cursor.execute(sql + NOTIFICATIONS_ORDER, params + [page_size + 1])
+        rows, next_cursor = split_page(cursor.fetchall(), page_size, "created_at", "notification_id")
+        counter = read_counters(cursor, [user_id])[0]
+        return {"notifications": rows, "next_cursor": next_cursor,
+                "unread": counter["unread"], "version": counter["version"]}
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def recount(user_ids: Optional[List[int]] = None) -> int:
+    """Rebuild counters from the notifications table; returns the number of users touched"""
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        sql = """
+            INSERT INTO notification_counters (user_id, unread, version)
+            SELECT user_id, SUM(is_read = FALSE), 1 FROM notifications
+        """
+        params: List = []
+        if user_ids:
+            sql += f" WHERE user_id IN ({_placeholders(user_ids)})"
+            params = list(user_ids)
+        cursor.execute(sql + """
+            GROUP BY user_id
+            ON DUPLICATE KEY UPDATE unread = VALUES(unread), version = version + 1
+        """, tuple(params))
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class NotificationFeed:
+    """Per-worker long-poll waiters, woken by counter changes from any worker"""
+
+    def __init__(self):
+        self._waiters: Dict[int, Set[asyncio.Future]] = {}
+
+    def notify(self, payload):
+        """Hub listener for NOTIFICATION_COUNT_CHANNEL"""
+        change = json.loads(payload) if isinstance(payload, (str, bytes)) else payload
+        for future in self._waiters.pop(int(change["user_id"]), ()):
+            if not future.done():
+                future.set_result(change)
+
+    def waiting(self, user_id: int) -> int:
+        return len(self._waiters.get(user_id, ()))
+
+    async def wait(self, user_id: int, since_version: int, timeout: float = LONG_POLL_SECONDS,
+                   current=unread_counter) -> Dict:
+        """Return the user's counter as soon as its version differs from `since_version`.
+
+        The waiter is registered before the counter is read, so a change
+        landing in between still wakes it. On timeout the unchanged counter
+        is returned.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, set()).add(future)
+        try:
+            counter = await asyncio.to_thread(current, user_id)
+            if counter["version"] != since_version:
+                return dict(counter, changed=True)
+            try:
+                change = await asyncio.wait_for(future, timeout)
+                return {"user_id": user_id, "unread": change["unread"], "version": change["version"], "changed": True}
+            except asyncio.TimeoutError:
+                return dict(counter, changed=False)
+        finally:
+            waiters = self._waiters.get(user_id)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    self._waiters.pop(user_id, None)
+
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] == "recount":
+        touched = recount([int(arg) for arg in argv[1:]] or None)
+        print(f"✅ Notification counters rebuilt ({touched} rows written)")
+        return 0
+    print("usage: python notification_services.py recount [<user_id> ...]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,372 @@
+# outbox_services.py - side effects (email, notifications, pushes) moved off the request path
+#
+#   python outbox_services.py drain [--batch 100]    deliver every pending stored event once
+#   python outbox_services.py status                 pending / done / failed counts
+#
+# Requests record what should happen and return:
+#   - outbox.add(cursor, kind, payload) writes an outbox_events row inside
+#     the caller's transaction, so the event exists iff the change committed
+#   - outbox.enqueue(kind, payload) appends to an in-process queue for
+#     best-effort events that have no transaction to join
+#
+# OutboxWorker drains both in batches: emails go through one transport
+# connection per batch, notifications are bulk-inserted and every
+# notification is also pushed to the user's hub channel. Claimed rows are
+# hidden for CLAIM_SECONDS, so a worker that dies mid-batch only delays its
+# events; failures are retried with backoff up to MAX_ATTEMPTS, and
+# in-process events that fail are persisted so they are retried too.
+#
+# Email transport comes from the environment: SMTP_HOST (plus SMTP_PORT,
+# SMTP_USER, SMTP_PASSWORD, SMTP_SENDER, SMTP_STARTTLS) selects SMTP;
+# without it emails are only logged.
+import asyncio
+import json
+import logging
+import os
+import smtplib
+import sys
+from collections import deque
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Tuple
+
+from notification_services import NOTIFICATION_COUNT_CHANNEL, insert_notifications
+from realtime_services import user_channel
+
+logger = logging.getLogger(__name__)
+
+EMAIL = "email"
+NOTIFICATION = "notification"
+PUSH = "push"
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+CLAIM_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+
+
+class LogTransport:
+    """Default transport: print the email like the original send_email did"""
+
+    def send_batch(self, messages: List[Dict]) -> List[bool]:
+        for message in messages:
+            print(f"📧 EMAIL SENT TO {message['to']}: {message['subject']}")
+            print(f"📧 CONTENT: {message['body'][:100]}...")
+        return [True] * len(messages)
+
+
+class SMTPTransport:
+    """One SMTP session per batch"""
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None, password: Optional[str] = None,
+                 sender: str = "noreply@greenmatchers.com", starttls: bool = True, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send_batch(self, messages: List[Dict]) -> List[bool]:
+        results = []
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            for message in messages:
+                email = EmailMessage()
+                email["From"] = self.sender
+                email["To"] = message["to"]
+                email["Subject"] = message["subject"]
+                email.set_content(message["body"])
+                try:
+                    smtp.send_message(email)
+                    results.append(True)
+                except smtplib.SMTPException as e:
+                    logger.warning(f"Email to {message['to']} failed: {e}")
+                    results.append(False)
+        return results
+
+
+def transport_from_env():
+    host = os.getenv("SMTP_HOST")
+    if not host:
+        return LogTransport()
+    return SMTPTransport(host, int(os.getenv("SMTP_PORT", "587")), os.getenv("SMTP_USER"), os.getenv("SMTP_PASSWORD"),
+                         os.getenv("SMTP_SENDER", "noreply@greenmatchers.com"),
+                         os.getenv("SMTP_STARTTLS", "1") not in ("0", "false", "no"))
+
+
+class OutboxStore:
+    """outbox_events table access; every method opens its own pooled connection"""
+
+    def __init__(self, connection_factory: Optional[Callable] = None):
+        self.connection_factory = connection_factory
+
+    def _connect(self):
+        if self.connection_factory is None:
+            from database import get_db_connection
+            self.connection_factory = get_db_connection
+        conn = self.connection_factory()
+        if not conn:
+            raise ConnectionError("Database connection failed")
+        return conn
+
+    @staticmethod
+    def add(cursor, kind: str, payload: Dict):
+        """Record an event in the caller's transaction"""
+        cursor.execute("INSERT INTO outbox_events (kind, payload) VALUES (%s, %s)",
+                       (kind, json.dumps(payload, default=str)))
+
+    def persist(self, events: List[Dict], delay_seconds: int = 0):
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO outbox_events (kind, payload, attempts, available_at)
+                VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+            """, [(e["kind"], json.dumps(e["payload"], default=str), e.get("attempts", 0), delay_seconds)
+                  for e in events])
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def claim(self, batch_size: int) -> List[Dict]:
+        """Take the oldest available events and hide them from other workers for CLAIM_SECONDS"""
+        conn = self._connect()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT event_id, kind, payload, attempts FROM outbox_events
+                WHERE status = 'pending' AND available_at <= NOW()
+                ORDER BY available_at, event_id LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            """, (batch_size,))
+            rows = cursor.fetchall()
+            if rows:
+                ids = [row["event_id"] for row in rows]
+                cursor.execute(f"""
+                    UPDATE outbox_events SET available_at = NOW() + INTERVAL %s SECOND
+                    WHERE event_id IN ({', '.join(['%s'] * len(ids))})
+                """, (CLAIM_SECONDS, *ids))
+            conn.commit()
+            for row in rows:
+                row["payload"] = json.loads(row["payload"])
+            return rows
+        finally:
+            cursor.close()
+            conn.close()
+
+    def finish(self, done: List[int], failed: List[Dict]):
+        """Mark delivered events and reschedule (or give up on) failed ones"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            if done:
+                cursor.execute(f"""
+                    UPDATE outbox_events SET status = 'done', processed_at = NOW()
+                    WHERE event_id IN ({', '.join(['%s'] * len(done))})
+                """, tuple(done))
+            if failed:
+                cursor.executemany("""
+                    UPDATE outbox_events
+                    SET attempts = %s, status = %s, available_at = NOW() + INTERVAL %s SECOND
+                    WHERE event_id = %s
+                """, [(e["attempts"], "failed" if e["attempts"] >= MAX_ATTEMPTS else "pending",
+                       RETRY_BASE_SECONDS * 2 ** (e["attempts"] - 1), e["event_id"]) for e in failed])
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def counts(self) -> Dict[str, int]:
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT status, COUNT(*) FROM outbox_events GROUP BY status")
+            return {status: count for status, count in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def insert_notifications(self, notifications: List[Dict]) -> List[Dict]:
+        """Bulk insert with counter updates; returns the affected users' new counters"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            counters = insert_notifications(cursor, notifications)
+            conn.commit()
+            return counters
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+
+class Outbox:
+    """Request-side API: transactional rows plus an in-process queue"""
+
+    def __init__(self, store: Optional[OutboxStore] = None, max_local: int = 10000):
+        self.store = store or OutboxStore()
+        self.local: deque = deque(maxlen=max_local)
+
+    def add(self, cursor, kind: str, payload: Dict):
+        self.store.add(cursor, kind, payload)
+
+    def enqueue(self, kind: str, payload: Dict):
+        self.local.append({"kind": kind, "payload": payload, "attempts": 0})
+
+    def take_local(self, limit: int) -> List[Dict]:
+        events = []
+        while self.local and len(events) < limit:
+            events.append(self.local.popleft())
+        return events
+
+
+class OutboxWorker:
+    """Background asyncio task draining the outbox in batches"""
+
+    def __init__(self, outbox: Outbox, transport=None, publish: Optional[Callable[[str, Dict], None]] = None,
+                 channel_for_user: Callable[[int], str] = user_channel,
+                 interval: float = 1.0, batch_size: int = BATCH_SIZE):
+        self.outbox = outbox
+        self.transport = transport or transport_from_env()
+        self.publish = publish
+        self.channel_for_user = channel_for_user
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        self.delivered = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Whatever is still queued in memory survives the restart in the table
+        remaining = self.outbox.take_local(len(self.outbox.local))
+        if remaining:
+            await asyncio.to_thread(self.outbox.store.persist, remaining)
+
+    async def _run(self):
+        while True:
+            try:
+                handled = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox batch failed: {e}")
+                handled = 0
+            if handled < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    async def drain_once(self) -> int:
+        """Dispatch one batch of in-process and stored events; returns how many were handled"""
+        local = self.outbox.take_local(self.batch_size)
+        stored = []
+        if len(local) < self.batch_size:
+            try:
+                stored = await asyncio.to_thread(self.outbox.store.claim, self.batch_size - len(local))
+            except Exception as e:
+                logger.error(f"Outbox claim failed: {e}")
+        events = local + stored
+        if not events:
+            return 0
+
+        ok, counters = await asyncio.to_thread(self._deliver, events)
+        # The hub is loop-bound, so pushes happen here rather than in the delivery thread
+        for counter in counters:
+            if self.publish:
+                self.publish(NOTIFICATION_COUNT_CHANNEL, counter)
+        for event, success in zip(events, ok):
+            if success and self.publish:
+                payload = event["payload"]
+                if event["kind"] == NOTIFICATION:
+                    self.publish(self.channel_for_user(payload["user_id"]), {"type": "notification", **payload})
+                elif event["kind"] == PUSH:
+                    self.publish(payload["channel"], payload["message"])
+
+        done = [e["event_id"] for e, success in zip(events, ok) if success and "event_id" in e]
+        failed = [dict(e, attempts=e.get("attempts", 0) + 1) for e, success in zip(events, ok) if not success]
+        self.delivered += sum(ok)
+        self.failed += len(failed)
+        if done or any("event_id" in e for e in failed):
+            await asyncio.to_thread(self.outbox.store.finish, done, [e for e in failed if "event_id" in e])
+        retry_local = [e for e in failed if "event_id" not in e]
+        if retry_local:
+            await asyncio.to_thread(self.outbox.store.persist, retry_local, RETRY_BASE_SECONDS)
+        return len(events)
+
+    def _deliver(self, events: List[Dict]) -> Tuple[List[bool], List[Dict]]:
+        """Send the batch's emails and insert its notifications.
+
+        Returns per-event success in input order and the unread counters the
+        inserts changed.
+        """
+        ok, counters = [False] * len(events), []
+        groups: Dict[str, List[int]] = {}
+        for i, event in enumerate(events):
+            groups.setdefault(event["kind"], []).append(i)
+
+        emails = groups.get(EMAIL, [])
+        if emails:
+            try:
+                sent = self.transport.send_batch([events[i]["payload"] for i in emails])
+                for i, success in zip(emails, sent):
+                    ok[i] = success
+            except Exception as e:
+                logger.error(f"Email transport failed for {len(emails)} messages: {e}")
+
+        notifications = groups.get(NOTIFICATION, [])
+        if notifications:
+            try:
+                counters = self.outbox.store.insert_notifications([events[i]["payload"] for i in notifications]) or []
+                for i in notifications:
+                    ok[i] = True
+            except Exception as e:
+                logger.error(f"Bulk notification insert failed for {len(notifications)} rows: {e}")
+
+        for i in groups.get(PUSH, []):
+            ok[i] = True
+
+        for kind in set(groups) - {EMAIL, NOTIFICATION, PUSH}:
+            logger.error(f"Unknown outbox event kind '{kind}'")
+        return ok, counters
+
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] == "drain":
+        batch = int(argv[argv.index("--batch") + 1]) if "--batch" in argv else BATCH_SIZE
+        worker = OutboxWorker(Outbox(), batch_size=batch)
+
+        async def drain_all():
+            total = 0
+            while True:
+                handled = await worker.drain_once()
+                total += handled
+                if handled < batch:
+                    return total
+
+        total = asyncio.run(drain_all())
+        print(f"✅ {worker.delivered} of {total} outbox events delivered, {worker.failed} rescheduled")
+        return 0
+    if argv and argv[0] == "status":
+        for status, count in sorted(OutboxStore().counts().items()):
+            print(f"{status:8} {count}")
+        return 0
+    print("usage: python outbox_services.py drain [--batch 100] | status")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,81 @@
+# pagination.py - keyset (cursor) pagination helpers
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Approximate totals stop counting here so a count never scans a whole table
+APPROXIMATE_TOTAL_CAP = 1000
+
+
+def encode_cursor(sort_value: Union[datetime, float, None], row_id: int) -> str:
+    """Opaque cursor for the (timestamp or score, id) position of the last row on a page"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    elif sort_value is not None:
+        sort_value = float(sort_value)
+    raw = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, float, None], int]:
+    """Inverse of encode_cursor - raises ValueError for anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if sort_value is None:
+            return None, int(row_id)
+        if isinstance(sort_value, (int, float)):
+            return float(sort_value), int(row_id)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def keyset_condition(sort_column: str, id_column: str, keyset: Optional[Sequence] = None) -> str:
+    """WHERE fragment selecting rows after a cursor for ORDER BY sort DESC, id DESC.
+
+    Written as an OR instead of a row comparison so MariaDB can use the
+    composite (…, sort, id) index as a range. NULL sort values come last in
+    that order, so they follow every non-NULL row; a cursor sitting on a
+    NULL row (one-element `keyset`) continues on the id alone.
+    """
+    if keyset is not None and len(keyset) == 1:
+        return f"({sort_column} IS NULL AND {id_column} < %s)"
+    return f"({sort_column} < %s OR ({sort_column} = %s AND {id_column} < %s) OR {sort_column} IS NULL)"
+
+
+def keyset_params(cursor: Optional[str]) -> List[Any]:
+    """Parameters for keyset_condition; pass the same list to it"""
+    if not cursor:
+        return []
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return [row_id]
+    return [sort_value, sort_value, row_id]
+
+
+def split_page(rows: Sequence[Dict], page_size: int, sort_key: str, id_key: str) -> Tuple[List[Dict], Optional[str]]:
+    """Trim the extra look-ahead row and build the cursor for the next page"""
+    rows = list(rows)
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    last = page[-1]
+    return page, encode_cursor(last[sort_key], last[id_key])
+
+
+def approximate_total(cursor, from_where_sql: str, params: Sequence, cap: int = APPROXIMATE_TOTAL_CAP) -> Dict:
+    """Count matching rows, stopping at `cap`.
+
+    `from_where_sql` is the FROM/JOIN/WHERE part of the listing query
+    without the cursor condition, ORDER BY or LIMIT.
+    """
+    cursor.execute(f"SELECT COUNT(*) AS total FROM (SELECT 1 {from_where_sql} LIMIT %s) AS capped",
+                   list(params) + [cap + 1])
+    row = cursor.fetchone()
+    total = row["total"] if isinstance(row, dict) else row[0]
+    return {"total": min(total, cap), "total_is_approximate": total > cap}
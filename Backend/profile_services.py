@@ -0,0 +1,119 @@
+# profile_services.py - profile aggregate loading and per-user profile cache
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from pagination import DEFAULT_PAGE_SIZE, split_page
+from queries import EDUCATION_SQL, EXPERIENCE_SQL, PROFILE_SQL
+
+logger = logging.getLogger(__name__)
+
+# Hub channel used to invalidate cached profiles in every worker
+PROFILE_INVALIDATION_CHANNEL = "internal:profile_invalidate"
+
+
+class ProfileCache:
+    """LRU cache of assembled profile responses keyed by user_id.
+
+    Entries expire after `ttl` seconds as a safety net; writes to any part
+    of the profile invalidate the entry immediately. A load that started
+    before an invalidation must not repopulate the cache with what it read,
+    so readers take generation(user_id) before loading and pass it to set(),
+    which refuses values read under an older generation.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # user_id -> generation of its last invalidation, drawn from one counter;
+        # users pruned from it count as invalidated at _floor
+        self._generations: "OrderedDict[int, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_sets = 0
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self, user_id: int) -> int:
+        """Token to take before reading a profile and hand to set()"""
+        return self._counter
+
+    def set(self, user_id: int, profile: Dict, generation: Optional[int] = None) -> bool:
+        """Cache a profile unless it was invalidated after `generation` was taken"""
+        if generation is not None and self._generations.get(user_id, self._floor) > generation:
+            self.stale_sets += 1
+            return False
+        self._entries[user_id] = (time.monotonic() + self.ttl, profile)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, user_id: int):
+        user_id = int(user_id)
+        self._entries.pop(user_id, None)
+        self._counter += 1
+        self._generations[user_id] = self._counter
+        self._generations.move_to_end(user_id)
+        while len(self._generations) > self.max_entries:
+            _, pruned = self._generations.popitem(last=False)
+            self._floor = max(self._floor, pruned)
+
+
+def _query(sql: str, params: tuple, one: bool = False):
+    """Run one read on its own pooled connection - called from a worker thread"""
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchone() if one else cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+async def load_profile(user_id: int) -> Dict:
+    """Fetch profile, education, experience and the first applications page concurrently.
+
+    The four reads go out at the same time on separate pooled connections, so
+    the aggregate costs one round-trip of latency instead of four.
+    """
+    profile, education, experience, applications = await asyncio.gather(
+        asyncio.to_thread(_query, PROFILE_SQL, (user_id,), True),
+        asyncio.to_thread(_query, EDUCATION_SQL, (user_id,)),
+        asyncio.to_thread(_query, EXPERIENCE_SQL, (user_id,)),
+        asyncio.to_thread(_query, """
+            SELECT a.*, j.title as job_title, j.company
+            FROM applications a
+            JOIN jobs j ON a.job_id = j.job_id
+            WHERE a.user_id = %s
+            ORDER BY a.applied_at DESC, a.application_id DESC
+            LIMIT %s
+        """, (user_id, DEFAULT_PAGE_SIZE + 1)),
+    )
+    applications, applications_cursor = split_page(applications, DEFAULT_PAGE_SIZE, "applied_at", "application_id")
+
+    return {
+        "profile": profile,
+        "education": education,
+        "experience": experience,
+        "applications": applications,
+        "applications_next_cursor": applications_cursor
+    }
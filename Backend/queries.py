@@ -0,0 +1,65 @@
+# queries.py - SQL for the hot endpoint queries
+#
+# app.py and the services build their queries from these fragments, and
+# explain_check.py EXPLAINs the very same text, so the index check can not
+# drift from what the endpoints actually run. Listing fragments stop after
+# WHERE so callers can append filters and the keyset condition
+# (pagination.keyset_condition) before the ORDER BY.
+
+# POST /api/jobs/search-enhanced - params: lang
+JOB_SEARCH_FROM = """
+    FROM jobs j
+    LEFT JOIN companies c ON j.company = c.name
+    LEFT JOIN job_translations jt ON jt.job_id = j.job_id AND jt.lang = %s
+    WHERE j.status = 'active' AND j.canonical_job_id IS NULL
+"""
+JOB_SEARCH_ORDER = " ORDER BY j.created_at DESC, j.job_id DESC LIMIT %s"
+
+# GET /api/users/applications - params: user_id
+USER_APPLICATIONS_FROM = """
+    FROM applications a
+    JOIN jobs j ON a.job_id = j.job_id
+    WHERE a.user_id = %s
+"""
+
+# GET /api/employer/applications - params: employer user_id
+EMPLOYER_APPLICATIONS_FROM = """
+    FROM applications a
+    JOIN jobs j ON a.job_id = j.job_id
+    JOIN users u ON a.user_id = u.user_id
+    LEFT JOIN user_profiles up ON a.user_id = up.user_id
+    WHERE j.employer_id IN (
+        SELECT employer_id FROM employer_profiles WHERE user_id = %s
+    )
+"""
+APPLICATIONS_ORDER = " ORDER BY a.applied_at DESC, a.application_id DESC LIMIT %s"
+
+# POST /match_jobs radius search - params: min_lat, max_lat, min_lon, max_lon, location LIKE pattern.
+# Jobs without coordinates (not geocoded yet, or an unknown place) still match by location text.
+NEARBY_JOBS_CONDITION = """(
+    (jobs.latitude BETWEEN %s AND %s AND jobs.longitude BETWEEN %s AND %s)
+    OR (jobs.latitude IS NULL AND jobs.location LIKE %s)
+)"""
+
+# POST /api/jobs/apply - params: user_id, job_id
+APPLICATION_EXISTS_SQL = "SELECT application_id FROM applications WHERE user_id = %s AND job_id = %s"
+
+# GET /api/users/profile - params: user_id
+PROFILE_SQL = "SELECT * FROM user_profiles WHERE user_id = %s"
+EDUCATION_SQL = "SELECT * FROM user_education WHERE user_id = %s ORDER BY end_date DESC"
+EXPERIENCE_SQL = "SELECT * FROM user_experience WHERE user_id = %s ORDER BY start_date DESC"
+
+# POST /api/employer/jobs and bulk import - params: employer user_id
+EMPLOYER_PROFILE_SQL = """
+    SELECT ep.employer_id, ep.company_id, c.name AS company_name
+    FROM employer_profiles ep
+    JOIN companies c ON ep.company_id = c.company_id
+    WHERE ep.user_id = %s
+"""
+
+# GET /api/notifications - params: user_id
+NOTIFICATIONS_SQL = """
+    SELECT notification_id, title, message, type, is_read, created_at
+    FROM notifications WHERE user_id = %s
+"""
+NOTIFICATIONS_ORDER = " ORDER BY created_at DESC, notification_id DESC LIMIT %s"
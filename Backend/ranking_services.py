@@ -0,0 +1,170 @@
+# ranking_services.py - one vectorized scoring pass over all job candidates
+#
+# Every feature is computed as a NumPy array over the whole candidate set
+# and scaled to [0, 1]; the score is their weighted mean. Features that
+# cannot be computed for a request (no query embedding, no location, no
+# expected salary) drop out and the remaining weights are renormalised.
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS = {
+    "semantic": 0.35,
+    "keyword": 0.25,
+    "distance": 0.15,
+    "salary": 0.15,
+    "recency": 0.10,
+}
+
+
+def weights_from_env(defaults: Dict[str, float] = DEFAULT_WEIGHTS) -> Dict[str, float]:
+    """Override weights with RANKING_WEIGHTS="semantic=0.5,keyword=0.2" """
+    weights = dict(defaults)
+    for item in os.getenv("RANKING_WEIGHTS", "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name in weights:
+            try:
+                weights[name] = max(0.0, float(value))
+            except ValueError:
+                logger.warning(f"Ignoring RANKING_WEIGHTS entry '{item}'")
+    return weights
+
+
+def to_lpa(amount) -> Optional[float]:
+    """Salaries are stored both in LPA (8.5) and in rupees per year (850000)"""
+    if amount is None:
+        return None
+    amount = float(amount)
+    return amount / 100000 if amount > 1000 else amount
+
+
+def _parse_vector(value) -> Optional[List[float]]:
+    if not value:
+        return None
+    try:
+        vector = json.loads(value) if isinstance(value, str) else value
+    except ValueError:
+        return None
+    return vector if isinstance(vector, list) and vector else None
+
+
+class RankingPipeline:
+    """Scores candidates on semantic similarity, keyword overlap, distance, salary fit and recency"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, distance_scale_km: float = 50.0,
+                 recency_half_life_days: float = 30.0):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.distance_scale_km = distance_scale_km
+        self.recency_half_life_days = recency_half_life_days
+
+    # ---- features: each returns an array in [0, 1] or None when unavailable ----
+    def semantic(self, jobs: List[Dict], query_vector) -> Optional[np.ndarray]:
+        if query_vector is None:
+            return None
+        vectors = [_parse_vector(job.get("desc_vector_json")) for job in jobs]
+        present = [i for i, v in enumerate(vectors) if v is not None and len(v) == len(query_vector)]
+        if not present:
+            return None
+        matrix = np.array([vectors[i] for i in present], dtype=float)
+        query = np.asarray(query_vector, dtype=float)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        cosine = np.divide(matrix @ query, norms, out=np.zeros(len(present)), where=norms > 0)
+        scores = np.zeros(len(jobs))
+        scores[present] = (np.clip(cosine, -1.0, 1.0) + 1) / 2
+        return scores
+
+    def keyword(self, jobs: List[Dict], skills: List[str], query_skill_ids=None) -> Optional[np.ndarray]:
+        skills = [s.strip().lower() for s in skills if s and s.strip()]
+        if not skills:
+            return None
+        scores = np.zeros(len(jobs))
+        # Tagged jobs: overlap of canonical skill IDs; untagged jobs: substring hits
+        wanted = set(query_skill_ids or ())
+        untagged = []
+        for i, job in enumerate(jobs):
+            if wanted and job.get("skill_ids"):
+                scores[i] = len(wanted.intersection(job["skill_ids"])) / len(wanted)
+            else:
+                untagged.append(i)
+        if untagged:
+            texts = np.array([(jobs[i].get("search_text") or
+                               " ".join(str(jobs[i].get(f) or "") for f in ("title", "description", "skills"))).lower()
+                              for i in untagged])
+            hits = np.stack([np.char.find(texts, skill) >= 0 for skill in skills])
+            scores[untagged] = hits.mean(axis=0)
+        return scores
+
+    def distance(self, jobs: List[Dict]) -> Optional[np.ndarray]:
+        distances = np.array([job.get("distance_km") for job in jobs], dtype=float)
+        if np.isnan(distances).all():
+            return None
+        # Unknown distance scores as neutral rather than as far away
+        return np.where(np.isnan(distances), 0.5, np.exp(-distances / self.distance_scale_km))
+
+    def salary(self, jobs: List[Dict], expected_salary) -> Optional[np.ndarray]:
+        expected = to_lpa(expected_salary)
+        if not expected:
+            return None
+        offered = np.array([to_lpa(job.get("salary_value")) if job.get("salary_value") is not None else np.nan
+                            for job in jobs], dtype=float)
+        fit = np.clip(offered / expected, 0.0, 1.0)
+        return np.where(np.isnan(fit), 0.5, fit)
+
+    def recency(self, jobs: List[Dict], now: Optional[datetime] = None) -> Optional[np.ndarray]:
+        created = [job.get("created_at") for job in jobs]
+        if not any(isinstance(c, datetime) for c in created):
+            return None
+        now = now or datetime.utcnow()
+        age_days = np.array([(now - c).total_seconds() / 86400 if isinstance(c, datetime) else np.nan
+                             for c in created], dtype=float)
+        decay = 0.5 ** (np.clip(age_days, 0, None) / self.recency_half_life_days)
+        return np.where(np.isnan(decay), 0.5, decay)
+
+    # ---- pipeline ----
+    def rank(self, jobs: List[Dict], skills: List[str], query_vector=None, expected_salary=None,
+             now: Optional[datetime] = None, query_skill_ids=None) -> Tuple[List[Dict], Dict]:
+        """Return jobs sorted by score (each with `score`) and a report with weights and timings"""
+        timings = {}
+        features = {}
+        if not jobs:
+            return [], {"weights": {}, "timings_ms": {}}
+
+        steps = [
+            ("semantic", lambda: self.semantic(jobs, query_vector)),
+            ("keyword", lambda: self.keyword(jobs, skills, query_skill_ids)),
+            ("distance", lambda: self.distance(jobs)),
+            ("salary", lambda: self.salary(jobs, expected_salary)),
+            ("recency", lambda: self.recency(jobs, now)),
+        ]
+        for name, compute in steps:
+            if not self.weights.get(name):
+                continue
+            started = time.perf_counter()
+            values = compute()
+            timings[name] = round((time.perf_counter() - started) * 1000, 3)
+            if values is not None:
+                features[name] = values
+
+        started = time.perf_counter()
+        used = {name: self.weights[name] for name in features}
+        total = sum(used.values())
+        if total:
+            scores = sum(used[name] * values for name, values in features.items()) / total
+        else:
+            scores = np.zeros(len(jobs))
+        order = np.argsort(-scores, kind="stable")
+        ranked = [dict(jobs[i], score=round(float(scores[i]), 4)) for i in order]
+        timings["combine"] = round((time.perf_counter() - started) * 1000, 3)
+
+        return ranked, {
+            "weights": {name: round(weight / total, 3) for name, weight in used.items()} if total else {},
+            "timings_ms": timings,
+        }
@@ -0,0 +1,351 @@
+# realtime_services.py - shared real-time publishers for WebSocket clients
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Fallback numbers shown when the database is unavailable
+FALLBACK_STATS = {"total_jobs": 547, "companies": 51}
+
+# Largest message forwarded to other workers through the relay
+RELAY_MAX_DATAGRAM = 60000
+
+
+# Channel names used by the hub
+BROADCAST_CHANNEL = "all"
+STATS_CHANNEL = "topic:stats"
+
+
+def user_channel(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def topic_channel(name: str) -> str:
+    return f"topic:{name}"
+
+
+class UnixSocketRelay:
+    """Relays hub messages to the other workers on this host.
+
+    Every worker binds a datagram socket in a shared directory and sends each
+    published message to all other sockets found there. Stale sockets left
+    behind by dead workers are removed on the first failed send.
+    """
+
+    def __init__(self, directory: str, peer_refresh: float = 2.0):
+        self.directory = Path(directory)
+        self.peer_refresh = peer_refresh
+        self.path = self.directory / f"{os.getpid()}.sock"
+        self.sock = None
+        self._loop = None
+        self._on_message = None
+        self._peers: List[str] = []
+        self._peers_checked = 0.0
+
+    @classmethod
+    def create_default(cls, scope: str = "") -> Optional["UnixSocketRelay"]:
+        """Relay in a directory private to `scope` (e.g. the database the workers share), so two
+        deployments on one host never see each other's sockets; BROADCAST_RELAY_DIR overrides it"""
+        if not hasattr(socket, "AF_UNIX"):
+            logger.warning("Unix sockets unavailable - cross-worker broadcast disabled")
+            return None
+        suffix = hashlib.blake2b(scope.encode("utf-8"), digest_size=6).hexdigest()
+        directory = os.getenv("BROADCAST_RELAY_DIR",
+                              os.path.join(tempfile.gettempdir(), f"green_matchers_relay_{suffix}"))
+        return cls(directory)
+
+    def start(self, loop, on_message: Callable[[str, str], None]) -> bool:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self.path.unlink()
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(str(self.path))
+            self.sock.setblocking(False)
+            loop.add_reader(self.sock.fileno(), self._on_readable)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Broadcast relay unavailable: {e}")
+            self.close()
+            return False
+        self._loop = loop
+        self._on_message = on_message
+        logger.info(f"📡 Broadcast relay listening on {self.path}")
+        return True
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = self.sock.recv(RELAY_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.error(f"Broadcast relay receive failed: {e}")
+                return
+            try:
+                message = json.loads(data.decode("utf-8"))
+                self._on_message(message["channel"], message["payload"])
+            except Exception as e:
+                logger.error(f"Dropping malformed relay message: {e}")
+
+    def _current_peers(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._peers_checked > self.peer_refresh:
+            own = str(self.path)
+            self._peers = [str(p) for p in self.directory.glob("*.sock") if str(p) != own]
+            self._peers_checked = now
+        return self._peers
+
+    def send(self, channel: str, payload: str):
+        if self.sock is None:
+            return
+        data = json.dumps({"channel": channel, "payload": payload}).encode("utf-8")
+        if len(data) > RELAY_MAX_DATAGRAM:
+            logger.warning(f"Relay message for {channel} too large ({len(data)} bytes) - local delivery only")
+            return
+        for peer in self._current_peers():
+            try:
+                self.sock.sendto(data, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker is gone - forget its socket
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+                self._peers_checked = 0.0
+            except (BlockingIOError, InterruptedError):
+                logger.warning(f"Relay peer {peer} is backlogged - message dropped")
+            except OSError as e:
+                logger.error(f"Relay send to {peer} failed: {e}")
+
+    def close(self):
+        if self.sock is not None:
+            if self._loop is not None:
+                try:
+                    self._loop.remove_reader(self.sock.fileno())
+                except Exception:
+                    pass
+            self.sock.close()
+            self.sock = None
+        try:
+            if self.path.exists():
+                self.path.unlink()
+        except OSError:
+            pass
+
+
+class HubConnection:
+    """A subscribed WebSocket with its own bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, channels: Iterable[str], queue_size: int):
+        self.websocket = websocket
+        self.channels: Set[str] = set(channels)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer = None
+
+
+class BroadcastHub:
+    """Non-blocking broadcast hub for WebSocket clients.
+
+    publish() only enqueues and returns, so request handlers never wait on
+    client sockets. A dispatcher task puts each message on the bounded queue
+    of every subscribed connection without waiting; a per-connection writer
+    task drains that queue. A connection whose queue is full, or whose sends
+    time out, is dropped, so one slow client never delays the others.
+    Messages are also relayed to sockets held by other workers when a relay
+    is configured.
+    """
+
+    def __init__(self, relay: Optional[UnixSocketRelay] = None, queue_size: int = 100,
+                 send_timeout: float = 5.0):
+        self.relay = relay
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.connections: Dict[WebSocket, HubConnection] = {}
+        self.channels: Dict[str, Set[HubConnection]] = {}
+        self.listeners: Dict[str, List[Callable[[str], None]]] = {}
+        self._inbox: Optional[asyncio.Queue] = None
+        self._dispatcher = None
+        self._relay_started = False
+        self._closing: Set[asyncio.Task] = set()
+
+    def _ensure_started(self):
+        if self._inbox is None:
+            self._inbox = asyncio.Queue()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        if self.relay is not None and not self._relay_started:
+            self._relay_started = True
+            if not self.relay.start(asyncio.get_running_loop(), self._enqueue_local):
+                self.relay = None
+
+    async def connect(self, websocket: WebSocket, channels: Iterable[str] = (BROADCAST_CHANNEL,)) -> HubConnection:
+        await websocket.accept()
+        self._ensure_started()
+        conn = HubConnection(websocket, channels, self.queue_size)
+        self.connections[websocket] = conn
+        for channel in conn.channels:
+            self.channels.setdefault(channel, set()).add(conn)
+        conn.writer = asyncio.create_task(self._write_loop(conn))
+        return conn
+
+    def disconnect(self, websocket: WebSocket):
+        conn = self.connections.pop(websocket, None)
+        if conn is None:
+            return
+        for channel in conn.channels:
+            members = self.channels.get(channel)
+            if members is not None:
+                members.discard(conn)
+                if not members:
+                    del self.channels[channel]
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+
+    def add_listener(self, channel: str, callback: Callable[[str], None]):
+        """Run `callback(payload)` in-process for every message on a channel, including relayed ones"""
+        self.listeners.setdefault(channel, []).append(callback)
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self.channels.get(channel))
+
+    def publish(self, channel: str, message, relay: bool = True):
+        """Queue a message (str or JSON-serialisable) for a channel and return immediately"""
+        payload = message if isinstance(message, str) else json.dumps(message, default=str)
+        self._ensure_started()
+        self._enqueue_local(channel, payload)
+        if relay and self.relay is not None:
+            self.relay.send(channel, payload)
+
+    def broadcast(self, message):
+        self.publish(BROADCAST_CHANNEL, message)
+
+    def _enqueue_local(self, channel: str, payload: str):
+        self._inbox.put_nowait((channel, payload))
+
+    async def _dispatch_loop(self):
+        while True:
+            channel, payload = await self._inbox.get()
+            for callback in self.listeners.get(channel, ()):
+                try:
+                    callback(payload)
+                except Exception as e:
+                    logger.error(f"Hub listener for {channel} failed: {e}")
+            for conn in list(self.channels.get(channel, ())):
+                self._offer(conn, payload)
+
+    def _offer(self, conn: HubConnection, payload: str):
+        try:
+            conn.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Dropping slow WebSocket consumer (send queue full)")
+            # Unsubscribe now; the close handshake runs off the dispatcher
+            self.disconnect(conn.websocket)
+            task = asyncio.create_task(self._drop(conn))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _write_loop(self, conn: HubConnection):
+        try:
+            while True:
+                payload = await conn.queue.get()
+                await asyncio.wait_for(conn.websocket.send_text(payload), timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket send failed, dropping connection: {e}")
+            await self._drop(conn)
+
+    async def _drop(self, conn: HubConnection):
+        self.disconnect(conn.websocket)
+        try:
+            await asyncio.wait_for(conn.websocket.close(code=1013), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    async def shutdown(self):
+        writers = [conn.writer for conn in self.connections.values() if conn.writer is not None]
+        for task in writers + ([self._dispatcher] if self._dispatcher else []):
+            task.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+        if self.relay is not None:
+            self.relay.close()
+
+
+class StatsPublisher:
+    """One background poller per process for /ws/stats.
+
+    The stats snapshot is computed once per interval and published to the
+    hub's stats channel, so database load does not grow with the number of
+    connected dashboards. Delivery, timeouts and dropping slow consumers are
+    handled by the hub.
+    """
+
+    def __init__(self, hub: BroadcastHub, connection_factory: Callable, interval: float = 10.0,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep):
+        self.hub = hub
+        self.connection_factory = connection_factory
+        self.interval = interval
+        self.sleep = sleep
+        self._task = None
+
+    async def subscribe(self, websocket: WebSocket) -> HubConnection:
+        conn = await self.hub.connect(websocket, [STATS_CHANNEL])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return conn
+
+    def unsubscribe(self, websocket: WebSocket):
+        self.hub.disconnect(websocket)
+
+    def _fetch_stats(self) -> Dict:
+        """Blocking stats query - runs in a worker thread"""
+        stats = dict(FALLBACK_STATS)
+        conn = self.connection_factory()
+        if not conn:
+            return stats
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM jobs")
+            row = cursor.fetchone()
+            if row:
+                stats["total_jobs"] = row[0]
+            cursor.execute("SELECT COUNT(DISTINCT company) FROM jobs")
+            row = cursor.fetchone()
+            if row:
+                stats["companies"] = row[0]
+        except Exception as e:
+            logger.error(f"Stats snapshot query failed: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+        return stats
+
+    async def _run(self):
+        while self.hub.has_subscribers(STATS_CHANNEL):
+            await self.sleep(self.interval)
+            if not self.hub.has_subscribers(STATS_CHANNEL):
+                break
+            try:
+                stats = await asyncio.to_thread(self._fetch_stats)
+            except Exception as e:
+                logger.error(f"Stats snapshot failed: {e}")
+                stats = dict(FALLBACK_STATS)
+
+            # Every worker runs its own poller, so stats are never relayed
+            self.hub.publish(STATS_CHANNEL, {
+                "type": "stats_update",
+                "total_jobs": stats["total_jobs"],
+                "companies": stats["companies"],
+                "timestamp": datetime.now().strftime("%H:%M:%S")
+            }, relay=False)
@@ -0,0 +1,332 @@
+# recommendation_services.py - materialized per-user "For You" job lists
+#
+#   python recommendation_services.py refresh [user_id ...]   rebuild lists (every user with a profile by default)
+#
+# A user's vector is the normalized blend of the embedding of their
+# profile text (headline, summary, experience, education) and the stored
+# vectors of the jobs they saved. Their top TOP_N jobs are written to
+# user_recommendations, so serving the feed is an indexed range read.
+#
+# Lists are kept fresh incrementally:
+#   - a profile write or saved job marks the user stale; stale users are
+#     re-scored against the in-memory job matrix after a short debounce
+#   - a new job is embedded once and scored against every stored user
+#     vector in one matrix product; it only enters the lists it beats
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 100
+# Below this cosine a job is noise rather than a recommendation
+MIN_SCORE = 0.25
+# Share of the user vector taken from profile text; the rest comes from saved jobs
+PROFILE_WEIGHT = 0.6
+
+
+def job_embedding_text(title: Optional[str], description: Optional[str]) -> str:
+    """The text behind jobs.desc_vector_json - every writer embeds exactly this, so stored vectors compare"""
+    return f"{title or ''} {description}" if description else (title or "")
+
+
+def parse_vector(value) -> Optional[np.ndarray]:
+    if value is None:
+        return None
+    try:
+        vector = np.asarray(json.loads(value) if isinstance(value, str) else value, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    return vector if vector.ndim == 1 and vector.size else None
+
+
+def unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
+
+
+def combine_user_vector(profile_vector, saved_vectors: Sequence) -> Optional[np.ndarray]:
+    """Blend of the profile embedding and the mean of saved jobs, unit length"""
+    profile = unit(parse_vector(profile_vector) if not isinstance(profile_vector, np.ndarray) else profile_vector)
+    saved = [v for v in (unit(parse_vector(s)) for s in saved_vectors) if v is not None]
+    if profile is not None:
+        saved = [v for v in saved if v.shape == profile.shape]
+    elif saved:
+        saved = [v for v in saved if v.shape == saved[0].shape]
+    saved_mean = unit(np.mean(saved, axis=0)) if saved else None
+    if profile is None:
+        return saved_mean
+    if saved_mean is None:
+        return profile
+    return unit(PROFILE_WEIGHT * profile + (1 - PROFILE_WEIGHT) * saved_mean)
+
+
+def score_new_jobs(user_ids: Sequence[int], user_matrix: np.ndarray, job_ids: Sequence[int], job_matrix: np.ndarray,
+                   floors: Dict[int, float], min_score: float = MIN_SCORE) -> List[Tuple[int, int, float]]:
+    """(user_id, job_id, score) for every new job that beats a user's current list floor"""
+    if not len(user_ids) or not len(job_ids):
+        return []
+    scores = user_matrix @ job_matrix.T
+    cutoff = np.array([max(floors.get(user_id, min_score), min_score) for user_id in user_ids])
+    rows, cols = np.nonzero(scores >= cutoff[:, None])
+    return [(int(user_ids[r]), int(job_ids[c]), round(float(scores[r, c]), 6)) for r, c in zip(rows, cols)]
+
+
+def stack_vectors(ids: Sequence[int], vectors: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """(ids, matrix of unit vectors) for the parseable vectors sharing the first one's dimension"""
+    parsed = [(i, unit(parse_vector(v))) for i, v in zip(ids, vectors)]
+    parsed = [(i, v) for i, v in parsed if v is not None]
+    if not parsed:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0))
+    dim = parsed[0][1].shape[0]
+    parsed = [(i, v) for i, v in parsed if v.shape[0] == dim]
+    return np.array([i for i, _ in parsed], dtype=np.int64), np.vstack([v for _, v in parsed])
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def load_job_vectors() -> Tuple[List[int], List]:
+    conn = _connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT job_id, desc_vector_json FROM jobs
+            WHERE desc_vector_json IS NOT NULL AND COALESCE(status, 'active') = 'active' AND canonical_job_id IS NULL
+        """)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+class JobVectorIndex:
+    """Unit description vectors of all active jobs as one matrix, appended to as jobs arrive"""
+
+    def __init__(self, loader: Callable[[], Tuple[List[int], List]] = load_job_vectors, ttl: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.loader = loader
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, 0))
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._loaded_at is None or self.clock() - self._loaded_at > self.ttl:
+                self.ids, self.matrix = stack_vectors(*self.loader())
+                self._loaded_at = self.clock()
+            return self.ids, self.matrix
+
+    def add(self, ids: Sequence[int], vectors: Sequence):
+        new_ids, new_matrix = stack_vectors(ids, vectors)
+        with self._lock:
+            if self._loaded_at is None or not len(new_ids):
+                return
+            if self.matrix.size and new_matrix.shape[1] != self.matrix.shape[1]:
+                return
+            keep = ~np.isin(self.ids, new_ids)
+            self.ids = np.concatenate([self.ids[keep], new_ids])
+            self.matrix = np.vstack([self.matrix[keep], new_matrix]) if self.matrix.size else new_matrix
+
+    def top(self, user_vector: np.ndarray, n: int = TOP_N, exclude: Iterable[int] = (),
+            min_score: float = MIN_SCORE) -> List[Tuple[int, float]]:
+        ids, matrix = self.snapshot()
+        if not len(ids) or matrix.shape[1] != user_vector.shape[0]:
+            return []
+        scores = matrix @ user_vector
+        scores[np.isin(ids, list(exclude))] = -np.inf
+        count = min(n, len(ids))
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(ids[i]), round(float(scores[i]), 6)) for i in best if scores[i] >= min_score]
+
+
+class RecommendationService:
+    """Builds, stores and incrementally updates each user's top-N job list"""
+
+    def __init__(self, embed: Callable[[str], Optional[List[float]]], jobs: Optional[JobVectorIndex] = None,
+                 top_n: int = TOP_N, debounce: float = 2.0):
+        self.embed = embed
+        self.jobs = jobs or JobVectorIndex()
+        self.top_n = top_n
+        self.debounce = debounce
+        self._stale: Set[int] = set()
+        self._task = None
+
+    # ---- full refresh for one user ----
+    def _user_inputs(self, cursor, user_id: int) -> Tuple[str, List, Set[int]]:
+        """Profile text, saved job vectors and the jobs to leave out (saved or applied)"""
+        cursor.execute("SELECT headline, summary FROM user_profiles WHERE user_id = %s", (user_id,))
+        parts = [value for row in cursor.fetchall() for value in row if value]
+        cursor.execute("SELECT position, description FROM user_experience WHERE user_id = %s", (user_id,))
+        parts += [value for row in cursor.fetchall() for value in row if value]
+        cursor.execute("SELECT degree, field_of_study FROM user_education WHERE user_id = %s", (user_id,))
+        parts += [value for row in cursor.fetchall() for value in row if value]
+        cursor.execute("""
+            SELECT f.job_id, j.desc_vector_json FROM favorites f
+            JOIN jobs j ON j.job_id = f.job_id WHERE f.user_id = %s
+        """, (user_id,))
+        saved = cursor.fetchall()
+        cursor.execute("SELECT job_id FROM applications WHERE user_id = %s", (user_id,))
+        exclude = {row[0] for row in cursor.fetchall()} | {row[0] for row in saved}
+        return " ".join(parts), [row[1] for row in saved if row[1]], exclude
+
+    def refresh_user(self, user_id: int) -> int:
+        """Recompute the user's vector and rewrite their list; returns the list length"""
+        conn = _connect()
+        cursor = conn.cursor()
+        try:
+            text, saved, exclude = self._user_inputs(cursor, user_id)
+            embedding = self.embed(text) if text else None
+            vector = combine_user_vector(np.asarray(embedding, dtype=float) if embedding is not None else None, saved)
+            # Users with nothing to score still get a row ("[]"), so the feed knows the
+            # list was built and does not rebuild it on every request
+            ranked = self.jobs.top(vector, self.top_n, exclude) if vector is not None else []
+            cursor.execute("""
+                INSERT INTO user_vectors (user_id, vector_json) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE vector_json = VALUES(vector_json)
+            """, (user_id, json.dumps([round(float(x), 6) for x in vector] if vector is not None else [])))
+            cursor.execute("DELETE FROM user_recommendations WHERE user_id = %s", (user_id,))
+            if ranked:
+                cursor.executemany("INSERT INTO user_recommendations (user_id, job_id, score) VALUES (%s, %s, %s)",
+                                   [(user_id, job_id, score) for job_id, score in ranked])
+            conn.commit()
+            return len(ranked)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    # ---- incremental update for new jobs ----
+    def add_jobs(self, job_ids: Iterable[int]) -> int:
+        """Embed new jobs and merge them into every list they beat; returns rows written"""
+        job_ids = list(dict.fromkeys(int(i) for i in job_ids))
+        if not job_ids:
+            return 0
+        conn = _connect()
+        cursor = conn.cursor()
+        try:
+            placeholders = ", ".join(["%s"] * len(job_ids))
+            cursor.execute(f"""
+                SELECT job_id, title, description, desc_vector_json FROM jobs
+                WHERE job_id IN ({placeholders}) AND canonical_job_id IS NULL
+            """, tuple(job_ids))
+            vectors = {}
+            for job_id, title, description, stored in cursor.fetchall():
+                vector = stored
+                if not vector:
+                    embedding = self.embed(job_embedding_text(title, description))
+                    if embedding is None:
+                        continue
+                    vector = json.dumps([float(x) for x in embedding])
+                    cursor.execute("UPDATE jobs SET desc_vector_json = %s WHERE job_id = %s", (vector, job_id))
+                vectors[job_id] = vector
+            conn.commit()
+            self.jobs.add(list(vectors), list(vectors.values()))
+
+            new_ids, new_matrix = stack_vectors(list(vectors), list(vectors.values()))
+            cursor.execute("SELECT user_id, vector_json FROM user_vectors")
+            users = [(user_id, unit(parse_vector(v))) for user_id, v in cursor.fetchall()]
+            users = [(u, v) for u, v in users if v is not None and new_matrix.size and v.shape[0] == new_matrix.shape[1]]
+            if not users or not len(new_ids):
+                return 0
+            cursor.execute("""
+                SELECT user_id, COUNT(*), MIN(score) FROM user_recommendations GROUP BY user_id
+            """)
+            floors = {user_id: floor for user_id, count, floor in cursor.fetchall() if count >= self.top_n}
+            rows = score_new_jobs([u for u, _ in users], np.vstack([v for _, v in users]), new_ids, new_matrix, floors)
+            if not rows:
+                return 0
+            cursor.executemany("""
+                INSERT INTO user_recommendations (user_id, job_id, score) VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE score = VALUES(score)
+            """, rows)
+            # Lists that grew past TOP_N drop their weakest entries
+            trimmed = sorted({user_id for user_id, _, _ in rows if user_id in floors})
+            if trimmed:
+                cursor.executemany("""
+                    DELETE FROM user_recommendations WHERE user_id = %s AND score < (
+                        SELECT score FROM (
+                            SELECT score FROM user_recommendations WHERE user_id = %s
+                            ORDER BY score DESC LIMIT 1 OFFSET %s
+                        ) AS nth
+                    )
+                """, [(user_id, user_id, self.top_n - 1) for user_id in trimmed])
+            conn.commit()
+            logger.info(f"✨ {len(job_ids)} new jobs entered {len({r[0] for r in rows})} For You lists")
+            return len(rows)
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Updating recommendations for new jobs failed: {e}")
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    # ---- debounced refresh after profile changes ----
+    def mark_stale(self, user_id: int):
+        """Queue a refresh; bursts of profile edits collapse into one re-score"""
+        self._stale.add(int(user_id))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._drain())
+
+    async def _drain(self):
+        while self._stale:
+            await asyncio.sleep(self.debounce)
+            users, self._stale = self._stale, set()
+            for user_id in users:
+                try:
+                    await asyncio.to_thread(self.refresh_user, user_id)
+                except Exception as e:
+                    logger.error(f"Refreshing recommendations for user {user_id} failed: {e}")
+
+
+def main(argv: List[str]) -> int:
+    if not argv or argv[0] != "refresh":
+        print("usage: python recommendation_services.py refresh [user_id ...]")
+        return 2
+    from vector_services import vector_service
+
+    service = RecommendationService(embed=vector_service.generate_embedding)
+    user_ids = [int(arg) for arg in argv[1:]]
+    if not user_ids:
+        conn = _connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT DISTINCT user_id FROM user_profiles ORDER BY user_id")
+            user_ids = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+    for user_id in user_ids:
+        print(f"   user {user_id}: {service.refresh_user(user_id)} jobs")
+    print(f"✅ Refreshed {len(user_ids)} For You lists")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
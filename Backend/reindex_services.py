@@ -0,0 +1,333 @@
+# reindex_services.py - resumable, chunked reindex jobs with checkpoints and progress
+#
+#   python reindex_services.py run <task> [--workers 2] [--chunk 200] [--restart]
+#   python reindex_services.py status
+#
+# A task (job_vectors, career_vectors) walks its table in primary-key
+# ranges aligned to the chunk size. Each range is read, embedded in one
+# batch and written back with executemany, and its reindex_checkpoints row
+# is committed in the same transaction - so a crash loses at most the
+# chunks in flight, and a rerun only visits ranges no checkpoint covers.
+# --restart drops the task's checkpoints and reindexes everything.
+#
+# Ranges run on a thread pool (REINDEX_WORKERS, default 2). Progress -
+# rows and chunks done, throughput and ETA - is kept per task and served
+# by GET /api/admin/reindex; without a live run it is read back from the
+# checkpoints.
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from recommendation_services import job_embedding_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv("REINDEX_WORKERS", "2"))
+DEFAULT_CHUNK = int(os.getenv("REINDEX_CHUNK", "200"))
+
+
+def _connect():
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    return conn
+
+
+def _vector_json(vector) -> str:
+    return json.dumps([float(x) for x in vector])
+
+
+def pending_ranges(min_id: int, max_id: int, chunk: int, done: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Chunk-aligned [start, end] ranges of min_id..max_id not covered by the `done` ranges"""
+    covered = sorted(done)
+    ranges = []
+    start = (min_id // chunk) * chunk
+    while start <= max_id:
+        end = start + chunk - 1
+        low = max(start, min_id)
+        for done_start, done_end in covered:
+            if done_end < low or done_start > end:
+                continue
+            if done_start > low:
+                ranges.append((low, done_start - 1))
+            low = max(low, done_end + 1)
+            if low > end:
+                break
+        if low <= min(end, max_id):
+            ranges.append((low, min(end, max_id)))
+        start += chunk
+    return ranges
+
+
+class ReindexTask:
+    """A table walked by primary key; `build` turns a chunk of rows into UPDATE parameters"""
+
+    def __init__(self, name: str, table: str, key: str, columns: Sequence[str], update_sql: str,
+                 build: Callable[[List[tuple], Callable[[List[str]], List]], List[tuple]]):
+        self.name = name
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.update_sql = update_sql
+        self.build = build
+
+
+def _build_job_vectors(rows: List[tuple], embed_batch) -> List[tuple]:
+    # desc_vector_json must match what create_job, ingestion and dedup write
+    desc = [job_embedding_text(title, description) for _, title, description in rows]
+    skills = [description if description else title for _, title, description in rows]
+    vectors = embed_batch(desc + skills)
+    return [(_vector_json(vectors[i]), _vector_json(vectors[len(rows) + i]), row[0]) for i, row in enumerate(rows)]
+
+
+def _build_career_vectors(rows: List[tuple], embed_batch) -> List[tuple]:
+    desc = [f"{title} {description}" if description else title for _, title, description, _ in rows]
+    skills = [str(skills) if skills else title for _, title, _, skills in rows]
+    vectors = embed_batch(desc + skills)
+    return [(_vector_json(vectors[i]), _vector_json(vectors[len(rows) + i]), row[0]) for i, row in enumerate(rows)]
+
+
+TASKS = {
+    "job_vectors": ReindexTask(
+        "job_vectors", "jobs", "job_id", ("title", "description"),
+        "UPDATE jobs SET desc_vector_json = %s, skills_vector_json = %s WHERE job_id = %s",
+        _build_job_vectors),
+    "career_vectors": ReindexTask(
+        "career_vectors", "careers", "career_id", ("title", "description", "required_skills"),
+        "UPDATE careers SET desc_vector_json = %s, skills_vector_json = %s WHERE career_id = %s",
+        _build_career_vectors),
+}
+
+
+class ReindexProgress:
+    def __init__(self, task: str, total_rows: int, rows_before: int, chunks: int, workers: int, chunk_size: int):
+        self.task = task
+        self.total_rows = total_rows
+        self.rows_before = rows_before          # done by earlier, interrupted runs
+        self.rows_done = 0
+        self.chunks_total = chunks
+        self.chunks_done = 0
+        self.chunks_failed = 0
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.status = "running"
+        self.errors: List[str] = []
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def chunk_done(self, rows: int):
+        with self._lock:
+            self.rows_done += rows
+            self.chunks_done += 1
+
+    def chunk_failed(self, message: str):
+        with self._lock:
+            self.chunks_failed += 1
+            if len(self.errors) < 20:
+                self.errors.append(message)
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = datetime.utcnow()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            elapsed = (self.finished_at - self.started_at).total_seconds() if self.finished_at else time.monotonic() - self._started
+            rate = self.rows_done / elapsed if elapsed > 0 else 0.0
+            remaining = max(self.total_rows - self.rows_before - self.rows_done, 0)
+            return {
+                "task": self.task,
+                "status": self.status,
+                "rows_done": self.rows_before + self.rows_done,
+                "total_rows": self.total_rows,
+                "percent": round(100.0 * (self.rows_before + self.rows_done) / self.total_rows, 1) if self.total_rows else 100.0,
+                "chunks_done": self.chunks_done,
+                "chunks_failed": self.chunks_failed,
+                "chunks_total": self.chunks_total,
+                "rows_per_second": round(rate, 1),
+                "eta_seconds": round(remaining / rate) if rate > 0 and self.status == "running" else None,
+                "workers": self.workers,
+                "chunk_size": self.chunk_size,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "errors": list(self.errors),
+            }
+
+
+class ReindexRunner:
+    """Runs reindex tasks over a thread pool, one checkpointed transaction per chunk"""
+
+    def __init__(self, embed_batch: Callable[[List[str]], List], tasks: Dict[str, ReindexTask] = TASKS,
+                 workers: int = DEFAULT_WORKERS, chunk_size: int = DEFAULT_CHUNK,
+                 connection_factory: Callable = _connect):
+        self.embed_batch = embed_batch
+        self.tasks = tasks
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.connection_factory = connection_factory
+        self._progress: Dict[str, ReindexProgress] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stop: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _reset(self, task: ReindexTask):
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM reindex_checkpoints WHERE task = %s", (task.name,))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _run_chunk(self, task: ReindexTask, start: int, end: int, progress: ReindexProgress, stop: threading.Event):
+        if stop.is_set():
+            return
+        conn = self.connection_factory()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT {task.key}, {', '.join(task.columns)} FROM {task.table}
+                WHERE {task.key} BETWEEN %s AND %s ORDER BY {task.key}
+            """, (start, end))
+            rows = cursor.fetchall()
+            if rows:
+                cursor.executemany(task.update_sql, task.build(rows, self.embed_batch))
+            cursor.execute("""
+                INSERT INTO reindex_checkpoints (task, range_start, range_end, rows_done) VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE range_end = VALUES(range_end), rows_done = VALUES(rows_done),
+                                        finished_at = CURRENT_TIMESTAMP
+            """, (task.name, start, end, len(rows)))
+            conn.commit()
+            progress.chunk_done(len(rows))
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Reindex {task.name} chunk {start}-{end} failed: {e}")
+            progress.chunk_failed(f"{start}-{end}: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def run(self, name: str, restart: bool = False, workers: Optional[int] = None,
+            chunk_size: Optional[int] = None) -> Dict:
+        """Reindex every range without a checkpoint; blocks until done and returns the final progress"""
+        task = self.tasks[name]
+        workers = workers or self.workers
+        chunk_size = chunk_size or self.chunk_size
+        stop = self._stop.setdefault(name, threading.Event())
+        stop.clear()
+        if restart:
+            self._reset(task)
+        min_id, max_id, total = self._query(f"SELECT MIN({task.key}), MAX({task.key}), COUNT(*) FROM {task.table}")[0]
+        checkpoints = self._query("SELECT range_start, range_end, rows_done FROM reindex_checkpoints WHERE task = %s",
+                                  (task.name,))
+        ranges = pending_ranges(min_id, max_id, chunk_size, [(s, e) for s, e, _ in checkpoints]) if total else []
+        progress = ReindexProgress(name, int(total or 0), sum(rows for _, _, rows in checkpoints), len(ranges),
+                                   workers, chunk_size)
+        self._progress[name] = progress
+        logger.info(f"🔁 Reindex {name}: {len(ranges)} chunks pending, {progress.rows_before}/{total} rows already done")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"reindex-{name}") as pool:
+            for start, end in ranges:
+                pool.submit(self._run_chunk, task, start, end, progress, stop)
+        if stop.is_set():
+            progress.finish("stopped")
+        else:
+            progress.finish("failed" if progress.chunks_failed else "done")
+        logger.info(f"🔁 Reindex {name} {progress.status}: {progress.rows_done} rows in {progress.chunks_done} chunks")
+        return progress.snapshot()
+
+    def start(self, name: str, **options) -> Dict:
+        """Run a task in a background thread unless it is already running; returns its progress"""
+        if name not in self.tasks:
+            raise KeyError(name)
+        with self._lock:
+            thread = self._threads.get(name)
+            if thread is None or not thread.is_alive():
+                self._progress.pop(name, None)
+                thread = threading.Thread(target=self._run_logged, args=(name,), kwargs=options,
+                                          name=f"reindex-{name}", daemon=True)
+                self._threads[name] = thread
+                thread.start()
+        return self.progress(name)
+
+    def _run_logged(self, name: str, **options):
+        try:
+            self.run(name, **options)
+        except Exception as e:
+            logger.error(f"Reindex {name} aborted: {e}")
+            if name in self._progress:
+                self._progress[name].chunk_failed(str(e))
+                self._progress[name].finish("failed")
+
+    def stop(self, name: str):
+        """Finish the chunks in flight and skip the rest; a later run resumes from the checkpoints"""
+        self._stop.setdefault(name, threading.Event()).set()
+
+    def progress(self, name: str) -> Dict:
+        """Live progress of this process's run, or the checkpoint totals when it has none"""
+        if name in self._progress:
+            return self._progress[name].snapshot()
+        thread = self._threads.get(name)
+        if thread is not None and thread.is_alive():
+            return {"task": name, "status": "starting"}
+        task = self.tasks[name]
+        (total,), = self._query(f"SELECT COUNT(*) FROM {task.table}")
+        (done, chunks, last), = self._query("""
+            SELECT COALESCE(SUM(rows_done), 0), COUNT(*), MAX(finished_at) FROM reindex_checkpoints WHERE task = %s
+        """, (task.name,))
+        return {"task": name, "status": "idle", "rows_done": int(done), "total_rows": int(total),
+                "percent": round(100.0 * int(done) / total, 1) if total else 100.0,
+                "chunks_done": int(chunks), "last_checkpoint_at": last}
+
+
+def _embed_batch(texts: List[str]) -> List:
+    from vector_services import vector_service
+
+    return vector_service.generate_embeddings(texts)
+
+
+reindex_runner = ReindexRunner(embed_batch=_embed_batch)
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) >= 2 and argv[0] == "run" and argv[1] in TASKS:
+        workers = int(argv[argv.index("--workers") + 1]) if "--workers" in argv else None
+        chunk = int(argv[argv.index("--chunk") + 1]) if "--chunk" in argv else None
+        result = reindex_runner.run(argv[1], restart="--restart" in argv, workers=workers, chunk_size=chunk)
+        print(f"{'✅' if result['status'] == 'done' else '❌'} {argv[1]}: {result['rows_done']}/{result['total_rows']} rows, "
+              f"{result['chunks_done']} chunks ({result['chunks_failed']} failed), {result['rows_per_second']} rows/s")
+        for error in result["errors"]:
+            print(f"   ❌ {error}")
+        return 0 if result["status"] == "done" else 1
+    if argv and argv[0] == "status":
+        for name in TASKS:
+            p = reindex_runner.progress(name)
+            print(f"{name:16} {p['rows_done']}/{p['total_rows']} rows ({p['percent']}%), last checkpoint {p['last_checkpoint_at']}")
+        return 0
+    print(f"usage: python reindex_services.py run {'|'.join(TASKS)} [--workers 2] [--chunk 200] [--restart] | status")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,494 @@
+# schema.py - versioned schema migrations and index verification
+#
+#   python schema.py apply     apply pending migrations
+#   python schema.py status    list applied / pending migrations
+#   python schema.py verify    check every required index exists (exit 1 if not)
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+# (index name, table, column list) - hot predicates of the API endpoints
+INDEXES = [
+    # Keyset pagination of active jobs on (created_at, job_id)
+    ("idx_jobs_status_created", "jobs", "status, created_at, job_id"),
+    # Employer dashboards and application ownership checks
+    ("idx_jobs_employer", "jobs", "employer_id"),
+    # Exact location lookups
+    ("idx_jobs_location", "jobs", "location"),
+    # Keyset pagination of a user's applications on (applied_at, application_id)
+    ("idx_applications_user_applied", "applications", "user_id, applied_at, application_id"),
+    # Employer listings walk applications per job
+    ("idx_applications_job_applied", "applications", "job_id, applied_at, application_id"),
+    # "Already applied?" check in apply_for_job
+    ("idx_applications_user_job", "applications", "user_id, job_id"),
+    # Unread notification lookups
+    ("idx_notifications_user_read", "notifications", "user_id, is_read"),
+    ("idx_user_education_user", "user_education", "user_id"),
+    ("idx_user_experience_user", "user_experience", "user_id"),
+    ("idx_user_profiles_user", "user_profiles", "user_id"),
+    ("idx_employer_profiles_user", "employer_profiles", "user_id"),
+]
+
+# Indexes on columns added by later migrations, created by those migrations
+GEO_INDEXES = [
+    # Bounding-box prefilter of radius searches
+    ("idx_jobs_lat_lon", "jobs", "latitude, longitude"),
+]
+
+NOTIFICATION_INDEXES = [
+    # Keyset pagination of a user's notifications on (created_at, notification_id)
+    ("idx_notifications_user_created", "notifications", "user_id, created_at, notification_id"),
+]
+
+REQUIRED_INDEXES = INDEXES + GEO_INDEXES + NOTIFICATION_INDEXES
+
+BASE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        user_id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(100) NOT NULL UNIQUE,
+        email VARCHAR(200) NOT NULL UNIQUE,
+        password VARCHAR(255) NOT NULL,
+        full_name VARCHAR(200),
+        role VARCHAR(20) DEFAULT 'job_seeker',
+        phone_number VARCHAR(15),
+        is_verified BOOLEAN DEFAULT FALSE,
+        last_login TIMESTAMP NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS companies (
+        company_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        industry VARCHAR(100),
+        size VARCHAR(50),
+        website VARCHAR(200)
+    )""",
+    """CREATE TABLE IF NOT EXISTS jobs (
+        job_id INT AUTO_INCREMENT PRIMARY KEY,
+        title VARCHAR(200) NOT NULL,
+        description TEXT,
+        company VARCHAR(200),
+        location VARCHAR(100),
+        job_type VARCHAR(50) DEFAULT 'Full-time',
+        experience_level VARCHAR(50) DEFAULT 'Mid',
+        skills TEXT,
+        salary DECIMAL(10, 2),
+        sdg_goal VARCHAR(200),
+        sdg_score INT,
+        posted_by INT,
+        employer_id INT,
+        status VARCHAR(20) DEFAULT 'active',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS careers (
+        career_id INT AUTO_INCREMENT PRIMARY KEY,
+        title VARCHAR(200) NOT NULL,
+        description TEXT,
+        required_skills TEXT,
+        growth VARCHAR(50),
+        salary_range VARCHAR(50),
+        demand INT,
+        category VARCHAR(100),
+        experience_level VARCHAR(50)
+    )""",
+    """CREATE TABLE IF NOT EXISTS career_skills (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        career_id INT NOT NULL,
+        skill_name VARCHAR(100) NOT NULL,
+        INDEX idx_career_skills_career (career_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS favorites (
+        user_id INT NOT NULL,
+        job_id INT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, job_id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS job_demand (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        location VARCHAR(100),
+        demand_score INT
+    )""",
+    """CREATE TABLE IF NOT EXISTS user_profiles (
+        profile_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        headline VARCHAR(200),
+        summary TEXT,
+        phone_number VARCHAR(15),
+        current_salary DECIMAL(10, 2),
+        expected_salary DECIMAL(10, 2),
+        notice_period INT,
+        resume_url VARCHAR(500),
+        linkedin_url VARCHAR(200),
+        github_url VARCHAR(200),
+        portfolio_url VARCHAR(200),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS user_education (
+        education_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        institution VARCHAR(200) NOT NULL,
+        degree VARCHAR(100) NOT NULL,
+        field_of_study VARCHAR(100),
+        start_date DATE,
+        end_date DATE,
+        grade VARCHAR(50),
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS user_experience (
+        experience_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        company VARCHAR(200) NOT NULL,
+        position VARCHAR(100) NOT NULL,
+        start_date DATE,
+        end_date DATE,
+        current_job BOOLEAN DEFAULT FALSE,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS employer_profiles (
+        employer_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        company_id INT NOT NULL,
+        position VARCHAR(100),
+        phone_number VARCHAR(15),
+        is_verified BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS applications (
+        application_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        job_id INT NOT NULL,
+        cover_letter TEXT,
+        resume_url VARCHAR(500),
+        status ENUM('applied', 'viewed', 'shortlisted', 'rejected', 'hired') DEFAULT 'applied',
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS notifications (
+        notification_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        title VARCHAR(200) NOT NULL,
+        message TEXT NOT NULL,
+        type ENUM('application', 'job_alert', 'system', 'message') DEFAULT 'system',
+        is_read BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS saved_searches (
+        search_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id INT NOT NULL,
+        search_name VARCHAR(100),
+        search_query JSON,
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+]
+
+# Columns app.py relies on that older databases were created without
+ASSUMED_COLUMNS = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS full_name VARCHAR(200)",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS role VARCHAR(20) DEFAULT 'job_seeker'",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_number VARCHAR(15)",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_verified BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_login TIMESTAMP NULL",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS job_type VARCHAR(50) DEFAULT 'Full-time'",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS experience_level VARCHAR(50) DEFAULT 'Mid'",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skills TEXT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS sdg_goal VARCHAR(200)",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS sdg_score INT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS posted_by INT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS employer_id INT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'active'",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    "ALTER TABLE careers ADD COLUMN IF NOT EXISTS experience_level VARCHAR(50)",
+]
+
+# Embedding columns previously added at runtime by vector_services.populate_existing_data
+VECTOR_COLUMNS = [
+    "ALTER TABLE careers ADD COLUMN IF NOT EXISTS desc_vector_json TEXT",
+    "ALTER TABLE careers ADD COLUMN IF NOT EXISTS skills_vector_json TEXT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS desc_vector_json TEXT",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skills_vector_json TEXT",
+]
+
+# Catalog content translated once at write time, read by the search endpoints
+CATALOG_TRANSLATION_TABLES = [
+    """CREATE TABLE IF NOT EXISTS job_translations (
+        job_id INT NOT NULL,
+        lang VARCHAR(5) NOT NULL,
+        title VARCHAR(300),
+        description TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (job_id, lang)
+    )""",
+    """CREATE TABLE IF NOT EXISTS career_translations (
+        career_id INT NOT NULL,
+        lang VARCHAR(5) NOT NULL,
+        title VARCHAR(300),
+        description TEXT,
+        growth VARCHAR(100),
+        salary_range VARCHAR(100),
+        category VARCHAR(200),
+        experience_level VARCHAR(100),
+        required_skills TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (career_id, lang)
+    )""",
+]
+
+# Job coordinates, geocoded from jobs.location at write time
+GEO_COLUMNS = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS latitude DOUBLE NULL",
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS longitude DOUBLE NULL",
+]
+
+
+# Canonical skill IDs (JSON arrays) extracted by skill_services at write time
+SKILL_ID_COLUMNS = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skill_ids TEXT NULL",
+    "ALTER TABLE careers ADD COLUMN IF NOT EXISTS skill_ids TEXT NULL",
+]
+
+# Materialized "For You" lists - see recommendation_services.py
+RECOMMENDATION_TABLES = [
+    """CREATE TABLE IF NOT EXISTS user_vectors (
+        user_id INT PRIMARY KEY,
+        vector_json MEDIUMTEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS user_recommendations (
+        user_id INT NOT NULL,
+        job_id INT NOT NULL,
+        score DOUBLE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, job_id),
+        INDEX idx_user_recommendations_score (user_id, score, job_id)
+    )""",
+]
+
+
+# Saved-search query embeddings, computed once when the search is saved - see alert_services.py
+SAVED_SEARCH_COLUMNS = [
+    "ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS query_vector_json MEDIUMTEXT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches (user_id, is_active)",
+]
+
+
+# Unread counts kept next to the notifications they count - see notification_services.py
+NOTIFICATION_COUNTER_TABLES = [
+    """CREATE TABLE IF NOT EXISTS notification_counters (
+        user_id INT PRIMARY KEY,
+        unread INT NOT NULL DEFAULT 0,
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )""",
+    """INSERT INTO notification_counters (user_id, unread, version)
+        SELECT user_id, SUM(is_read = FALSE), 1 FROM notifications GROUP BY user_id
+        ON DUPLICATE KEY UPDATE unread = VALUES(unread), version = version + 1""",
+]
+
+
+# Bulk imports tag their rows so each chunk's job ids can be read back - see ingestion_services.py
+JOB_IMPORT_COLUMNS = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS import_batch VARCHAR(40) NULL",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_import_batch ON jobs (import_batch)",
+]
+
+
+# Near-duplicate detection: MinHash signatures, LSH buckets and the canonical link - see dedup_services.py
+DEDUP_TABLES = [
+    "ALTER TABLE jobs ADD COLUMN IF NOT EXISTS canonical_job_id INT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_canonical ON jobs (canonical_job_id)",
+    """CREATE TABLE IF NOT EXISTS job_minhash (
+        job_id INT PRIMARY KEY,
+        signature VARBINARY(256) NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS job_lsh_buckets (
+        bucket BIGINT NOT NULL,
+        job_id INT NOT NULL,
+        PRIMARY KEY (bucket, job_id),
+        INDEX idx_job_lsh_buckets_job (job_id)
+    )""",
+]
+
+
+# One row per committed reindex chunk, so an interrupted run resumes - see reindex_services.py
+REINDEX_TABLES = [
+    """CREATE TABLE IF NOT EXISTS reindex_checkpoints (
+        task VARCHAR(60) NOT NULL,
+        range_start INT NOT NULL,
+        range_end INT NOT NULL,
+        rows_done INT NOT NULL DEFAULT 0,
+        finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (task, range_start)
+    )""",
+]
+
+
+# Admin rights are a server-assigned flag (python admin_services.py grant <username>), never a
+# registration choice; roles other than the two registrable ones were self-granted and are reset
+ADMIN_COLUMNS = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_admin BOOLEAN NOT NULL DEFAULT FALSE",
+    "UPDATE users SET role = 'job_seeker' WHERE role IS NULL OR role NOT IN ('job_seeker', 'employer')",
+]
+
+
+# Side effects written with the transaction that causes them - see outbox_services.py
+OUTBOX_TABLES = [
+    """CREATE TABLE IF NOT EXISTS outbox_events (
+        event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        kind VARCHAR(30) NOT NULL,
+        payload MEDIUMTEXT NOT NULL,
+        status ENUM('pending', 'done', 'failed') DEFAULT 'pending',
+        attempts INT DEFAULT 0,
+        available_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        processed_at TIMESTAMP NULL,
+        INDEX idx_outbox_events_pending (status, available_at, event_id)
+    )""",
+]
+
+
+def _create_indexes(indexes) -> list:
+    return [f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})" for name, table, columns in indexes]
+
+
+# (version, description, statements) - append only; never edit an applied migration
+MIGRATIONS = [
+    (1, "base tables", BASE_TABLES),
+    (2, "columns assumed by app.py", ASSUMED_COLUMNS),
+    (3, "vector columns", VECTOR_COLUMNS),
+    (4, "hot path indexes", _create_indexes(INDEXES)),
+    (5, "localized catalog content", CATALOG_TRANSLATION_TABLES),
+    (6, "job coordinates", GEO_COLUMNS + _create_indexes(GEO_INDEXES)),
+    (7, "skill ids", SKILL_ID_COLUMNS),
+    (8, "user recommendations", RECOMMENDATION_TABLES),
+    (9, "saved search vectors", SAVED_SEARCH_COLUMNS),
+    (10, "outbox events", OUTBOX_TABLES),
+    (11, "notification counters", NOTIFICATION_COUNTER_TABLES + _create_indexes(NOTIFICATION_INDEXES)),
+    (12, "job import batches", JOB_IMPORT_COLUMNS),
+    (13, "near-duplicate jobs", DEDUP_TABLES),
+    (14, "reindex checkpoints", REINDEX_TABLES),
+    (15, "server-assigned admin flag", ADMIN_COLUMNS),
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(200),
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(conn) -> set:
+    cursor = conn.cursor()
+    try:
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def pending_migrations(conn) -> list:
+    """Versions not applied yet - read-only, unlike applied_versions it creates nothing"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = 'schema_migrations'
+        """)
+        done = set()
+        if cursor.fetchone()[0]:
+            cursor.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+    return [version for version, _, _ in MIGRATIONS if version not in done]
+
+
+def apply_migrations(conn) -> list:
+    """Apply every pending migration in order; returns the versions applied.
+
+    Statements are idempotent (IF NOT EXISTS), so a migration interrupted
+    half-way is simply re-run on the next call.
+    """
+    done = applied_versions(conn)
+    applied = []
+    cursor = conn.cursor()
+    try:
+        for version, description, statements in MIGRATIONS:
+            if version in done:
+                continue
+            logger.info(f"Applying migration {version}: {description}")
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                           (version, description))
+            conn.commit()
+            applied.append(version)
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Migration {version} failed: {e}")
+        raise
+    finally:
+        cursor.close()
+    if applied:
+        print(f"✅ Applied schema migrations: {applied}")
+    return applied
+
+
+def missing_indexes(conn) -> list:
+    """Required indexes that do not exist in the current database"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT DISTINCT table_name, index_name FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+        """)
+        existing = {(table.lower(), index.lower()) for table, index in cursor.fetchall()}
+    finally:
+        cursor.close()
+    return [(name, table) for name, table, _ in REQUIRED_INDEXES if (table.lower(), name.lower()) not in existing]
+
+
+def main(argv) -> int:
+    from database import get_db_connection
+
+    command = argv[1] if len(argv) > 1 else "apply"
+    conn = get_db_connection()
+    if not conn:
+        print("❌ Database connection failed")
+        return 1
+    try:
+        if command == "apply":
+            applied = apply_migrations(conn)
+            print(f"✅ Schema up to date ({len(applied)} migrations applied)")
+            missing = missing_indexes(conn)
+        elif command == "status":
+            done = applied_versions(conn)
+            for version, description, _ in MIGRATIONS:
+                print(f"{'applied' if version in done else 'pending':8} {version:3}  {description}")
+            return 0
+        elif command == "verify":
+            missing = missing_indexes(conn)
+        else:
+            print(f"Unknown command '{command}' - use apply, status or verify")
+            return 2
+
+        for name, table in missing:
+            print(f"❌ Missing index {name} on {table}")
+        if not missing:
+            print(f"✅ All {len(REQUIRED_INDEXES)} required indexes present")
+        return 1 if missing else 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,255 @@
+# skill_services.py - skill taxonomy with canonical IDs, synonyms and one-pass extraction
+#
+#   python skill_services.py extract "<free text>"
+#   python skill_services.py tag          store skill_ids for jobs and careers missing them
+#
+# data/skills.csv lists every canonical skill (id, slug, name) with its
+# synonyms and abbreviations ("PV" -> Solar PV Design). All names are
+# compiled into one Aho-Corasick automaton, so extracting the skill IDs
+# from a job description is a single scan of the text however large the
+# taxonomy grows. jobs.skill_ids / careers.skill_ids hold the result as a
+# JSON array, and matching compares integer sets instead of strings.
+import csv
+import json
+import logging
+import os
+import re
+import sys
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def default_taxonomy_path() -> str:
+    return os.getenv("SKILL_TAXONOMY_CSV", os.path.join(DATA_DIR, "skills.csv"))
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", (text or "").lower())
+
+
+class AhoCorasick:
+    """Character automaton over all patterns; reports whole-word, leftmost-longest matches"""
+
+    def __init__(self, patterns: Dict[str, int]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, int]]] = [[]]  # (pattern length, value)
+        for pattern, value in patterns.items():
+            self._add(pattern, value)
+        self._link()
+
+    def _add(self, pattern: str, value: int):
+        node = 0
+        for char in pattern:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(pattern), value))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0) if self.goto[fallback].get(char, 0) != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """(start, end, value) of non-overlapping whole-word matches, leftmost-longest first"""
+        hits = []
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, value in self.output[node]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    hits.append((start, end, value))
+
+        hits.sort(key=lambda hit: (hit[0], hit[0] - hit[1]))
+        chosen = []
+        covered = 0
+        for start, end, value in hits:
+            if start >= covered:
+                chosen.append((start, end, value))
+                covered = end
+        return chosen
+
+
+class SkillTaxonomy:
+    """Canonical skills loaded from CSV, with an automaton over every name and alias"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.names: Dict[int, str] = {}
+        self.slugs: Dict[int, str] = {}
+        self.ids_by_slug: Dict[str, int] = {}
+        self.aliases: Dict[str, int] = {}
+        self.matcher = AhoCorasick({})
+        self.extract_cached = lru_cache(maxsize=8192)(self._extract)
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        names, slugs, aliases = {}, {}, {}
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    skill_id = int(row["id"])
+                    names[skill_id] = row["name"].strip()
+                    slugs[skill_id] = row["slug"].strip()
+                    for alias in [row["name"], row["slug"].replace("_", " ")] + (row.get("aliases") or "").split("|"):
+                        alias = normalize_text(alias).strip()
+                        if alias:
+                            aliases.setdefault(alias, skill_id)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Skill taxonomy unavailable ({path}): {e}")
+            return
+        self.names, self.slugs, self.aliases = names, slugs, aliases
+        self.ids_by_slug = {slug: skill_id for skill_id, slug in slugs.items()}
+        self.matcher = AhoCorasick(aliases)
+        self.extract_cached.cache_clear()
+        logger.info(f"🧩 Loaded {len(names)} skills with {len(aliases)} names")
+
+    def _extract(self, text: str) -> Tuple[int, ...]:
+        seen = {}
+        for _, _, skill_id in self.matcher.find(normalize_text(text)):
+            seen.setdefault(skill_id, None)
+        return tuple(seen)
+
+    def extract(self, text: str) -> List[int]:
+        """Skill IDs mentioned in free text, in order of first mention"""
+        if not text:
+            return []
+        return list(self.extract_cached(text))
+
+    def extract_all(self, texts: Iterable[str]) -> List[int]:
+        seen = {}
+        for text in texts:
+            for skill_id in self.extract(text or ""):
+                seen.setdefault(skill_id, None)
+        return list(seen)
+
+    def canonical(self, skill: str) -> Optional[int]:
+        """ID for one skill as typed by a user ("PV", "solar pv", "Solar PV Design")"""
+        skill_id = self.aliases.get(normalize_text(skill).strip())
+        if skill_id is not None:
+            return skill_id
+        found = self.extract(skill)
+        return found[0] if found else None
+
+    def name(self, skill_id: int) -> str:
+        return self.names.get(skill_id, str(skill_id))
+
+    def id_for_slug(self, slug: str) -> Optional[int]:
+        return self.ids_by_slug.get(slug)
+
+
+skill_taxonomy = SkillTaxonomy(default_taxonomy_path())
+
+
+def encode_skill_ids(skill_ids: Iterable[int]) -> str:
+    return json.dumps(sorted(set(skill_ids)))
+
+
+def decode_skill_ids(value) -> List[int]:
+    if not value:
+        return []
+    try:
+        return [int(v) for v in json.loads(value)]
+    except (TypeError, ValueError):
+        return []
+
+
+def skills_list(value) -> List[str]:
+    """careers.required_skills is stored as JSON or a comma separated string"""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+        if isinstance(parsed, list):
+            return [str(v) for v in parsed]
+    except (TypeError, ValueError):
+        pass
+    return [part.strip().strip('"\'') for part in str(value).strip("[]").split(",") if part.strip()]
+
+
+def job_skill_ids(title: str, description: str, skills: str) -> List[int]:
+    return skill_taxonomy.extract_all([title, description, skills])
+
+
+def career_skill_ids(title: str, required_skills: Iterable[str]) -> List[int]:
+    ids = skill_taxonomy.extract_all(required_skills)
+    return ids or skill_taxonomy.extract(title)
+
+
+def tag_rows(chunk: int = 500) -> Dict[str, int]:
+    """Fill jobs.skill_ids / careers.skill_ids for rows tagged before the taxonomy existed"""
+    from database import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection failed")
+    cursor = conn.cursor()
+    tagged = {"jobs": 0, "careers": 0}
+    sources = [
+        ("jobs", "job_id", "title, description, skills",
+         lambda row: job_skill_ids(row[1], row[2], row[3])),
+        ("careers", "career_id", "title, required_skills",
+         lambda row: career_skill_ids(row[1], skills_list(row[2]))),
+    ]
+    try:
+        for table, key, columns, extract in sources:
+            last_id = 0
+            while True:
+                cursor.execute(f"""
+                    SELECT {key}, {columns} FROM {table}
+                    WHERE skill_ids IS NULL AND {key} > %s ORDER BY {key} LIMIT %s
+                """, (last_id, chunk))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                cursor.executemany(f"UPDATE {table} SET skill_ids = %s WHERE {key} = %s",
+                                   [(encode_skill_ids(extract(row)), row[0]) for row in rows])
+                conn.commit()
+                tagged[table] += len(rows)
+    finally:
+        cursor.close()
+        conn.close()
+    return tagged
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) == 2 and argv[0] == "extract":
+        for skill_id in skill_taxonomy.extract(argv[1]):
+            print(f"{skill_id:4}  {skill_taxonomy.name(skill_id)}")
+        return 0
+    if argv == ["tag"]:
+        tagged = tag_rows()
+        print(f"✅ Tagged {tagged['jobs']} jobs and {tagged['careers']} careers")
+        return 0
+    print("usage: python skill_services.py extract \"<text>\" | tag")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
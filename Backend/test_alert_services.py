@@ -0,0 +1,34 @@
+from alert_services import CompiledSearches, match_jobs, parse_search_query
+
+SEARCHES = [
+    {"search_id": 1, "user_id": 10, "search_name": "Solar in Pune",
+     "search_query": '{"skills": ["solar pv"], "location": "Pune", "radius_km": 30}'},
+    {"search_id": 2, "user_id": 20, "search_name": "Python, well paid",
+     "search_query": '{"skill_text": ["python"], "min_salary": 1500000}', "query_vector_json": "[1, 0]"},
+    {"search_id": 3, "user_id": 30, "search_name": "Anything remote-ish",
+     "search_query": '{"location": "Atlantis", "job_type": "Contract"}'},
+]
+
+
+def test_search_query_accepts_both_field_names():
+    assert parse_search_query('{"skill_text": "python"}')["skills"] == ["python"]
+    assert parse_search_query(None)["skills"] == []
+
+
+def test_new_jobs_match_searches_in_one_pass():
+    compiled = CompiledSearches(SEARCHES)
+    jobs = [
+        {"job_id": 100, "title": "PV Engineer", "location": "Pune", "latitude": 18.52, "longitude": 73.86,
+         "skill_ids": compiled.skills.indices[:1].tolist(), "salary_value": 900000, "job_type": "Full-time"},
+        {"job_id": 101, "title": "Data Engineer", "location": "Mumbai", "latitude": 19.07, "longitude": 72.88,
+         "skill_ids": [], "salary_value": 1800000, "desc_vector_json": "[0.9, 0.1]", "job_type": "Full-time"},
+        {"job_id": 102, "title": "Surveyor", "location": "Atlantis Coast", "skill_ids": [], "job_type": "contract"},
+    ]
+    matches = {(int(compiled.search_ids[row]), jobs[j]["job_id"]) for row, j, _ in match_jobs(compiled, jobs)}
+    assert matches == {(1, 100), (2, 101), (3, 102)}
+
+
+if __name__ == "__main__":
+    test_search_query_accepts_both_field_names()
+    test_new_jobs_match_searches_in_one_pass()
+    print("✅ Alert service tests passed")
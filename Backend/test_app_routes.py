@@ -0,0 +1,49 @@
+import ast
+import os
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def bound_dependencies(name):
+    """(route path, the `def name` its Depends(name) resolves to) in declaration order.
+
+    FastAPI captures the dependency callable when the route is declared, so
+    a route binds whichever definition of `name` precedes it in app.py.
+    """
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    current, routes = None, []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == name:
+            current = node
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        paths = [d.args[0].value for d in node.decorator_list
+                 if isinstance(d, ast.Call) and isinstance(d.func, ast.Attribute)
+                 and getattr(d.func.value, "id", None) == "app" and d.args and isinstance(d.args[0], ast.Constant)]
+        depends = [default for default in node.args.defaults + node.args.kw_defaults
+                   if isinstance(default, ast.Call) and getattr(default.func, "id", None) == "Depends"
+                   and default.args and getattr(default.args[0], "id", None) == name]
+        routes += [(path, current) for path in paths if depends]
+    return routes
+
+
+def selected_columns(func):
+    selects = [node.value for node in ast.walk(func)
+               if isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.startswith("SELECT")]
+    return selects[0].split("FROM")[0]
+
+
+def test_every_route_resolves_the_full_current_user():
+    routes = dict(bound_dependencies("get_current_user"))
+    assert "/api/jobs/search" in routes and "/match_jobs" in routes
+    definitions = {id(func) for func in routes.values()}
+    assert None not in routes.values() and len(definitions) == 1
+    # rank_candidates and the admin checks read these keys
+    columns = selected_columns(routes["/api/jobs/search"])
+    assert all(column in columns for column in ("user_id", "role", "is_admin"))
+
+
+if __name__ == "__main__":
+    test_every_route_resolves_the_full_current_user()
+    print("✅ App route tests passed")
@@ -0,0 +1,36 @@
+import numpy as np
+
+from career_graph_services import CareerGraph, build_graph, growth_rate, salary_midpoint
+
+CAREERS = [
+    {"career_id": 1, "title": "Junior Analyst", "salary_range": "₹4-6 LPA", "growth": "High",
+     "skills_vector_json": "[1, 0, 0]"},
+    {"career_id": 2, "title": "Data Scientist", "salary_range": "₹10-14 LPA", "growth": "+30%",
+     "skills_vector_json": "[0.9, 0.3, 0]"},
+    {"career_id": 3, "title": "Chief Climate Officer", "salary_range": "₹30-40 LPA", "growth": "High",
+     "skills_vector_json": "[0.5, 0.8, 0.1]"},
+    {"career_id": 4, "title": "Wind Technician", "salary_range": "₹5-7 LPA", "growth": "Medium"},
+]
+
+
+def test_parses_salary_ranges_and_growth():
+    assert salary_midpoint("₹8-15 LPA") == 11.5
+    assert salary_midpoint("800000 - 1200000") == 10.0
+    assert growth_rate("+25%") == 25.0
+    assert growth_rate("Very High") == 30.0
+
+
+def test_paths_follow_similar_better_paid_careers():
+    skills = np.array([[1, 0], [1, 0], [1, 0], [0, 1]], dtype=bool)
+    graph = CareerGraph()
+    graph.set_graph(build_graph(CAREERS, skills, k=2))
+    assert [edge[0] for edge in graph.edges[1]] == [2, 3]
+    assert graph.edges[4] == []  # no embedding and no shared skills
+    assert [step["title"] for step in graph.path(1)] == ["Data Scientist", "Chief Climate Officer"]
+    assert [step["career_id"] for step in graph.path(graph.resolve("junior analyst"), 3, mode="widest")] == [2, 3]
+
+
+if __name__ == "__main__":
+    test_parses_salary_ranges_and_growth()
+    test_paths_follow_similar_better_paid_careers()
+    print("✅ Career graph tests passed")
@@ -0,0 +1,51 @@
+from career_services import CareerCatalog
+
+CAREERS = [
+    {"career_id": 1, "title": "Solar Engineer", "required_skills": '["Solar PV Design", "AutoCAD"]', "demand": 90},
+    {"career_id": 2, "title": "Sustainability Analyst", "required_skills": '["Python", "Data Analysis", "ESG"]',
+     "demand": 80},
+    {"career_id": 3, "title": "Wind Technician", "required_skills": "Turbine Maintenance, Safety", "demand": 100},
+]
+
+
+def test_ranks_by_coverage_times_demand():
+    catalog = CareerCatalog(loader=lambda: CAREERS)
+    ranked = catalog.match(["PV", "python", "autocad"])
+    assert [c["career_id"] for c in ranked] == [1, 2]
+    assert ranked[0]["coverage"] == 1.0
+    assert ranked[0]["required_skills"] == ["Solar PV Design", "AutoCAD"]
+    assert [c["career_id"] for c in catalog.match([])] == [3, 1, 2]
+    assert catalog.match(["turbine maintenance"])[0]["career_id"] == 3
+
+
+def test_reloads_after_ttl_or_invalidate():
+    now = [0.0]
+    loads = []
+    catalog = CareerCatalog(loader=lambda: loads.append(1) or CAREERS, ttl=60, clock=lambda: now[0])
+    catalog.match(["python"])
+    catalog.match(["esg"])
+    assert len(loads) == 1
+    now[0] = 61
+    catalog.match(["python"])
+    catalog.invalidate()
+    catalog.match(["python"])
+    assert len(loads) == 3
+
+
+def test_gap_report_lists_missing_skills_and_learning_path():
+    catalog = CareerCatalog(loader=lambda: CAREERS)
+    report = catalog.gap_report(["python", "cobol"])
+    assert report["careers"][0]["career_id"] == 2
+    assert report["careers"][0]["matched_skills"] == ["Python"]
+    assert sorted(report["careers"][0]["missing_skills"]) == ["Data Analysis", "ESG Reporting"]
+    assert report["unknown_skills"] == ["cobol"]
+    assert report["learning_path"][0]["skill"] in ("Data Analysis", "ESG Reporting")
+    assert catalog.gap_report(["Python"])["careers"] == report["careers"]
+    assert len(catalog.snapshot().gap_cache) == 1
+
+
+if __name__ == "__main__":
+    test_ranks_by_coverage_times_demand()
+    test_reloads_after_ttl_or_invalidate()
+    test_gap_report_lists_missing_skills_and_learning_path()
+    print("✅ Career service tests passed")
@@ -0,0 +1,51 @@
+import numpy as np
+
+from dedup_services import assign_canonical, band_keys, estimated_jaccard, signature
+
+POSTING = ("Solar PV Technician. Install and maintain rooftop solar photovoltaic systems across Pune, inspect "
+           "inverters, wiring and mounting structures, and train junior staff on safety procedures for work at height.")
+REPOST = POSTING.replace("junior staff", "new hires") + " Apply now."
+OTHER = "Wind turbine data analyst modelling output forecasts using python and SCADA data for offshore farms."
+
+
+def entry(job_id, text, vector=None, company="SunCo", canonical=None):
+    sig = signature(text)
+    job = {"job_id": job_id, "signature": sig, "keys": band_keys(sig, company),
+           "vector": None if vector is None else np.asarray(vector, dtype=float) / np.linalg.norm(vector)}
+    if canonical is not None:
+        job["canonical"] = canonical
+    return job
+
+
+def test_reposts_share_a_bucket_within_one_company():
+    original, repost = entry(1, POSTING), entry(2, REPOST)
+    assert estimated_jaccard(original["signature"], repost["signature"]) > 0.5
+    assert set(original["keys"]) & set(repost["keys"])
+    assert not set(original["keys"]) & set(entry(3, OTHER)["keys"])
+    assert not set(original["keys"]) & set(entry(4, POSTING, company="WindCo")["keys"])
+
+
+def test_candidates_are_confirmed_by_embedding():
+    # Job 5 is itself a duplicate of job 1, so its reposts point at 1
+    stored = {5: entry(5, POSTING, vector=[1, 0.05], canonical=1)}
+    new = [entry(10, REPOST, vector=[1, 0.1]),                   # same text, same meaning
+           entry(11, REPOST, vector=[0, 1]),                     # same text, embedding disagrees
+           entry(12, OTHER),
+           entry(13, OTHER)]                                     # repeated within the batch, no vectors
+    embedded = []
+    duplicates = assign_canonical(new, stored, vectorize=lambda job: embedded.append(job["job_id"]))
+    assert duplicates == {10: 1, 13: 12}
+    assert embedded == []
+
+
+def test_missing_vector_is_embedded_on_demand():
+    stored = {1: entry(1, POSTING, vector=[1, 0], canonical=1)}
+    duplicates = assign_canonical([entry(2, REPOST)], stored, vectorize=lambda job: np.array([1.0, 0.0]))
+    assert duplicates == {2: 1}
+
+
+if __name__ == "__main__":
+    test_reposts_share_a_bucket_within_one_company()
+    test_candidates_are_confirmed_by_embedding()
+    test_missing_vector_is_embedded_on_demand()
+    print("✅ Dedup service tests passed")
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from geo_services import IPCityResolver, gazetteer, bounding_box, haversine_km
+
+
+def test_ip_ranges_resolve_with_binary_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ranges.csv")
+        with open(path, "w") as f:
+            f.write("# comment\nnetwork,city\n49.36.0.0/14,Mumbai\n1.22.0.0/15,Pune\n2401:4900::/32,Delhi\n")
+        resolver = IPCityResolver(path)
+        assert resolver.lookup("49.37.10.1") == "Mumbai"
+        assert resolver.lookup("1.23.255.255") == "Pune"
+        assert resolver.lookup("2401:4900::1") == "Delhi"
+        assert resolver.lookup("49.40.0.1") is None
+        assert resolver.lookup("testclient") is None
+
+
+def test_remote_lookup_is_used_only_until_a_table_is_loaded():
+    calls = []
+
+    def remote(ip):
+        calls.append(ip)
+        return {"49.37.10.1": "Chennai"}.get(ip)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ranges.csv")
+        with open(path, "w") as f:
+            f.write("network,city\n")
+        resolver = IPCityResolver(path, fallback=remote)
+        assert not resolver.loaded
+        assert resolver.resolve("49.37.10.1") == "Chennai"
+        assert resolver.resolve("49.37.10.1") == "Chennai"
+        assert resolver.resolve("10.0.0.1") is None and resolver.resolve("10.0.0.1") is None
+        assert calls == ["49.37.10.1", "10.0.0.1", "10.0.0.1"]     # only answers are cached
+
+        with open(path, "w") as f:
+            f.write("network,city\n49.36.0.0/14,Mumbai\n")
+        resolver.load(path)
+        assert resolver.loaded and resolver.resolve("49.37.10.1") == "Mumbai"
+        assert len(calls) == 3
+
+
+def test_gazetteer_geocodes_free_text_locations():
+    assert gazetteer.geocode("Pune, Maharashtra") == gazetteer.geocode("Poona")
+    assert gazetteer.geocode("Remote / Bangalore") == gazetteer.geocode("Bengaluru")
+    assert gazetteer.geocode("Atlantis") is None
+
+
+def test_radius_search_is_box_then_haversine():
+    pune = gazetteer.geocode("Pune")
+    cities = ["Pimpri-Chinchwad", "Mumbai", "Nashik"]
+    lats, lons = zip(*(gazetteer.geocode(city) for city in cities))
+    distances = haversine_km(pune[0], pune[1], list(lats) + [None], list(lons) + [None])
+    assert 10 < distances[0] < 20
+    assert 110 < distances[1] < 130
+    assert [city for city, d in zip(cities, distances) if d <= 50] == ["Pimpri-Chinchwad"]
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(pune[0], pune[1], 50)
+    assert min_lat < lats[0] < max_lat and min_lon < lons[0] < max_lon
+    assert not (min_lat < lats[1] < max_lat and min_lon < lons[1] < max_lon)
+
+
+if __name__ == "__main__":
+    test_ip_ranges_resolve_with_binary_search()
+    test_remote_lookup_is_used_only_until_a_table_is_loaded()
+    test_gazetteer_geocodes_free_text_locations()
+    test_radius_search_is_box_then_haversine()
+    print("✅ Geo service tests passed")
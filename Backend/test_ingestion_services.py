@@ -0,0 +1,90 @@
+import io
+
+from ingestion_services import JobIngestor, detect_format, iter_records
+
+
+class FakeConnection:
+    """Hands out increasing job ids per executemany and records every chunk"""
+
+    def __init__(self, fail_on_chunk=None):
+        self.chunks, self.commits, self.rollbacks = [], 0, 0
+        self.fail_on_chunk = fail_on_chunk
+        self.next_id = 100
+
+    def __call__(self):
+        return self
+
+    def cursor(self):
+        return self
+
+    def executemany(self, sql, rows):
+        if len(self.chunks) == self.fail_on_chunk:
+            self.chunks.append(None)
+            raise RuntimeError("deadlock")
+        self.chunks.append(rows)
+
+    def execute(self, sql, params):
+        rows = self.chunks[-1]
+        self.last = [(self.next_id + i,) for i in range(len(rows))]
+        self.next_id += len(rows)
+
+    def fetchall(self):
+        return self.last
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+CSV = """title,description,location,skills,salary,job_type
+Solar Technician,Install rooftop PV,Pune,"solar pv, wiring",600000,
+Wind Analyst,Model turbine output,Chennai,python,900000,Contract
+Missing Salary,No pay given,Delhi,python,,
+Energy Auditor,Audit factories,Mumbai,energy audit,750000,
+"""
+
+
+class RepostDetector:
+    def process(self, cursor, jobs):
+        return {job["job_id"]: 100 for job in jobs if job["title"] == "Wind Analyst"}
+
+
+def test_csv_import_validates_chunks_and_indexes():
+    conn, embedded, indexed = FakeConnection(), [], []
+    ingestor = JobIngestor(embed_batch=lambda texts: embedded.append(texts) or [[1.0, 0.0]] * len(texts),
+                           indexers={"recommendations": indexed.append}, chunk_size=2, connection_factory=conn,
+                           deduplicator=RepostDetector())
+    report = ingestor.ingest(io.StringIO(CSV), "csv", user_id=7, employer_id=3, company="SunCo")
+
+    assert (report["received"], report["inserted"], report["rejected"]) == (4, 3, 1)
+    assert report["errors"][0]["line"] == 4 and "salary" in report["errors"][0]["error"]
+    assert [len(rows) for rows in conn.chunks] == [2, 1] and conn.commits == 2
+    assert [len(texts) for texts in embedded] == [2, 1]
+    # The duplicate is stored but kept out of the indexes
+    assert report["job_ids"] == [100, 101, 102] and report["duplicates"] == {101: 100}
+    assert indexed == [[100], [102]]
+    first = conn.chunks[0][0]
+    assert first[2] == "SunCo" and first[4] == "Full-time" and first[13] is not None  # company, default, latitude
+    assert set(report["stages"]) == {"parse", "enrich", "embed", "insert", "dedup", "recommendations"}
+
+
+def test_failed_chunk_is_rolled_back_alone():
+    conn = FakeConnection(fail_on_chunk=0)
+    lines = "\n".join('{"title": "Job %d", "description": "d", "location": "Pune", "skills": "python", "salary": 5}' % i
+                      for i in range(3)) + "\nnot json\n"
+    report = JobIngestor(chunk_size=2, connection_factory=conn).ingest(io.StringIO(lines), "jsonl", 7, 3, "SunCo")
+    assert (report["inserted"], report["rejected"], conn.rollbacks) == (1, 3, 1)
+    assert [e["line"] for e in report["errors"]] == [1, 2, 4]
+    assert detect_format("jobs.JSONL") == "jsonl" and detect_format(None, "text/csv") == "csv"
+    assert list(iter_records(["[1]"], "jsonl"))[0][2] == "expected a JSON object"
+
+
+if __name__ == "__main__":
+    test_csv_import_validates_chunks_and_indexes()
+    test_failed_chunk_is_rolled_back_alone()
+    print("✅ Ingestion service tests passed")
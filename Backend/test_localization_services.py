@@ -0,0 +1,90 @@
+import asyncio
+import re
+from contextlib import contextmanager
+
+import localization_services
+from localization_services import materialize_careers, materialize_jobs
+
+
+class FakeCatalog:
+    """Source rows plus stored translations, answering the two reads materialize() makes"""
+
+    def __init__(self, rows, stored=()):
+        self.rows = rows
+        self.stored = set(stored)
+        self.upserts = []
+
+    def fetch(self, sql, params):
+        key = re.search(r"SELECT (\w+)", sql).group(1)
+        if "_translations" in sql:
+            return [{key: row_id, "lang": lang} for row_id, lang in sorted(self.stored) if row_id in params]
+        return [row for row in self.rows if row[key] in params]
+
+    def store(self, sql, values):
+        self.upserts.extend(values)
+        self.stored.update((value[0], value[1]) for value in values)
+
+
+class TaggingEngine:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+
+    async def translate_many(self, texts, lang, time_budget=None):
+        self.requests.append((lang, list(texts)))
+        await asyncio.sleep(self.delay)
+        return {text: f"[{lang}] {text}" for text in texts}
+
+
+JOBS = [{"job_id": 1, "title": "Solar Technician", "description": "Install PV"},
+        {"job_id": 2, "title": "Wind Analyst", "description": "Model output"}]
+
+
+@contextmanager
+def reading(catalog):
+    saved = localization_services._fetch, localization_services._store
+    localization_services._fetch, localization_services._store = catalog.fetch, catalog.store
+    try:
+        yield catalog
+    finally:
+        localization_services._fetch, localization_services._store = saved
+
+
+def test_rows_with_stored_translations_are_skipped():
+    engine = TaggingEngine()
+    with reading(FakeCatalog(JOBS, stored={(1, "hi")})) as catalog:
+        assert asyncio.run(materialize_jobs(engine, [1, 2, 2], ["en", "hi", "ta"])) == 3
+        assert sorted((value[0], value[1]) for value in catalog.upserts) == [(1, "ta"), (2, "hi"), (2, "ta")]
+        assert engine.requests[0] == ("hi", ["Wind Analyst", "Model output"])
+
+        # Everything is stored now - nothing goes upstream
+        assert asyncio.run(materialize_jobs(engine, [1, 2], ["hi", "ta"])) == 0
+        assert len(engine.requests) == 2
+
+
+def test_concurrent_searches_translate_each_row_once():
+    engine = TaggingEngine(delay=0.02)
+
+    async def searches():
+        return await asyncio.gather(*(materialize_jobs(engine, [1, 2], ["hi", "ta"]) for _ in range(5)))
+
+    with reading(FakeCatalog(JOBS)) as catalog:
+        assert sorted(asyncio.run(searches())) == [0, 0, 0, 0, 4]
+        assert len(catalog.upserts) == 4 and len(engine.requests) == 2
+    assert not localization_services._in_flight
+
+
+def test_careers_translate_skill_lists():
+    career = {"career_id": 9, "title": "Energy Auditor", "description": "Audit plants", "growth": "High",
+              "salary_range": "6-9 LPA", "category": "Energy", "experience_level": "Mid",
+              "required_skills": '["energy audit", "python"]'}
+    with reading(FakeCatalog([career])) as catalog:
+        assert asyncio.run(materialize_careers(TaggingEngine(), [9], ["hi"])) == 1
+    assert catalog.upserts[0][-1] == '["[hi] energy audit", "[hi] python"]'
+
+
+if __name__ == "__main__":
+    test_rows_with_stored_translations_are_skipped()
+    test_concurrent_searches_translate_each_row_once()
+    test_careers_translate_skill_lists()
+    print("✅ Localization service tests passed")
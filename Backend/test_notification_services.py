@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from notification_services import NotificationFeed, insert_notifications
+
+
+class RecordingCursor:
+    def __init__(self, counters):
+        self.counters = counters
+        self.statements = []
+
+    def executemany(self, sql, rows):
+        self.statements.append((" ".join(sql.split()), list(rows)))
+
+    def execute(self, sql, params):
+        self.statements.append((" ".join(sql.split()), list(params)))
+
+    def fetchall(self):
+        return [self.counters[u] for u in self.statements[-1][1] if u in self.counters]
+
+
+def test_inserts_raise_counters_once_per_user():
+    cursor = RecordingCursor({3: {"user_id": 3, "unread": 4, "version": 9}})
+    counters = insert_notifications(cursor, [
+        {"user_id": 3, "title": "a", "message": "m", "type": "job_alert"},
+        {"user_id": 3, "title": "b", "message": "m", "type": "job_alert"},
+        {"user_id": 5, "title": "c", "message": "m"},
+    ])
+    assert len(cursor.statements[0][1]) == 3
+    assert cursor.statements[1][1] == [(3, 2), (5, 1)]
+    assert counters == [{"user_id": 3, "unread": 4, "version": 9}, {"user_id": 5, "unread": 0, "version": 0}]
+
+
+def test_long_poll_wakes_only_on_a_counter_change():
+    feed = NotificationFeed()
+
+    async def scenario():
+        counter = lambda user_id: {"user_id": user_id, "unread": 1, "version": 7}
+        # Client is behind: answered at once
+        assert (await feed.wait(1, 6, timeout=5, current=counter))["changed"] is True
+        # Client is current: nothing happens until the timeout
+        assert (await feed.wait(1, 7, timeout=0.01, current=counter))["changed"] is False
+
+        waiter = asyncio.ensure_future(feed.wait(1, 7, timeout=5, current=counter))
+        while not feed.waiting(1):
+            await asyncio.sleep(0)
+        feed.notify(json.dumps({"user_id": 2, "unread": 3, "version": 1}))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        feed.notify(json.dumps({"user_id": 1, "unread": 2, "version": 8}))
+        assert await waiter == {"user_id": 1, "unread": 2, "version": 8, "changed": True}
+        assert feed.waiting(1) == 0
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    test_inserts_raise_counters_once_per_user()
+    test_long_poll_wakes_only_on_a_counter_change()
+    print("✅ Notification service tests passed")
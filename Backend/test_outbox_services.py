@@ -0,0 +1,73 @@
+import asyncio
+
+from notification_services import NOTIFICATION_COUNT_CHANNEL
+from outbox_services import EMAIL, NOTIFICATION, Outbox, OutboxWorker
+
+
+class MemoryStore:
+    """outbox_events and notifications as lists"""
+
+    def __init__(self, stored=None, fail_inserts=False):
+        self.stored = list(stored or [])
+        self.fail_inserts = fail_inserts
+        self.notifications, self.done, self.failed, self.persisted = [], [], [], []
+
+    def claim(self, batch_size):
+        claimed, self.stored = self.stored[:batch_size], self.stored[batch_size:]
+        return claimed
+
+    def finish(self, done, failed):
+        self.done += done
+        self.failed += failed
+
+    def persist(self, events, delay_seconds=0):
+        self.persisted += events
+
+    def insert_notifications(self, notifications):
+        if self.fail_inserts:
+            raise ConnectionError("database down")
+        self.notifications += notifications
+        return [{"user_id": user_id, "unread": 1, "version": 1} for user_id in {n["user_id"] for n in notifications}]
+
+
+class StubSMTP:
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append(messages)
+        return [m["to"] not in self.reject for m in messages]
+
+
+def test_worker_delivers_one_batch_per_kind():
+    store = MemoryStore([{"event_id": 7, "kind": NOTIFICATION, "attempts": 0,
+                          "payload": {"user_id": 3, "title": "Application Submitted", "message": "job #1"}}])
+    outbox, transport, pushed = Outbox(store), StubSMTP(reject={"bad@example.com"}), []
+    outbox.enqueue(EMAIL, {"to": "a@example.com", "subject": "Jobs", "body": "5 matches"})
+    outbox.enqueue(EMAIL, {"to": "bad@example.com", "subject": "Jobs", "body": "2 matches"})
+    worker = OutboxWorker(outbox, transport, publish=lambda channel, message: pushed.append((channel, message)))
+
+    assert asyncio.run(worker.drain_once()) == 3
+    assert len(transport.batches) == 1 and len(transport.batches[0]) == 2
+    assert [n["user_id"] for n in store.notifications] == [3]
+    assert pushed == [(NOTIFICATION_COUNT_CHANNEL, {"user_id": 3, "unread": 1, "version": 1}),
+                      ("user:3", {"type": "notification", "user_id": 3, "title": "Application Submitted",
+                                  "message": "job #1"})]
+    assert store.done == [7]
+    # The rejected in-process email is kept in the table for a retry
+    assert [(e["payload"]["to"], e["attempts"]) for e in store.persisted] == [("bad@example.com", 1)]
+
+
+def test_failed_stored_events_are_rescheduled():
+    store = MemoryStore([{"event_id": 1, "kind": NOTIFICATION, "attempts": 2,
+                          "payload": {"user_id": 1, "title": "t", "message": "m"}}], fail_inserts=True)
+    worker = OutboxWorker(Outbox(store), StubSMTP())
+    asyncio.run(worker.drain_once())
+    assert store.done == [] and [(e["event_id"], e["attempts"]) for e in store.failed] == [(1, 3)]
+
+
+if __name__ == "__main__":
+    test_worker_delivers_one_batch_per_kind()
+    test_failed_stored_events_are_rescheduled()
+    print("✅ Outbox service tests passed")
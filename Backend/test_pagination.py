@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, keyset_condition, keyset_params, split_page
+
+
+def test_cursor_round_trip():
+    stamp = datetime(2024, 6, 11, 9, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(stamp, 42)) == (stamp, 42)
+    assert decode_cursor(encode_cursor(0.875, 7)) == (0.875, 7)
+    assert decode_cursor(encode_cursor(3, 7)) == (3.0, 7)
+    assert "=" not in encode_cursor(stamp, 42)
+    for bad in ("", "not-a-cursor", encode_cursor(stamp, 42)[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_null_sort_value_pages_on_id_alone():
+    cursor = encode_cursor(None, 9)
+    assert decode_cursor(cursor) == (None, 9)
+    keyset = keyset_params(cursor)
+    assert keyset == [9]
+    assert keyset_condition("a.applied_at", "a.application_id", keyset) == \
+        "(a.applied_at IS NULL AND a.application_id < %s)"
+    # Rows after a non-NULL cursor include the NULL tail
+    keyset = keyset_params(encode_cursor(0.5, 3))
+    condition = keyset_condition("r.score", "r.job_id", keyset)
+    assert keyset == [0.5, 0.5, 3] and condition.count("%s") == 3 and "r.score IS NULL" in condition
+    assert keyset_params(None) == []
+
+
+def test_split_page_builds_next_cursor_from_last_row():
+    rows = [{"job_id": 5 - i, "created_at": datetime(2024, 6, 11 - i)} for i in range(4)]
+    page, next_cursor = split_page(rows, 3, "created_at", "job_id")
+    assert [row["job_id"] for row in page] == [5, 4, 3]
+    assert decode_cursor(next_cursor) == (datetime(2024, 6, 9), 3)
+    assert split_page(rows[:3], 3, "created_at", "job_id") == (rows[:3], None)
+
+    rows[2]["created_at"] = None
+    _, next_cursor = split_page(rows, 3, "created_at", "job_id")
+    assert keyset_params(next_cursor) == [3]
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_null_sort_value_pages_on_id_alone()
+    test_split_page_builds_next_cursor_from_last_row()
+    print("✅ Pagination tests passed")
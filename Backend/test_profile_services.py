@@ -0,0 +1,85 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+import profile_services
+from profile_services import ProfileCache, load_profile
+
+
+def test_cache_expires_and_evicts_least_recent():
+    cache = ProfileCache(ttl=60, max_entries=2)
+    cache.set(1, {"user": 1})
+    cache.set(2, {"user": 2})
+    assert cache.get(1) == {"user": 1}
+    cache.set(3, {"user": 3})                      # 2 was used least recently
+    assert cache.get(2) is None and cache.get(1) and cache.get(3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    cache.ttl = -1
+    cache.set(4, {"user": 4})
+    assert cache.get(4) is None
+
+
+def test_load_started_before_invalidation_is_not_cached():
+    cache = ProfileCache()
+    before = cache.generation(7)
+    cache.invalidate(7)                            # a profile write committed while the load ran
+    assert cache.set(7, {"stale": True}, before) is False
+    assert cache.get(7) is None and cache.stale_sets == 1
+
+    current = cache.generation(7)
+    assert cache.set(7, {"fresh": True}, current) and cache.get(7) == {"fresh": True}
+    # Other users' writes do not hold this one back
+    cache.invalidate(8)
+    assert cache.set(7, {"fresh": 2}, current)
+
+
+def test_users_pruned_from_generations_stay_conservative():
+    cache = ProfileCache(max_entries=2)
+    before = cache.generation(1)
+    for user_id in (1, 2, 3):
+        cache.invalidate(user_id)
+    assert 1 not in cache._generations
+    assert cache.set(1, {"stale": True}, before) is False
+    assert cache.set(1, {"fresh": True}, cache.generation(1))
+
+
+def test_profile_reads_run_concurrently(monkeypatch):
+    def fake_query(sql, params, one=False):
+        time.sleep(0.05)
+        if one:
+            return {"user_id": params[0]}
+        if "applications" in sql:
+            return [{"application_id": 30 - i, "applied_at": datetime(2024, 6, 1)} for i in range(params[1])]
+        return []
+
+    monkeypatch.setattr(profile_services, "_query", fake_query)
+    started = time.perf_counter()
+    profile = asyncio.run(load_profile(5))
+    assert time.perf_counter() - started < 0.15
+    assert profile["profile"] == {"user_id": 5}
+    assert len(profile["applications"]) == profile_services.DEFAULT_PAGE_SIZE
+    assert profile["applications_next_cursor"]
+
+
+def test_pool_exhaustion_falls_back_to_a_direct_connection(monkeypatch):
+    mariadb = pytest.importorskip("mariadb")
+    import database
+
+    class ExhaustedPool:
+        def get_connection(self):
+            raise mariadb.PoolError("pool exhausted")
+
+    direct = object()
+    monkeypatch.setattr(database, "_get_pool", lambda: ExhaustedPool())
+    monkeypatch.setattr(database.mariadb, "connect", lambda **config: direct)
+    assert database.get_db_connection() is direct
+
+
+if __name__ == "__main__":
+    test_cache_expires_and_evicts_least_recent()
+    test_load_started_before_invalidation_is_not_cached()
+    test_users_pruned_from_generations_stay_conservative()
+    print("✅ Profile service tests passed")
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from ranking_services import RankingPipeline
+
+NOW = datetime(2030, 1, 1)
+
+JOBS = [
+    {"id": 1, "search_text": "Solar engineer python", "distance_km": 80.0, "salary_value": 6,
+     "created_at": NOW - timedelta(days=90), "desc_vector_json": "[0, 1]"},
+    {"id": 2, "search_text": "Python data analyst for solar", "distance_km": 5.0, "salary_value": 1200000,
+     "created_at": NOW - timedelta(days=1), "desc_vector_json": "[1, 0]"},
+    {"id": 3, "search_text": "Wind technician", "distance_km": None, "salary_value": None,
+     "created_at": None, "desc_vector_json": None},
+]
+
+
+def test_all_features_rank_the_best_fit_first():
+    ranked, report = RankingPipeline().rank(JOBS, ["python", "solar"], query_vector=[1, 0],
+                                            expected_salary=10, now=NOW)
+    assert [job["id"] for job in ranked] == [2, 1, 3]
+    assert set(report["timings_ms"]) == {"semantic", "keyword", "distance", "salary", "recency", "combine"}
+    assert abs(sum(report["weights"].values()) - 1) < 0.01
+
+
+def test_missing_features_drop_out_of_the_weights():
+    ranked, report = RankingPipeline().rank(JOBS, ["wind"], now=NOW)
+    assert ranked[0]["id"] == 3
+    assert "semantic" not in report["weights"] and "salary" not in report["weights"]
+
+
+if __name__ == "__main__":
+    test_all_features_rank_the_best_fit_first()
+    test_missing_features_drop_out_of_the_weights()
+    print("✅ Ranking service tests passed")
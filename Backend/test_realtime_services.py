@@ -0,0 +1,148 @@
+import asyncio
+import json
+import socket
+import tempfile
+
+from realtime_services import (BroadcastHub, StatsPublisher, UnixSocketRelay, BROADCAST_CHANNEL, RELAY_MAX_DATAGRAM,
+                               STATS_CHANNEL, user_channel)
+
+
+class FakeWebSocket:
+    def __init__(self, stalled=False):
+        self.sent, self.closed = [], None
+        self.stalled = stalled
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(payload))
+
+    async def close(self, code=1000):
+        self.closed = code
+
+
+async def settle(condition):
+    """Yield to the loop until condition() holds - no wall-clock assumptions"""
+    while not condition():
+        await asyncio.sleep(0)
+
+
+def test_stats_subscribers_share_one_poller():
+    polls = []
+
+    async def scenario():
+        ticks = asyncio.Queue()
+        hub = BroadcastHub()
+        # Each interval elapses only when the test puts a tick
+        publisher = StatsPublisher(hub, connection_factory=lambda: polls.append(1), sleep=lambda _: ticks.get())
+        sockets = [FakeWebSocket() for _ in range(5)]
+        for ws in sockets:
+            await publisher.subscribe(ws)
+        poller = publisher._task
+
+        for interval in range(1, 4):
+            ticks.put_nowait(None)
+            await asyncio.wait_for(settle(lambda: all(len(ws.sent) == interval for ws in sockets)), timeout=5)
+            # One query per interval no matter how many dashboards are open
+            assert len(polls) == interval and publisher._task is poller
+        assert all(ws.sent[0]["type"] == "stats_update" for ws in sockets)
+
+        for ws in sockets[:-1]:
+            publisher.unsubscribe(ws)
+        ticks.put_nowait(None)
+        await asyncio.wait_for(settle(lambda: len(sockets[-1].sent) == 4), timeout=5)
+        assert len(polls) == 4 and not poller.done()
+
+        # The last unsubscribe stops the poller without another query
+        publisher.unsubscribe(sockets[-1])
+        ticks.put_nowait(None)
+        await asyncio.wait_for(poller, timeout=5)
+        assert len(polls) == 4 and not hub.has_subscribers(STATS_CHANNEL)
+        await hub.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_hub_fans_out_per_channel():
+    async def scenario():
+        hub = BroadcastHub()
+        alice, bob, anonymous = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await hub.connect(alice, [BROADCAST_CHANNEL, user_channel(1)])
+        await hub.connect(bob, [BROADCAST_CHANNEL, user_channel(2)])
+        await hub.connect(anonymous)
+        hub.broadcast({"n": 1})
+        hub.publish(user_channel(1), {"n": 2})
+        heard = []
+        hub.add_listener(user_channel(2), heard.append)
+        hub.publish(user_channel(2), "{\"n\": 3}")
+        await asyncio.sleep(0.01)
+        assert [m["n"] for m in alice.sent] == [1, 2]
+        assert [m["n"] for m in bob.sent] == [1, 3] and heard == ['{"n": 3}']
+        assert [m["n"] for m in anonymous.sent] == [1]
+        hub.disconnect(bob)
+        assert not hub.has_subscribers(user_channel(2)) and hub.has_subscribers(user_channel(1))
+        await hub.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_is_dropped_without_delaying_others():
+    async def scenario():
+        hub = BroadcastHub(queue_size=2, send_timeout=30)
+        fast, stuck = FakeWebSocket(), FakeWebSocket(stalled=True)
+        await hub.connect(fast)
+        await hub.connect(stuck)
+        for n in range(6):
+            hub.broadcast({"n": n})
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        assert [m["n"] for m in fast.sent] == list(range(6))
+        assert stuck.closed == 1013 and stuck not in hub.connections
+        assert len(hub.channels[BROADCAST_CHANNEL]) == 1
+        await hub.shutdown()
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=2))
+
+
+def test_relay_frames_messages_between_workers():
+    async def scenario(directory):
+        loop = asyncio.get_running_loop()
+        sender, receiver = UnixSocketRelay(directory), UnixSocketRelay(directory)
+        receiver.path = receiver.directory / "peer.sock"
+        received = []
+        assert receiver.start(loop, lambda channel, payload: received.append((channel, payload)))
+        assert sender.start(loop, lambda channel, payload: None)
+        try:
+            sender.send(user_channel(7), '{"type": "notification"}')
+            sender.send(BROADCAST_CHANNEL, "x" * RELAY_MAX_DATAGRAM)           # too large - local only
+            raw = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            raw.sendto(b"not json", str(receiver.path))                      # dropped, relay keeps going
+            raw.close()
+            sender.send(BROADCAST_CHANNEL, "hello")
+            await asyncio.sleep(0.05)
+        finally:
+            sender.close()
+            receiver.close()
+        assert received == [("user:7", '{"type": "notification"}'), ("all", "hello")]
+
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(directory))
+
+
+def test_default_relay_directory_is_scoped_per_deployment():
+    first = UnixSocketRelay.create_default("localhost:3306/green_jobs")
+    second = UnixSocketRelay.create_default("localhost:3306/green_jobs_staging")
+    assert first.directory != second.directory
+    assert first.directory == UnixSocketRelay.create_default("localhost:3306/green_jobs").directory
+
+
+if __name__ == "__main__":
+    test_stats_subscribers_share_one_poller()
+    test_hub_fans_out_per_channel()
+    test_slow_consumer_is_dropped_without_delaying_others()
+    test_relay_frames_messages_between_workers()
+    test_default_relay_directory_is_scoped_per_deployment()
+    print("✅ Realtime service tests passed")
@@ -0,0 +1,75 @@
+import numpy as np
+
+import recommendation_services
+from recommendation_services import JobVectorIndex, RecommendationService, combine_user_vector, score_new_jobs
+
+
+class RecordingConnection:
+    """Answers every SELECT with no rows and records the writes"""
+
+    def __init__(self):
+        self.writes = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        if not sql.lstrip().startswith("SELECT"):
+            self.writes.append((" ".join(sql.split()), params))
+
+    def executemany(self, sql, rows):
+        self.writes.append((" ".join(sql.split()), rows))
+
+    def fetchall(self):
+        return []
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_user_vector_blends_profile_and_saved_jobs():
+    vector = combine_user_vector(np.array([2.0, 0.0]), ["[0, 1]", "[0, 3]", "not a vector"])
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert vector[0] > vector[1] > 0
+    assert np.allclose(combine_user_vector(None, ["[0, 5]"]), [0, 1])
+    assert combine_user_vector(None, []) is None
+
+
+def test_top_jobs_and_incremental_new_job_scoring():
+    jobs = JobVectorIndex(loader=lambda: ([1, 2, 3], ["[1, 0]", "[0.8, 0.6]", "[0, 1]"]))
+    assert [job_id for job_id, _ in jobs.top(np.array([1.0, 0.0]), n=2)] == [1, 2]
+    assert [job_id for job_id, _ in jobs.top(np.array([1.0, 0.0]), n=2, exclude=[1])] == [2]
+
+    jobs.add([4], ["[0.6, 0.8]"])
+    assert [job_id for job_id, _ in jobs.top(np.array([0.0, 1.0]), n=2)] == [3, 4]
+
+    users = np.array([[1.0, 0.0], [0.0, 1.0]])
+    rows = score_new_jobs([10, 20], users, [4], np.array([[0.6, 0.8]]), floors={10: 0.7})
+    assert rows == [(20, 4, 0.8)]
+
+
+def test_users_without_inputs_are_recorded_as_built():
+    conn = RecordingConnection()
+    saved = recommendation_services._connect
+    recommendation_services._connect = lambda: conn
+    try:
+        service = RecommendationService(embed=lambda text: [1.0, 0.0], jobs=JobVectorIndex(loader=lambda: ([], [])))
+        assert service.refresh_user(7) == 0
+    finally:
+        recommendation_services._connect = saved
+    # The empty marker tells the feed not to rebuild on every request
+    assert conn.writes[0][0].startswith("INSERT INTO user_vectors") and conn.writes[0][1] == (7, "[]")
+    assert conn.writes[1][0].startswith("DELETE FROM user_recommendations")
+
+
+if __name__ == "__main__":
+    test_user_vector_blends_profile_and_saved_jobs()
+    test_top_jobs_and_incremental_new_job_scoring()
+    test_users_without_inputs_are_recorded_as_built()
+    print("✅ Recommendation service tests passed")
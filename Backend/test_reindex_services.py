@@ -0,0 +1,119 @@
+import threading
+
+from dedup_services import job_text
+from recommendation_services import job_embedding_text
+from reindex_services import ReindexRunner, TASKS, pending_ranges
+
+
+class FakeDatabase:
+    """jobs table plus reindex_checkpoints; writes only land on commit"""
+
+    def __init__(self, job_ids, fail_range=None):
+        self.jobs = {i: {"title": f"Job {i}", "description": "Install solar", "company": "SunCo", "vector": None}
+                     for i in job_ids}
+        self.checkpoints = {}
+        self.fail_range = fail_range
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db, self.pending, self.result = db, [], []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        db = self.db
+        with db.lock:
+            if sql.lstrip().startswith("DELETE"):
+                self.pending.append(("reset", params[0]))
+            elif sql.lstrip().startswith("INSERT INTO reindex_checkpoints"):
+                self.pending.append(("checkpoint", params))
+            elif "MIN(job_id)" in sql:
+                self.result = [(min(db.jobs), max(db.jobs), len(db.jobs))]
+            elif "range_start, range_end, rows_done" in sql:
+                self.result = [(s, e, rows) for (task, s), (e, rows) in db.checkpoints.items() if task == params[0]]
+            elif "BETWEEN" in sql:
+                if params == db.fail_range:
+                    raise RuntimeError("lock wait timeout")
+                self.result = [(i, job["title"], job["description"])
+                               for i, job in sorted(db.jobs.items()) if params[0] <= i <= params[1]]
+
+    def executemany(self, sql, rows):
+        self.pending.append(("vectors", rows))
+
+    def fetchall(self):
+        return self.result
+
+    def commit(self):
+        db = self.db
+        with db.lock:
+            for kind, value in self.pending:
+                if kind == "reset":
+                    db.checkpoints = {k: v for k, v in db.checkpoints.items() if k[0] != value}
+                elif kind == "checkpoint":
+                    task, start, end, rows = value
+                    db.checkpoints[(task, start)] = (end, rows)
+                else:
+                    for desc, _, job_id in value:
+                        db.jobs[job_id]["vector"] = desc
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        pass
+
+
+def embed(texts):
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_pending_ranges_skip_checkpointed_chunks():
+    assert pending_ranges(1, 25, 10, []) == [(1, 9), (10, 19), (20, 25)]
+    assert pending_ranges(1, 25, 10, [(10, 19)]) == [(1, 9), (20, 25)]
+    # Checkpoints written with another chunk size still count
+    assert pending_ranges(0, 19, 10, [(0, 4), (12, 14)]) == [(5, 9), (10, 11), (15, 19)]
+    assert pending_ranges(1, 25, 10, [(0, 29)]) == []
+
+
+def test_failed_chunk_is_retried_on_resume():
+    db = FakeDatabase(range(1, 46), fail_range=(20, 29))
+    runner = ReindexRunner(embed_batch=embed, tasks={"job_vectors": TASKS["job_vectors"]}, workers=3, chunk_size=10,
+                           connection_factory=db)
+
+    first = runner.run("job_vectors")
+    assert first["status"] == "failed" and first["chunks_failed"] == 1 and len(first["errors"]) == 1
+    assert (first["rows_done"], first["total_rows"], first["chunks_done"]) == (35, 45, 4)
+    assert sorted(start for _, start in db.checkpoints) == [1, 10, 30, 40]
+    assert db.jobs[25]["vector"] is None and db.jobs[1]["vector"] is not None
+
+    db.fail_range = None
+    resumed = runner.run("job_vectors")
+    assert resumed["status"] == "done" and resumed["chunks_total"] == 1 and resumed["rows_done"] == 45
+    assert resumed["percent"] == 100.0 and resumed["eta_seconds"] is None
+    assert all(job["vector"] is not None for job in db.jobs.values())
+
+    restarted = runner.run("job_vectors", restart=True, chunk_size=20)
+    assert restarted["chunks_total"] == 3 and restarted["rows_done"] == 45
+
+
+def test_job_vectors_embed_the_shared_text_recipe():
+    texts = []
+    TASKS["job_vectors"].build([(1, "Solar Tech", "Install PV"), (2, "Wind Analyst", None)],
+                               lambda batch: texts.extend(batch) or embed(batch))
+    # Reindex, ingestion, dedup and the recommendation service all write desc_vector_json
+    assert texts[:2] == [job_embedding_text("Solar Tech", "Install PV"), "Wind Analyst"]
+    assert texts[0] == job_text({"title": "Solar Tech", "description": "Install PV", "company": "SunCo"})
+
+
+if __name__ == "__main__":
+    test_pending_ranges_skip_checkpointed_chunks()
+    test_failed_chunk_is_retried_on_resume()
+    test_job_vectors_embed_the_shared_text_recipe()
+    print("✅ Reindex service tests passed")
@@ -0,0 +1,20 @@
+from skill_services import AhoCorasick, skill_taxonomy
+
+
+def test_matcher_prefers_longest_whole_word_matches():
+    matcher = AhoCorasick({"data": 1, "data science": 2, "ev": 3})
+    assert [value for _, _, value in matcher.find("data science for ev fleets, not every level")] == [2, 3]
+
+
+def test_synonyms_and_abbreviations_resolve_to_canonical_ids():
+    pv = skill_taxonomy.canonical("Solar PV Design")
+    assert skill_taxonomy.canonical("PV") == pv
+    assert skill_taxonomy.canonical("photovoltaics") == pv
+    found = skill_taxonomy.extract("PVsyst modelling, GHG accounting and Python")
+    assert [skill_taxonomy.name(i) for i in found] == ["Energy Modelling", "Carbon Accounting", "Python"]
+
+
+if __name__ == "__main__":
+    test_matcher_prefers_longest_whole_word_matches()
+    test_synonyms_and_abbreviations_resolve_to_canonical_ids()
+    print("✅ Skill service tests passed")
@@ -0,0 +1,252 @@
+import asyncio
+import os
+import tempfile
+import time
+
+from translation_services import (TranslationIndex, TranslationCache, TranslationEngine, CircuitBreaker,
+                                  GoogleTranslateProvider, load_translation_table, mark_batch, split_marked)
+
+TABLES = {
+    "hi": {
+        "Solar Energy Engineer": "सौर ऊर्जा इंजीनियर",
+        "Senior Solar Energy Engineer": "सीनियर सौर ऊर्जा इंजीनियर",
+        "Tata Power Renewables": "टाटा पावर रिन्यूएबल्स",
+    }
+}
+
+
+def test_exact_lookup_is_case_and_space_insensitive():
+    index = TranslationIndex(TABLES)
+    assert index.lookup("senior  solar energy ENGINEER", "hi") == "सीनियर सौर ऊर्जा इंजीनियर"
+
+
+def test_phrase_lookup_composes_known_phrases():
+    index = TranslationIndex(TABLES)
+    assert index.lookup("Solar Energy Engineer - Tata Power Renewables", "hi") == \
+        "सौर ऊर्जा इंजीनियर - टाटा पावर रिन्यूएबल्स"
+    # numbers and acronyms pass through untranslated
+    assert index.lookup("Solar Energy Engineer 2", "hi") == "सौर ऊर्जा इंजीनियर 2"
+
+
+def test_uncovered_text_is_not_guessed():
+    index = TranslationIndex(TABLES)
+    assert index.lookup("Solar Energy Engineer (Pune)", "hi") is None
+    assert index.lookup("Solar Energy Engineer", "ta") is None
+
+
+def test_cache_evicts_and_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        cache = TranslationCache(max_entries=2, shards=1, db_path=path)
+        cache.set("Solar", "hi", "सौर")
+        cache.set("Wind", "hi", "पवन")
+        cache.set("Carbon", "hi", "कार्बन", persist=False)
+        assert len(cache.shards[0].entries) == 2
+
+        # a fresh worker finds persisted entries in the shared tier
+        fresh = TranslationCache(db_path=path)
+        assert fresh.get("Solar", "hi") == "सौर"
+        assert fresh.get("Carbon", "hi") is None
+        assert fresh.get("Solar", "hi") == "सौर"
+        stats = fresh.stats()["hi"]
+        assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_fallbacks_expire_quickly_and_disk_tier_is_pruned():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranslationCache(shards=1, db_path=os.path.join(tmp, "cache.db"), fallback_ttl=-1,
+                                 max_db_rows=3, prune_every=100)
+        cache.set("Wind Analyst", "hi", "Wind Analyst", persist=False)     # upstream was down
+        assert cache.get("Wind Analyst", "hi") is None
+
+        cache.persist_many([(f"Job {i}", f"नौकरी {i}") for i in range(5)], "hi")
+        cache.ttl = 3600
+        conn = cache._db()
+        conn.execute("UPDATE translations SET created_at = created_at - 7200 WHERE source = 'Job 0'")
+        assert cache.prune() == 2                                            # one expired, one over the bound
+        rows = [row[0] for row in conn.execute("SELECT source FROM translations ORDER BY source")]
+        assert rows == ["Job 2", "Job 3", "Job 4"]
+
+        # Writes past prune_every trigger the same cleanup
+        cache.prune_every = 2
+        cache.persist_many([("Job 5", "नौकरी 5"), ("Job 6", "नौकरी 6")], "hi")
+        (count,), = conn.execute("SELECT COUNT(*) FROM translations").fetchall()
+        assert count == 3
+
+
+class ScriptedTranslator:
+    """Answers batched requests with a canned body, single strings with a tag"""
+
+    def __init__(self, batch_reply):
+        self.batch_reply, self.calls = batch_reply, []
+
+    def translate(self, text):
+        self.calls.append(text)
+        return self.batch_reply(text) if text.startswith("[[0]]") else f"<{text}>"
+
+
+def test_batch_markers_survive_merged_lines_and_catch_misalignment():
+    texts = ["Solar Engineer", "Wind Analyst", "Grid Planner"]
+    assert split_marked(mark_batch(texts), 3) == texts
+    # Lines merged and re-split by the provider: the markers still delimit every item
+    assert split_marked("[[0]] सौर इंजीनियर [[ 1 ]] पवन\nविश्लेषक\n[[2]] ग्रिड", 3) == \
+        ["सौर इंजीनियर", "पवन\nविश्लेषक", "ग्रिड"]
+    assert split_marked("[[0]] सौर इंजीनियर पवन विश्लेषक\n[[2]] ग्रिड", 3) is None      # marker lost
+    assert split_marked("[[1]] पवन\n[[0]] सौर\n[[2]] ग्रिड", 3) is None                # reordered
+
+    aligned = ScriptedTranslator(lambda body: body.replace("Engineer", "इंजीनियर"))
+    provider = GoogleTranslateProvider(translator_factory=lambda lang: aligned)
+    assert provider.translate_batch(texts, "hi") == ["Solar इंजीनियर", "Wind Analyst", "Grid Planner"]
+    assert len(aligned.calls) == 1
+
+    merged = ScriptedTranslator(lambda body: "[[0]] Solar Engineer Wind Analyst\n[[2]] Grid Planner")
+    provider = GoogleTranslateProvider(translator_factory=lambda lang: merged)
+    assert provider.translate_batch(texts, "hi") == [f"<{text}>" for text in texts]
+    assert provider.misaligned_batches == 1 and len(merged.calls) == 4
+
+
+def test_tables_load_lazily_and_reload_from_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "hi.json"), "w", encoding="utf-8") as f:
+            f.write('{"Solar Energy Engineer": "सौर ऊर्जा इंजीनियर"}')
+        index = TranslationIndex(loader=lambda lang: load_translation_table(lang, tmp))
+        assert index.languages() == []
+        assert index.lookup("solar energy engineer", "hi") == "सौर ऊर्जा इंजीनियर"
+        assert index.lookup("Solar Energy Engineer", "ta") is None
+        assert index.languages() == ["hi"]
+
+        with open(os.path.join(tmp, "hi.json"), "w", encoding="utf-8") as f:
+            f.write('{"Solar Energy Engineer": "सोलर एनर्जी इंजीनियर"}')
+        assert index.reload() == ["hi"]
+        assert index.lookup("Solar Energy Engineer", "hi") == "सोलर एनर्जी इंजीनियर"
+
+
+class RecordingProvider:
+    """Stands in for Google Translate and records every upstream batch"""
+
+    def __init__(self, fail=False, delay=0.0):
+        self.batches = []
+        self.fail = fail
+        self.delay = delay
+
+    def translate_batch(self, texts, lang):
+        self.batches.append(list(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream unavailable")
+        return [f"[{lang}] {text}" for text in texts]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_engine_sends_only_unique_misses_upstream():
+    provider = RecordingProvider()
+    engine = TranslationEngine(TranslationIndex(TABLES), TranslationCache(shards=1), provider, batch_size=2)
+    texts = ["Solar Energy Engineer", "Wind Analyst", "Wind Analyst", "ESG Lead", "Grid Planner", "Wind Analyst"]
+
+    result = asyncio.run(engine.translate_many(texts, "hi"))
+    assert result["Solar Energy Engineer"] == "सौर ऊर्जा इंजीनियर"
+    assert result["Wind Analyst"] == "[hi] Wind Analyst"
+    assert sorted(sum(provider.batches, [])) == ["ESG Lead", "Grid Planner", "Wind Analyst"]
+    assert len(provider.batches) == 2
+
+    # second request is served entirely from the cache
+    asyncio.run(engine.translate_many(texts, "hi"))
+    assert len(provider.batches) == 2
+
+
+def test_engine_falls_back_to_original_when_upstream_fails():
+    engine = TranslationEngine(TranslationIndex(TABLES), TranslationCache(shards=1), RecordingProvider(fail=True))
+    result = asyncio.run(engine.translate_many(["Wind Analyst", "Tata Power Renewables"], "hi"))
+    assert result == {"Wind Analyst": "Wind Analyst", "Tata Power Renewables": "टाटा पावर रिन्यूएबल्स"}
+
+
+def test_circuit_opens_and_probes_after_timeout():
+    clock = FakeClock()
+    provider = RecordingProvider(fail=True)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    engine = TranslationEngine(TranslationIndex({}), TranslationCache(shards=1), provider, breaker=breaker)
+
+    asyncio.run(engine.translate_many(["Wind Analyst"], "hi"))
+    asyncio.run(engine.translate_many(["Grid Planner"], "hi"))
+    assert breaker.state == CircuitBreaker.OPEN
+    asyncio.run(engine.translate_many(["Carbon Auditor"], "hi"))
+    assert len(provider.batches) == 2  # open circuit: no upstream call
+
+    clock.now = 31
+    provider.fail = False
+    result = asyncio.run(engine.translate_many(["Carbon Auditor"], "hi"))
+    assert result["Carbon Auditor"] == "[hi] Carbon Auditor"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_strings_are_not_retried_while_negative_cached():
+    provider = RecordingProvider(fail=True)
+    engine = TranslationEngine(TranslationIndex({}), TranslationCache(shards=1), provider)
+    asyncio.run(engine.translate_many(["Wind Analyst"], "hi"))
+    provider.fail = False
+    assert asyncio.run(engine.translate_many(["Wind Analyst"], "hi")) == {"Wind Analyst": "Wind Analyst"}
+    assert len(provider.batches) == 1
+
+
+def test_time_budget_falls_back_and_late_results_warm_the_cache():
+    cache = TranslationCache(shards=1)
+    engine = TranslationEngine(TranslationIndex({}), cache, RecordingProvider(delay=0.3), time_budget=0.05)
+
+    async def scenario():
+        started = time.monotonic()
+        result = await engine.translate_many(["Wind Analyst"], "hi")
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(0.4)
+        return result, elapsed
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == {"Wind Analyst": "Wind Analyst"}
+    assert elapsed < 0.25
+    assert cache.get("Wind Analyst", "hi") == "[hi] Wind Analyst"
+
+
+def test_late_batches_are_tracked_and_bounded():
+    cache = TranslationCache(shards=1)
+    provider = RecordingProvider(delay=0.2)
+    engine = TranslationEngine(TranslationIndex({}), cache, provider, batch_size=1, time_budget=0.02,
+                               max_pending_batches=1)
+
+    async def scenario():
+        first = await engine.translate_many(["Wind Analyst", "Grid Planner"], "hi")
+        assert len(engine._pending) == 1 and engine.shed_batches == 1
+        # The late batch still holds the only slot, so nothing else is queued behind it
+        second = await engine.translate_many(["Carbon Auditor"], "hi")
+        assert engine.shed_batches == 2 and len(provider.batches) == 1
+        await asyncio.gather(*engine._pending)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == {"Wind Analyst": "Wind Analyst", "Grid Planner": "Grid Planner"}
+    assert second == {"Carbon Auditor": "Carbon Auditor"}
+    assert not engine._pending and engine.stats()["pending_batches"] == 0
+    assert cache.get("Wind Analyst", "hi") == "[hi] Wind Analyst"
+
+
+if __name__ == "__main__":
+    test_exact_lookup_is_case_and_space_insensitive()
+    test_phrase_lookup_composes_known_phrases()
+    test_uncovered_text_is_not_guessed()
+    test_cache_evicts_and_survives_restart()
+    test_fallbacks_expire_quickly_and_disk_tier_is_pruned()
+    test_batch_markers_survive_merged_lines_and_catch_misalignment()
+    test_tables_load_lazily_and_reload_from_disk()
+    test_engine_sends_only_unique_misses_upstream()
+    test_engine_falls_back_to_original_when_upstream_fails()
+    test_circuit_opens_and_probes_after_timeout()
+    test_failed_strings_are_not_retried_while_negative_cached()
+    test_time_budget_falls_back_and_late_results_warm_the_cache()
+    test_late_batches_are_tracked_and_bounded()
+    print("✅ Translation service tests passed")
@@ -0,0 +1,665 @@
+# translation_services.py - dictionary lookup, caching and upstream translation
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+# Per-item markers in a batched upstream request; providers leave them alone (spacing aside)
+BATCH_MARKER_RE = re.compile(r"\[\[\s*(\d+)\s*\]\]")
+
+
+def normalize_key(text: str) -> str:
+    """Case-folded, whitespace-collapsed form used for every dictionary key"""
+    return " ".join(text.casefold().split())
+
+
+def _passes_through(word: str) -> bool:
+    """Tokens that read the same in every language: numbers and acronyms (ESG, EV, LPA)"""
+    return word.isdigit() or (word.isupper() and len(word) <= 5)
+
+
+def default_tables_dir() -> str:
+    return os.getenv("TRANSLATIONS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "translations"))
+
+
+def load_translation_table(lang: str, directory: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """Read translations/<lang>.json - a flat {"English text": "translation"} object"""
+    if not re.fullmatch(r"[a-z]{2,3}", lang or ""):
+        return None
+    path = os.path.join(directory or default_tables_dir(), f"{lang}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load translation table {path}: {e}")
+        return None
+    if not isinstance(table, dict):
+        logger.error(f"Translation table {path} is not a JSON object")
+        return None
+    return {str(k): str(v) for k, v in table.items()}
+
+
+class TranslationIndex:
+    """Compiled lookup over the fallback translation tables.
+
+    Tables are either passed in or read by `loader(lang)` the first time a
+    language is looked up, so a worker only holds the languages it serves.
+    Exact lookups are a single dict probe on the normalised text; strings
+    without an exact entry are segmented into the longest known phrases
+    (e.g. "Solar Energy Engineer - Tata Power Renewables") so they resolve
+    without a network call.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, Dict[str, str]]] = None, max_phrase_words: int = 8,
+                 loader=None):
+        self.exact: Dict[str, Dict[str, str]] = {}
+        self.max_phrase_words: Dict[str, int] = {}
+        self.phrase_limit = max_phrase_words
+        self.loader = loader
+        self._load_lock = threading.Lock()
+        self._unavailable = set()
+        for lang, table in (tables or {}).items():
+            self.add_language(lang, table, max_phrase_words)
+
+    def add_language(self, lang: str, table: Dict[str, str], max_phrase_words: Optional[int] = None):
+        compiled = {}
+        longest = 1
+        for key, value in table.items():
+            norm = normalize_key(key)
+            if not norm:
+                continue
+            compiled[norm] = value
+            longest = max(longest, len(WORD_RE.findall(norm)))
+        # Swap the finished table in whole so concurrent lookups never see a partial one
+        self.max_phrase_words[lang] = min(longest, max_phrase_words or self.phrase_limit)
+        self.exact[lang] = compiled
+
+    def languages(self) -> List[str]:
+        return list(self.exact)
+
+    def _table(self, lang: str) -> Optional[Dict[str, str]]:
+        table = self.exact.get(lang)
+        if table is not None or self.loader is None or lang in self._unavailable:
+            return table
+        with self._load_lock:
+            if lang not in self.exact and lang not in self._unavailable:
+                loaded = self.loader(lang)
+                if loaded is None:
+                    self._unavailable.add(lang)
+                else:
+                    self.add_language(lang, loaded)
+                    logger.info(f"📚 Loaded {len(loaded)} {lang} fallback translations")
+        return self.exact.get(lang)
+
+    def reload(self, lang: Optional[str] = None) -> List[str]:
+        """Re-read tables from the loader: one language, or every language loaded so far"""
+        if self.loader is None:
+            return []
+        with self._load_lock:
+            langs = [lang] if lang else list(self.exact)
+            self._unavailable.clear()
+            reloaded = []
+            for code in langs:
+                table = self.loader(code)
+                if table is None:
+                    self.exact.pop(code, None)
+                    continue
+                self.add_language(code, table)
+                reloaded.append(code)
+        logger.info(f"📚 Reloaded fallback translations: {reloaded}")
+        return reloaded
+
+    def lookup(self, text: str, lang: str) -> Optional[str]:
+        """Translation from the dictionary, or None when the text is not covered"""
+        if not text:
+            return None
+        table = self._table(lang)
+        if not table:
+            return None
+        hit = table.get(normalize_key(text))
+        if hit is not None:
+            return hit
+        return self._compose(text, table, self.max_phrase_words[lang])
+
+    def _compose(self, text: str, table: Dict[str, str], max_words: int) -> Optional[str]:
+        words: List[Tuple[int, int]] = [m.span() for m in WORD_RE.finditer(text)]
+        if len(words) < 2:
+            return None
+
+        out = []
+        cursor = 0  # end of the text already emitted
+        matched_any = False
+        i = 0
+        while i < len(words):
+            for j in range(min(len(words), i + max_words), i, -1):
+                start, end = words[i][0], words[j - 1][1]
+                value = table.get(normalize_key(text[start:end]))
+                if value is not None:
+                    out.append(text[cursor:start])
+                    out.append(value)
+                    cursor = end
+                    matched_any = True
+                    i = j
+                    break
+            else:
+                start, end = words[i]
+                if not _passes_through(text[start:end]):
+                    return None
+                i += 1
+
+        if not matched_any:
+            return None
+        out.append(text[cursor:])
+        return "".join(out)
+
+
+class _CacheShard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+
+
+class TranslationCache:
+    """Two-tier translation cache.
+
+    Tier 1 is an in-process LRU with TTL, split into shards with their own
+    locks so concurrent lookups rarely contend. Untranslated fallbacks (kept
+    out of tier 2) only live `fallback_ttl` seconds, so an upstream outage
+    does not pin English text for the full TTL. Tier 2 is a SQLite file in
+    WAL mode shared by every worker on the host, so translations survive
+    restarts and a new worker does not start cold; every `prune_every`
+    writes, expired rows are deleted and the table is trimmed to
+    `max_db_rows`. Tier 2 calls block - the engine runs them in a thread.
+    Hit/miss counters are kept per language.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl: float = 7 * 24 * 3600, shards: int = 16,
+                 db_path: Optional[str] = None, fallback_ttl: float = 300.0, max_db_rows: int = 500000,
+                 prune_every: int = 1000):
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self.shards = [_CacheShard() for _ in range(shards)]
+        self.max_per_shard = max(1, max_entries // shards)
+        self.db_path = db_path
+        self.max_db_rows = max_db_rows
+        self.prune_every = prune_every
+        self._writes = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        if db_path:
+            self._init_db()
+
+    # ---- persistent tier ----
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if not self.db_path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        try:
+            self._db().execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    lang TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    translated TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (lang, source)
+                )
+            """)
+            self._db().execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations (created_at)")
+        except sqlite3.Error as e:
+            logger.error(f"Persistent translation cache disabled: {e}")
+            self.db_path = None
+
+    def _db_get_many(self, texts: List[str], lang: str) -> Dict[str, str]:
+        found = {}
+        try:
+            conn = self._db()
+            if conn is None:
+                return found
+            oldest = time.time() - self.ttl
+            for start in range(0, len(texts), 500):
+                chunk = texts[start:start + 500]
+                rows = conn.execute(f"""
+                    SELECT source, translated FROM translations
+                    WHERE lang = ? AND created_at >= ? AND source IN ({', '.join('?' * len(chunk))})
+                """, [lang, oldest] + chunk).fetchall()
+                found.update(rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent translation cache read failed: {e}")
+        return found
+
+    def _db_set_many(self, items: List[Tuple[str, str]], lang: str):
+        try:
+            conn = self._db()
+            if conn is None:
+                return
+            now = time.time()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO translations (lang, source, translated, created_at) VALUES (?, ?, ?, ?)",
+                                 [(lang, text, translated, now) for text, translated in items])
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent translation cache write failed: {e}")
+            return
+        with self._stats_lock:
+            self._writes += len(items)
+            due = self._writes >= self.prune_every
+            if due:
+                self._writes = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired rows and trim the shared tier to max_db_rows (oldest first); returns rows removed"""
+        try:
+            conn = self._db()
+            if conn is None:
+                return 0
+            with conn:
+                removed = conn.execute("DELETE FROM translations WHERE created_at < ?",
+                                       (time.time() - self.ttl,)).rowcount
+                (rows,), = conn.execute("SELECT COUNT(*) FROM translations").fetchall()
+                if rows > self.max_db_rows:
+                    removed += conn.execute("""
+                        DELETE FROM translations WHERE rowid IN (
+                            SELECT rowid FROM translations ORDER BY created_at LIMIT ?
+                        )
+                    """, (rows - self.max_db_rows,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent translation cache prune failed: {e}")
+            return 0
+        if removed:
+            logger.info(f"🧹 Pruned {removed} rows from the persistent translation cache")
+        return removed
+
+    # ---- in-process tier ----
+    def _shard(self, key) -> _CacheShard:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def _count(self, lang: str, field: str):
+        with self._stats_lock:
+            stats = self._stats.setdefault(lang, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+            stats[field] += 1
+
+    def _remember(self, key, translated: str, ttl: float):
+        shard = self._shard(key)
+        with shard.lock:
+            shard.entries[key] = (time.monotonic() + ttl, translated)
+            shard.entries.move_to_end(key)
+            while len(shard.entries) > self.max_per_shard:
+                shard.entries.popitem(last=False)
+
+    def get_memory(self, text: str, lang: str) -> Optional[str]:
+        """In-process tier only - never blocks on disk"""
+        key = (lang, text)
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    shard.entries.move_to_end(key)
+                    self._count(lang, "memory_hits")
+                    return entry[1]
+                del shard.entries[key]
+        return None
+
+    def get_persisted(self, texts: List[str], lang: str) -> Dict[str, str]:
+        """Shared-tier lookup for strings that missed memory (blocking); hits are kept in memory"""
+        found = self._db_get_many(texts, lang) if self.db_path else {}
+        for text in texts:
+            if text in found:
+                self._remember((lang, text), found[text], self.ttl)
+                self._count(lang, "disk_hits")
+            else:
+                self._count(lang, "misses")
+        return found
+
+    def get(self, text: str, lang: str) -> Optional[str]:
+        translated = self.get_memory(text, lang)
+        if translated is None:
+            translated = self.get_persisted([text], lang).get(text)
+        return translated
+
+    def remember(self, text: str, lang: str, translated: str, persist: bool = True):
+        """In-process tier only; `persist=False` marks an untranslated fallback (short TTL)"""
+        self._remember((lang, text), translated, self.ttl if persist else self.fallback_ttl)
+
+    def persist_many(self, items: List[Tuple[str, str]], lang: str):
+        """Write (source, translated) pairs to the shared tier (blocking)"""
+        if self.db_path and items:
+            self._db_set_many(items, lang)
+
+    def set(self, text: str, lang: str, translated: str, persist: bool = True):
+        """Cache a translation; `persist=False` keeps it out of the shared tier and expires it quickly"""
+        self.remember(text, lang, translated, persist)
+        if persist:
+            self.persist_many([(text, translated)], lang)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._stats_lock:
+            report = {}
+            for lang, counts in self._stats.items():
+                lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+                hits = counts["memory_hits"] + counts["disk_hits"]
+                report[lang] = dict(counts, hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+        report["_entries_in_memory"] = sum(len(shard.entries) for shard in self.shards)
+        return report
+
+
+def default_cache_path() -> str:
+    return os.getenv("TRANSLATION_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "translation_cache.db"))
+
+
+def mark_batch(texts: List[str]) -> str:
+    """One request body with every string behind its own [[i]] marker"""
+    return "\n".join(f"[[{i}]] {text}" for i, text in enumerate(texts))
+
+
+def split_marked(translated: str, count: int) -> Optional[List[str]]:
+    """Undo mark_batch; None unless markers 0..count-1 all come back exactly once and in order"""
+    parts = BATCH_MARKER_RE.split(translated or "")
+    # parts = [prefix, "0", item0, "1", item1, ...]
+    if parts[0].strip() or len(parts) != 2 * count + 1:
+        return None
+    if [int(marker) for marker in parts[1::2]] != list(range(count)):
+        return None
+    return [item.strip() for item in parts[2::2]]
+
+
+class GoogleTranslateProvider:
+    """Blocking Google Translate client - only ever called from a thread pool.
+
+    Batches are sent as one request with a [[i]] marker in front of every
+    string. Merged or split lines move text between markers but cannot hide
+    a missing, repeated or reordered marker, so unless every marker comes
+    back in order the batch is retried item by item.
+    """
+
+    max_batch_chars = 4500
+
+    def __init__(self, translator_factory=None):
+        self.translator_factory = translator_factory
+        self.misaligned_batches = 0
+
+    def _translator(self, lang: str):
+        if self.translator_factory is not None:
+            return self.translator_factory(lang)
+        from deep_translator import GoogleTranslator
+
+        return GoogleTranslator(source='auto', target=lang)
+
+    def translate_batch(self, texts: List[str], lang: str) -> List[str]:
+        translator = self._translator(lang)
+        if len(texts) > 1 and not any(BATCH_MARKER_RE.search(text) for text in texts):
+            items = split_marked(translator.translate(mark_batch(texts)), len(texts))
+            if items is not None:
+                return [item or text for item, text in zip(items, texts)]
+            self.misaligned_batches += 1
+            logger.warning(f"Batched translation to {lang} came back misaligned - retrying {len(texts)} strings one by one")
+        return [translator.translate(text) or text for text in texts]
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream for `reset_timeout` seconds.
+
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open once the timeout passes, letting `half_open_max_calls` probes
+    through; a successful probe closes the circuit, a failed one reopens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Translation provider circuit opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class NegativeCache:
+    """Recently failed (text, lang) pairs that should not be retried upstream yet"""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+
+    def add(self, text: str, lang: str):
+        with self._lock:
+            self._entries[(lang, text)] = self.clock() + self.ttl
+            self._entries.move_to_end((lang, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < self.clock():
+                del self._entries[key]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TranslationEngine:
+    """Resolves all strings a response needs in one pass.
+
+    Strings are de-duplicated, then resolved from the dictionary index and
+    the cache; only the remainder goes upstream, in batches run concurrently
+    on a thread pool under a semaphore so the event loop never blocks on
+    HTTP. The upstream is guarded by a circuit breaker and a negative cache,
+    and a request waits at most `time_budget` seconds for it - strings that
+    miss the budget come back untranslated, and batches that finish late
+    still warm the cache. At most `max_pending_batches` upstream batches
+    exist at once (running, queued or finishing late); beyond that new
+    strings are served untranslated instead of queueing behind them.
+    """
+
+    def __init__(self, index: TranslationIndex, cache: TranslationCache, provider,
+                 max_concurrency: int = 4, batch_size: int = 25, executor=None,
+                 time_budget: Optional[float] = 2.0, slow_call_seconds: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None, negative_cache: Optional[NegativeCache] = None,
+                 max_pending_batches: Optional[int] = None):
+        self.index = index
+        self.cache = cache
+        self.provider = provider
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.time_budget = time_budget
+        self.slow_call_seconds = slow_call_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.negative_cache = negative_cache or NegativeCache()
+        self._semaphore = None
+        self.max_pending_batches = max_pending_batches or max_concurrency * 8
+        # Strong references to upstream batches, so late ones are not collected mid-flight
+        self._pending: Set[asyncio.Task] = set()
+        self.budget_exceeded = 0
+        self.shed_batches = 0
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        max_chars = getattr(self.provider, "max_batch_chars", 4500)
+        batches, current, size = [], [], 0
+        for text in texts:
+            # +8 for the "[[i]] " marker and newline of a batched request
+            if current and (len(current) >= self.batch_size or size + len(text) + 8 > max_chars):
+                batches.append(current)
+                current, size = [], 0
+            current.append(text)
+            size += len(text) + 8
+        if current:
+            batches.append(current)
+        return batches
+
+    def _failed(self, batch: List[str], lang: str, reason) -> List[str]:
+        self.breaker.record_failure()
+        for text in batch:
+            self.negative_cache.add(text, lang)
+        logger.warning(f"Upstream translation of {len(batch)} strings to {lang} failed: {reason}")
+        return list(batch)
+
+    async def _translate_upstream(self, batch: List[str], lang: str) -> List[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            if not self.breaker.allow():
+                return list(batch)
+            started = time.monotonic()
+            try:
+                loop = asyncio.get_running_loop()
+                translated = await loop.run_in_executor(self.executor, self.provider.translate_batch, batch, lang)
+            except Exception as e:
+                return self._failed(batch, lang, e)
+        if len(translated) != len(batch):
+            return self._failed(batch, lang, "result count mismatch")
+
+        elapsed = time.monotonic() - started
+        if elapsed > self.slow_call_seconds:
+            # Slow answers are used but still count against the provider
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        translated = [t or original for t, original in zip(translated, batch)]
+        for text, value in zip(batch, translated):
+            # Untranslated fallbacks stay out of the shared tier
+            self.cache.remember(text, lang, value, persist=value != text)
+        persisted = [(text, value) for text, value in zip(batch, translated) if value != text]
+        if persisted and self.cache.db_path:
+            await asyncio.to_thread(self.cache.persist_many, persisted, lang)
+        return translated
+
+    async def translate_many(self, texts: Iterable[str], lang: str, time_budget: Optional[float] = None) -> Dict[str, str]:
+        """Map every distinct input string to its translation (or itself)"""
+        unique = list(dict.fromkeys(t for t in texts if t))
+        result: Dict[str, str] = {text: text for text in unique}
+        if lang == "en":
+            return result
+
+        misses = []
+        for text in unique:
+            if not text.strip():
+                continue
+            translated = self.index.lookup(text, lang)
+            if translated is None:
+                translated = self.cache.get_memory(text, lang)
+            if translated is not None:
+                result[text] = translated
+            else:
+                misses.append(text)
+        persisted = {}
+        if misses:
+            # The SQLite tier blocks, so it is read off the event loop
+            persisted = (await asyncio.to_thread(self.cache.get_persisted, misses, lang) if self.cache.db_path
+                         else self.cache.get_persisted(misses, lang))
+            result.update(persisted)
+        pending = [text for text in misses if text not in persisted and (lang, text) not in self.negative_cache]
+
+        if not pending or self.breaker.state == CircuitBreaker.OPEN:
+            return result
+
+        batches = self._batches(pending)
+        room = max(self.max_pending_batches - len(self._pending), 0)
+        if len(batches) > room:
+            self.shed_batches += len(batches) - room
+            logger.warning(f"{len(self._pending)} upstream batches pending - {len(batches) - room} to {lang} served untranslated")
+            batches = batches[:room]
+            if not batches:
+                return result
+        tasks = []
+        for batch in batches:
+            task = asyncio.create_task(self._translate_upstream(batch, lang))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+            tasks.append(task)
+        budget = self.time_budget if time_budget is None else time_budget
+        done, late = await asyncio.wait(tasks, timeout=budget)
+        if late:
+            # Late batches keep running and fill the cache for the next request
+            self.budget_exceeded += 1
+            logger.warning(f"Translation budget of {budget}s exceeded: {len(late)}/{len(tasks)} batches to {lang} pending")
+        for batch, task in zip(batches, tasks):
+            if task in done:
+                for text, translated in zip(batch, task.result()):
+                    result[text] = translated
+        logger.info(f"🌐 {lang}: {len(unique)} strings, {len(pending)} sent upstream in {len(batches)} batches")
+        return result
+
+    async def translate(self, text: str, lang: str) -> str:
+        if not text:
+            return text
+        return (await self.translate_many([text], lang)).get(text, text)
+
+    def stats(self) -> Dict:
+        return {
+            "circuit": self.breaker.state,
+            "negative_cache_entries": len(self.negative_cache),
+            "budget_exceeded": self.budget_exceeded,
+            "pending_batches": len(self._pending),
+            "shed_batches": self.shed_batches,
+        }
@@ -36,7 +36,12 @@ class GreenJobsVectorService:
         if not text or text.strip() == "":
             return [0.0] * 384
         return self.model.encode(text).tolist()
-    
+
+    def generate_embeddings(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """Embed many texts in one model call (batched on the model side)"""
+        vectors = self.model.encode([text or "" for text in texts], batch_size=batch_size)
+        return [[0.0] * 384 if not (text or "").strip() else vector.tolist() for text, vector in zip(texts, vectors)]
+
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
         try:
@@ -54,92 +59,15 @@ class GreenJobsVectorService:
             return 0.0
 
     def populate_existing_data(self):
-        """HACKATHON READY: Add vector embeddings to all existing data"""
-        cursor = self.conn.cursor()
-        
-        print("🚀 Starting vector data population for hackathon...")
-        
-        # Ensure vector columns exist
-        try:
-            cursor.execute("ALTER TABLE careers ADD COLUMN IF NOT EXISTS desc_vector_json TEXT")
-            cursor.execute("ALTER TABLE careers ADD COLUMN IF NOT EXISTS skills_vector_json TEXT")
-            print("✅ Career vector columns ready")
-        except:
-            print("✅ Career vector columns already exist")
-        
-        try:
-            cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS desc_vector_json TEXT")
-            cursor.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS skills_vector_json TEXT") 
-            print("✅ Job vector columns ready")
-        except:
-            print("✅ Job vector columns already exist")
-        
-        # Populate careers vectors
-        print("📊 Vectorizing careers...")
-        cursor.execute("SELECT career_id, title, description, required_skills FROM careers")
-        careers = cursor.fetchall()
-        
-        success_count = 0
-        for career_id, title, description, skills in careers:
-            try:
-                # Generate embeddings
-                desc_text = f"{title} {description}" if description else title
-                desc_vector = self.generate_embedding(desc_text)
-                
-                skills_text = str(skills) if skills else title
-                skills_vector = self.generate_embedding(skills_text)
-                
-                # Store as JSON
-                desc_vector_json = json.dumps(desc_vector)
-                skills_vector_json = json.dumps(skills_vector)
-                
-                cursor.execute("""
-                    UPDATE careers 
-                    SET desc_vector_json = ?, skills_vector_json = ?
-                    WHERE career_id = ?
-                """, (desc_vector_json, skills_vector_json, career_id))
-                
-                success_count += 1
-                if success_count % 10 == 0:
-                    print(f"✅ Vectorized {success_count} careers...")
-                    
-            except Exception as e:
-                print(f"⚠️ Skipping career {career_id}: {e}")
-                continue
-        
-        # Populate jobs vectors
-        print("💼 Vectorizing jobs...")
-        cursor.execute("SELECT job_id, title, description, company FROM jobs")
-        jobs = cursor.fetchall()
-        
-        job_count = 0
-        for job_id, title, description, company in jobs:
-            try:
-                desc_text = f"{title} {description} {company}" if description else f"{title} {company}"
-                desc_vector = self.generate_embedding(desc_text)
-                
-                skills_vector = self.generate_embedding(description if description else title)
-                
-                desc_vector_json = json.dumps(desc_vector)
-                skills_vector_json = json.dumps(skills_vector)
-                
-                cursor.execute("""
-                    UPDATE jobs 
-                    SET desc_vector_json = ?, skills_vector_json = ?
-                    WHERE job_id = ?
-                """, (desc_vector_json, skills_vector_json, job_id))
-                
-                job_count += 1
-                if job_count % 10 == 0:
-                    print(f"✅ Vectorized {job_count} jobs...")
-                    
-            except Exception as e:
-                print(f"⚠️ Skipping job {job_id}: {e}")
-                continue
-        
-        self.conn.commit()
-        print(f"🎉 HACKATHON READY: {success_count} careers + {job_count} jobs vectorized!")
-        return True
+        """Embed every career and job, resuming from the last checkpoint (see reindex_services.py)"""
+        from reindex_services import reindex_runner
+
+        print("🚀 Starting vector data population...")
+        results = [reindex_runner.run(task) for task in ("career_vectors", "job_vectors")]
+        for result in results:
+            print(f"{'✅' if result['status'] == 'done' else '⚠️'} {result['task']}: "
+                  f"{result['rows_done']}/{result['total_rows']} rows ({result['chunks_failed']} chunks failed)")
+        return all(result["status"] == "done" for result in results)
 
     # HACKATHON-READY SEMANTIC SEARCH
     def semantic_search_jobs(self, query: str, top_k: int = 10, filters: Dict = None) -> List[Dict]:
@@ -148,12 +76,12 @@ class GreenJobsVectorService:
         
         cursor = self.conn.cursor(dictionary=True)
         
-        # Get all active jobs
+        # Get all active jobs; re-posts are collapsed into their canonical job
         base_query = """
             SELECT job_id, title, description, company, location, salary,
                    desc_vector_json, skills_vector_json
             FROM jobs 
-            WHERE 1=1
+            WHERE status = 'active' AND canonical_job_id IS NULL
         """
         params = []
         
@@ -238,10 +166,12 @@ class GreenJobsVectorService:
 vector_service = GreenJobsVectorService()
 
 def initialize_vector_data():
-    """Initialize vector data for hackathon"""
+    """Start (or resume) the chunked vector reindex in background threads; progress at /api/admin/reindex"""
+    from reindex_services import reindex_runner
+
     try:
-        success = vector_service.populate_existing_data()
-        return {"status": "success" if success else "failed", "message": "Vector data populated"}
+        started = [reindex_runner.start(task) for task in ("career_vectors", "job_vectors")]
+        return {"status": "started", "message": "Vector reindex running in the background", "tasks": started}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 